@@ -165,6 +165,12 @@ HTML_CONTENT = """
             background: #f3e5f5;
             border-left: 4px solid #9c27b0;
         }
+        .message.partial {
+            background: #f3e5f5;
+            border-left: 4px dashed #9c27b0;
+            color: #777;
+            font-style: italic;
+        }
         #status {
             padding: 10px;
             margin: 10px 0;
@@ -263,6 +269,7 @@ HTML_CONTENT = """
             </div>
             
             <div class="conversation" id="conversation"></div>
+            <div class="message partial" id="partialTranscription" style="display: none;"></div>
             <div class="controls">
                 <button id="toggleAutoRecording" class="btn btn-success" onclick="toggleAutoRecording()">Disable Auto-Recording</button>
                 <button id="startRecording" class="btn btn-primary">
@@ -315,8 +322,14 @@ HTML_CONTENT = """
         let isPlayingTTS = false;
         let autoRecordingEnabled = true;
         let recordingStarted = false;
+        let finishJobs = {};
+        let jobStatuses = {};
+        let preparedSpeech = new Map();
+        let streamingMessage = null;
         let interviewStarted = false;
         let interviewFinished = false;
+        let answerStreaming = false;
+        const STREAM_TIMESLICE_MS = 1000;
 
         function showTab(tabName) {
             // Hide all tab contents
@@ -598,13 +611,18 @@ HTML_CONTENT = """
             document.body.appendChild(modal);
         }
 
-        function addMessage(content, role) {
+        function appendMessage(content, role) {
             const conversation = document.getElementById('conversation');
             const messageDiv = document.createElement('div');
             messageDiv.className = `message ${role}`;
             messageDiv.textContent = content;
             conversation.appendChild(messageDiv);
             conversation.scrollTop = conversation.scrollHeight;
+            return messageDiv;
+        }
+
+        function addMessage(content, role) {
+            appendMessage(content, role);
             
             // Speak the message if it's from the interviewer and the interview has started
             if (role === 'interviewer' && interviewStarted) {
@@ -620,7 +638,12 @@ HTML_CONTENT = """
 
         async function connectWebSocket() {
             try {
-                ws = new WebSocket('ws://localhost:8000/ws');
+                // The server pre-synthesizes interviewer messages in this voice
+                const voice = window.openaiVoice || document.getElementById('voiceSelect')?.value || 'alloy';
+                // Interviewer backend to use for this session, if the page asks for one (?backend=local)
+                const backend = new URLSearchParams(window.location.search).get('backend');
+                ws = new WebSocket(`ws://localhost:8000/ws?voice=${encodeURIComponent(voice)}` +
+                    (backend ? `&backend=${encodeURIComponent(backend)}` : ''));
                 
                 ws.onopen = function() {
                     isConnected = true;
@@ -629,7 +652,32 @@ HTML_CONTENT = """
                 
                 ws.onmessage = async function(event) {
                     const data = JSON.parse(event.data);
-                    if (data.type === 'greeting' || data.type === 'follow_up') {
+                    if (data.type === 'follow_up_delta') {
+                        // A follow-up arriving token by token
+                        if (!streamingMessage) {
+                            streamingMessage = appendMessage('', 'interviewer');
+                        }
+                        streamingMessage.textContent += data.delta;
+                        document.getElementById('conversation').scrollTop = document.getElementById('conversation').scrollHeight;
+                        
+                        // Speak each sentence as soon as it is complete
+                        if (data.sentence) {
+                            if (data.audio_url) {
+                                preparedSpeech.set(data.sentence, {url: data.audio_url, voice: data.voice});
+                            }
+                            if (interviewStarted) {
+                                queueSpeech(data.sentence);
+                            }
+                        }
+                    } else if (data.type === 'follow_up' && data.streamed && streamingMessage) {
+                        // Already shown and spoken sentence by sentence
+                        streamingMessage.textContent = data.message;
+                        streamingMessage = null;
+                    } else if (data.type === 'greeting' || data.type === 'follow_up') {
+                        // Speech the server started synthesizing along with the message
+                        if (data.audio_url) {
+                            preparedSpeech.set(data.message, {url: data.audio_url, voice: data.voice});
+                        }
                         addMessage(data.message, 'interviewer');
                         
                         // Capture session_id if provided
@@ -640,6 +688,25 @@ HTML_CONTENT = """
                         }
                         
                         // Don't auto-start recording - wait for user to click "Start Interview"
+                    } else if (data.type === 'partial_transcription') {
+                        showPartialTranscription(data.transcription);
+                    } else if (data.type === 'final_transcription') {
+                        showPartialTranscription(null);
+                        if (data.transcription) {
+                            addMessage(data.transcription, 'candidate');
+                        }
+                    } else if (data.type === 'job_update') {
+                        // Background processing of a saved video (e.g. MP4 transcode)
+                        // or of the finished session (combined audio and video)
+                        const job = data.job;
+                        jobStatuses[job.job_id] = job.status;
+                        if (job.type === 'combine_audio' || job.type === 'combine_video') {
+                            showFinishProgress(job);
+                        } else if (job.status === 'completed') {
+                            console.log('Video processing finished:', job.result);
+                        } else if (job.status === 'failed') {
+                            console.error('Video processing failed:', job.error);
+                        }
                     }
                 };
 
@@ -659,6 +726,42 @@ HTML_CONTENT = """
             }
         }
 
+        function showPartialTranscription(text) {
+            const partial = document.getElementById('partialTranscription');
+            if (text) {
+                partial.textContent = text;
+                partial.style.display = 'block';
+            } else {
+                partial.textContent = '';
+                partial.style.display = 'none';
+            }
+        }
+
+        function beginAnswerStream() {
+            // Stream the answer over the WebSocket so the server can transcribe while we record
+            if (ws && isConnected && ws.readyState === WebSocket.OPEN) {
+                ws.send(JSON.stringify({ audio_start: true }));
+                return true;
+            }
+            return false;
+        }
+
+        function streamAnswerChunk(chunk) {
+            if (answerStreaming && chunk.size > 0 && ws && ws.readyState === WebSocket.OPEN) {
+                ws.send(chunk);
+            }
+        }
+
+        function endAnswerStream() {
+            // Returns false if the stream was interrupted and the answer must be uploaded instead
+            const streamed = answerStreaming && ws && ws.readyState === WebSocket.OPEN;
+            answerStreaming = false;
+            if (streamed) {
+                ws.send(JSON.stringify({ audio_end: true }));
+            }
+            return streamed;
+        }
+
         async function startRecording() {
             // Mark that the interview has started
             interviewStarted = true;
@@ -738,9 +841,15 @@ HTML_CONTENT = """
                         
                         audioRecorder.ondataavailable = (event) => {
                             audioChunks.push(event.data);
+                            streamAnswerChunk(event.data);
                         };
 
                         audioRecorder.onstop = async () => {
+                            if (endAnswerStream()) {
+                                // The server transcribes and saves the streamed answer
+                                audioChunks = [];
+                                return;
+                            }
                             const audioBlob = new Blob(audioChunks, { type: audioMimeType });
                             const formData = new FormData();
                             formData.append('file', audioBlob, 'recording.webm');
@@ -772,7 +881,8 @@ HTML_CONTENT = """
                             audioChunks = [];
                         };
                         
-                        audioRecorder.start();
+                        answerStreaming = beginAnswerStream();
+                        audioRecorder.start(STREAM_TIMESLICE_MS);
                     }
                     
                     if (enableVideo) {
@@ -950,34 +1060,37 @@ HTML_CONTENT = """
             }
         }
         
-        async function speakWithOpenAI(text, voice = null) {
+        async function speakWithOpenAI(text, voice = null, retry = false) {
             if (interviewFinished) return;
+            let preparedUrl = false;
             try {
-                const formData = new FormData();
-                formData.append('text', text);
-                
                 // Use the provided voice or the selected voice from the dropdown
                 const selectedVoice = voice || window.openaiVoice || document.getElementById('voiceSelect')?.value || 'alloy';
-                formData.append('voice', selectedVoice);
-                
-                // Include session_id if available to save interviewer speech
-                if (currentSessionId) {
-                    formData.append('session_id', currentSessionId);
-                }
-                
-                const response = await fetch('http://localhost:8000/tts', {
-                    method: 'POST',
-                    body: formData
-                });
                 
-                if (!response.ok) {
-                    throw new Error(`TTS request failed: ${response.status}`);
+                // Use the speech the server already started for this message, unless
+                // it was prepared in another voice (or has already been played)
+                const prepared = preparedSpeech.get(text);
+                preparedSpeech.delete(text);
+                let audioUrl;
+                if (prepared && prepared.voice === selectedVoice && !retry) {
+                    audioUrl = `http://localhost:8000${prepared.url}`;
+                    preparedUrl = true;
+                } else {
+                    const params = new URLSearchParams({text: text, voice: selectedVoice});
+                    
+                    // Include session_id if available to save interviewer speech; the
+                    // utterance id makes sure repeated fetches of this URL save it once
+                    if (currentSessionId) {
+                        params.append('session_id', currentSessionId);
+                        params.append('utterance_id', `${Date.now()}-${Math.random().toString(36).slice(2)}`);
+                    }
+                    audioUrl = `http://localhost:8000/tts?${params}`;
                 }
                 
-                const audioBlob = await response.blob();
-                const audioUrl = URL.createObjectURL(audioBlob);
-                
+                // The server streams the speech as it is synthesized, so playing the
+                // URL directly starts with the first chunk instead of the whole clip
                 const audio = new Audio(audioUrl);
+                audio.crossOrigin = 'anonymous';
                 window.currentTTS = audio;
                 
                 // If video recording is active, mix the TTS audio into the video recording
@@ -990,33 +1103,21 @@ HTML_CONTENT = """
                             await audioContext.resume();
                         }
                         
-                        // Create a new audio element for mixing
-                        const mixingAudio = new Audio(audioUrl);
-                        mixingAudio.muted = true; // Don't play through speakers
-                        
-                        // Wait for audio to be loaded before creating stream
-                        await new Promise((resolve, reject) => {
-                            mixingAudio.onloadeddata = resolve;
-                            mixingAudio.onerror = reject;
-                            mixingAudio.load();
-                        });
-                        
-                        // Create a media stream source from the audio element
-                        const audioStream = mixingAudio.captureStream();
-                        const ttsAudioSource = audioContext.createMediaStreamSource(audioStream);
-                        ttsAudioSource.connect(mixedAudioDestination);
-                        
-                        // Start playing the audio to capture it
-                        await mixingAudio.play();
-                        
-                        // Clean up when audio finishes
-                        mixingAudio.onended = () => {
-                            ttsAudioSource.disconnect();
-                            URL.revokeObjectURL(audioUrl);
-                            console.log('TTS audio mixing completed');
-                        };
-                        
-                        console.log('TTS audio mixed into video recording successfully');
+                        // Capture the playing element itself; a second element would
+                        // request (and record) the speech a second time
+                        const audioStream = audio.captureStream();
+                        audio.addEventListener('playing', () => {
+                            const ttsAudioSource = audioContext.createMediaStreamSource(audioStream);
+                            ttsAudioSource.connect(mixedAudioDestination);
+                            
+                            // Clean up when audio finishes
+                            audio.addEventListener('ended', () => {
+                                ttsAudioSource.disconnect();
+                                console.log('TTS audio mixing completed');
+                            }, {once: true});
+                            
+                            console.log('TTS audio mixed into video recording successfully');
+                        }, {once: true});
                     } catch (error) {
                         console.error('Error mixing TTS audio:', error);
                         // Fallback: try to play audio normally so it might be captured by microphone
@@ -1030,25 +1131,50 @@ HTML_CONTENT = """
                     });
                 }
                 
-                audio.onended = () => {
-                    URL.revokeObjectURL(audioUrl);
-                };
-                audio.onerror = (e) => {
-                    console.error('OpenAI TTS error:', e);
-                    URL.revokeObjectURL(audioUrl);
-                    // Fallback to browser speech synthesis
-                    speakWithBrowser(text);
-                };
-                
                 await audio.play();
                 
             } catch (error) {
+                // A failed stream also rejects play(), so this covers request errors too
+                if (!retry && preparedUrl) {
+                    // Prepared speech expired or was synthesized by another server worker
+                    console.log('Prepared speech unavailable, requesting it directly');
+                    return speakWithOpenAI(text, voice, true);
+                }
                 console.error('OpenAI TTS failed, falling back to browser speech:', error);
                 window.openaiTTSEnabled = false; // Disable OpenAI TTS for this session
                 speakWithBrowser(text);
             }
         }
         
+        function queueSpeech(text) {
+            ttsAudioQueue.push(text);
+            playSpeechQueue();
+        }
+        
+        async function playSpeechQueue() {
+            // Play queued sentences one after another
+            if (isPlayingTTS) return;
+            isPlayingTTS = true;
+            while (ttsAudioQueue.length > 0 && !interviewFinished) {
+                const text = ttsAudioQueue.shift();
+                if (window.openaiTTSEnabled === false) {
+                    // Browser speech synthesis queues utterances itself
+                    speakWithBrowser(text);
+                    continue;
+                }
+                await speakWithOpenAI(text);
+                const audio = window.currentTTS;
+                if (audio && !audio.paused && !audio.ended) {
+                    await new Promise(resolve => {
+                        audio.addEventListener('ended', resolve, {once: true});
+                        audio.addEventListener('pause', resolve, {once: true});
+                        audio.addEventListener('error', resolve, {once: true});
+                    });
+                }
+            }
+            isPlayingTTS = false;
+        }
+        
         function speakWithBrowser(text) {
             if (interviewFinished) return;
             if ('speechSynthesis' in window) {
@@ -1084,6 +1210,11 @@ HTML_CONTENT = """
             const selectedVoice = document.getElementById('voiceSelect').value;
             window.openaiVoice = selectedVoice;
             console.log('Voice changed to:', selectedVoice);
+            
+            // Have the server pre-synthesize the next messages in the new voice
+            if (ws && ws.readyState === WebSocket.OPEN) {
+                ws.send(JSON.stringify({voice: selectedVoice}));
+            }
         }
 
         async function captureDesktopAudio() {
@@ -1212,8 +1343,15 @@ HTML_CONTENT = """
                     
                     const data = await response.json();
                     if (data.success) {
-                        updateStatus('Interview finished. Audio and video files have been combined.');
+                        // The combines run in the background and report back as job_update messages
+                        finishJobs = {};
+                        Object.entries(data.jobs || {}).forEach(([name, jobId]) => {
+                            // A fast job may already have reported back before this response
+                            finishJobs[jobId] = {name: name, status: jobStatuses[jobId] || 'queued'};
+                        });
+                        updateStatus('Interview finished. Combining audio and video files...');
                         addMessage('Interview completed successfully!', 'system');
+                        checkFinishJobsDone();
                     } else {
                         updateStatus('Error finishing interview: ' + data.error);
                     }
@@ -1226,6 +1364,28 @@ HTML_CONTENT = """
             }
         }
 
+        function showFinishProgress(job) {
+            const entry = finishJobs[job.job_id];
+            if (!entry) {
+                return;
+            }
+            entry.status = job.status;
+            if (job.status === 'running' && job.progress && job.progress.percent !== undefined) {
+                updateStatus(`Combining ${entry.name}... ${job.progress.percent}%`);
+            } else if (job.status === 'failed') {
+                console.error(`Combining ${entry.name} failed:`, job.error);
+            }
+            checkFinishJobsDone();
+        }
+
+        function checkFinishJobsDone() {
+            const entries = Object.values(finishJobs);
+            if (entries.length && entries.every(e => e.status === 'completed' || e.status === 'failed')) {
+                updateStatus('Interview finished. Audio and video files have been combined.');
+                finishJobs = {};
+            }
+        }
+
         async function startAutoRecording() {
             try {
                 const enableVideo = document.getElementById('enableVideo').checked;
@@ -1288,9 +1448,19 @@ HTML_CONTENT = """
                     
                     audioRecorder.ondataavailable = (event) => {
                         audioChunks.push(event.data);
+                        streamAnswerChunk(event.data);
                     };
 
                     audioRecorder.onstop = async () => {
+                        if (endAnswerStream()) {
+                            // The server transcribes and saves the streamed answer
+                            audioChunks = [];
+                            if (isRecording && audioRecorder) {
+                                answerStreaming = beginAnswerStream();
+                                audioRecorder.start(STREAM_TIMESLICE_MS);
+                            }
+                            return;
+                        }
                         const audioBlob = new Blob(audioChunks, { type: audioMimeType });
                         const formData = new FormData();
                         formData.append('file', audioBlob, 'recording.webm');
@@ -1323,11 +1493,13 @@ HTML_CONTENT = """
                         
                         // Restart audio recording immediately for continuous recording
                         if (isRecording && audioRecorder) {
-                            audioRecorder.start();
+                            answerStreaming = beginAnswerStream();
+                            audioRecorder.start(STREAM_TIMESLICE_MS);
                         }
                     };
                     
-                    audioRecorder.start();
+                    answerStreaming = beginAnswerStream();
+                    audioRecorder.start(STREAM_TIMESLICE_MS);
                 }
                 
                 if (enableVideo) {
@@ -0,0 +1,144 @@
+"""
+Incrementally built combined interview audio
+
+Interviewer speech and candidate answers are all saved as 44.1 kHz MP3, and
+a stream of MP3 frames can be extended by appending more frames. So each
+clip's audio frames (without its ID3 tag or Xing/Info header) are appended
+to <session_dir>/combined_interview.mp3.part as the clip is saved, and
+finishing a session only has to rename that file to its final name, with no
+ffmpeg run. Nothing is appended to the published file: a clip saved later
+starts a new part file from a copy of it, and shows up in
+combined_interview.mp3 when it is published again.
+
+Clips that don't match the combined stream's format are not appended; the
+caller records that and falls back to a full ffmpeg combine at finish.
+
+lock(session_dir) serializes appends and publishing for a session across
+worker processes, with a file lock on <session_dir>/.combined.lock.
+"""
+
+import asyncio
+import fcntl
+import os
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import aiofiles
+
+from media import mp3_frames
+
+COMBINED_SAMPLE_RATE = 44100
+PART_SUFFIX = ".part"
+LOCK_FILENAME = ".combined.lock"
+
+
+def mp3_audio_frames(data: bytes, sample_rate: int = COMBINED_SAMPLE_RATE):
+    """Return just the audio frames of MP3 data, or None if any frame has another sample rate"""
+    frames = []
+    for offset, length, _, rate in mp3_frames(data):
+        if rate != sample_rate:
+            return None
+        frames.append(data[offset:offset + length])
+    return b"".join(frames)
+
+
+class IncrementalCombiner:
+    """Appends saved clips to each session's combined track as they arrive"""
+
+    def __init__(self, combined_filename: str = "combined_interview.mp3"):
+        self.combined_filename = combined_filename
+        self._locks = {}
+
+    def part_path(self, session_dir) -> Path:
+        return Path(session_dir) / (self.combined_filename + PART_SUFFIX)
+
+    def _local_lock(self, session_dir) -> asyncio.Lock:
+        key = str(session_dir)
+        if key not in self._locks:
+            self._locks[key] = asyncio.Lock()
+        return self._locks[key]
+
+    @asynccontextmanager
+    async def lock(self, session_dir):
+        """Per-session lock, held while a clip is appended and recorded so both keep the same order
+
+        Coroutines of this process queue on an asyncio.Lock; the holder then
+        takes the session's file lock (in a worker thread) to exclude other
+        workers.
+        """
+        async with self._local_lock(session_dir):
+            fd = os.open(str(Path(session_dir) / LOCK_FILENAME), os.O_RDWR | os.O_CREAT, 0o644)
+            locked = asyncio.get_running_loop().run_in_executor(None, fcntl.flock, fd, fcntl.LOCK_EX)
+            try:
+                await asyncio.shield(locked)
+            except BaseException:
+                # Close only once the thread is done with the descriptor
+                locked.add_done_callback(lambda _: os.close(fd))
+                raise
+            try:
+                yield
+            finally:
+                # Closing the descriptor releases the file lock
+                os.close(fd)
+
+    def forget(self, session_dir):
+        self._locks.pop(str(session_dir), None)
+
+    def _restart_part(self, session_dir) -> bool:
+        """Start a new part file from the published track, if there is one"""
+        session_dir = Path(session_dir)
+        output_path = session_dir / self.combined_filename
+        if not output_path.exists():
+            return True
+        frames = mp3_audio_frames(output_path.read_bytes())
+        if frames is None:
+            return False
+        tmp_path = session_dir / (self.combined_filename + PART_SUFFIX + ".tmp")
+        tmp_path.write_bytes(frames)
+        os.replace(tmp_path, self.part_path(session_dir))
+        return True
+
+    async def append(self, session_dir, source) -> bool:
+        """Append an MP3 clip (path or bytes) to the session's combined track
+
+        Hold lock(session_dir).
+        """
+        try:
+            if isinstance(source, (bytes, bytearray)):
+                data = bytes(source)
+            else:
+                async with aiofiles.open(source, 'rb') as f:
+                    data = await f.read()
+            frames = mp3_audio_frames(data)
+            if not frames:
+                return False
+            if not self.part_path(session_dir).exists():
+                # Only after publishing does the copy take time; clips before that just append
+                loop = asyncio.get_running_loop()
+                if not await loop.run_in_executor(None, self._restart_part, session_dir):
+                    return False
+            # A single write() on an O_APPEND file keeps clips from several workers whole
+            fd = os.open(str(self.part_path(session_dir)), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, frames)
+            finally:
+                os.close(fd)
+            return True
+        except Exception as e:
+            print(f"Error appending to combined audio: {e}")
+            return False
+
+    def publish(self, session_dir) -> bool:
+        """Rename the combined track to its final name, in constant time
+
+        Readers only ever see a complete file, and it never changes afterwards
+        since clips are only appended to a part file. True if the track is
+        already published with nothing appended since. Hold lock(session_dir).
+        """
+        session_dir = Path(session_dir)
+        output_path = session_dir / self.combined_filename
+        part_path = self.part_path(session_dir)
+        if not part_path.exists():
+            return output_path.exists()
+        os.replace(part_path, output_path)
+        return True
@@ -9,15 +9,31 @@ from pathlib import Path
 # Recording settings
 RECORDINGS_DIR = Path("recordings")
 MAX_RECORDING_SIZE_MB = 50
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # Uploads are read and written 1MB at a time
+RECORDINGS_INDEX_PATH = Path("state") / "recordings.sqlite3"  # Catalog behind /recordings
+RECORDINGS_PAGE_SIZE = 100  # Default number of sessions per /recordings page
 AUDIO_FORMAT = "mp3"  # Changed from wav to mp3 for consistency
 AUDIO_QUALITY = "high"  # high, medium, low
 
 # Session settings
 SESSION_TIMEOUT_MINUTES = 60
+STATE_STORE = "memory"  # memory, or sqlite to share sessions across uvicorn workers
+STATE_STORE_PATH = Path("state") / "sessions.sqlite3"
 AUTO_CLEANUP_DAYS = 30
 
 # Whisper settings
 WHISPER_MODEL = "base"  # tiny, base, small, medium, large
+TRANSCRIPTION_WORKERS = 2  # Whisper workers, each loads its own model
+TRANSCRIPTION_EXECUTOR = "thread"  # thread or process
+WHISPER_PRELOAD = True  # Load the models when the server starts; False loads them on the first transcription
+WHISPER_WARMUP = True  # Also transcribe a short synthetic clip at startup so the first answer isn't slow
+STREAM_WINDOW_SECONDS = 10.0  # Sliding window for streamed answers over /ws
+STREAM_STEP_SECONDS = 2.0  # Minimum interval between partial transcriptions
+
+# Media (ffmpeg) job settings
+MEDIA_JOB_CONCURRENCY = None  # Concurrent ffmpeg processes, None = CPU count
+MEDIA_JOB_TIMEOUT_SECONDS = 600  # Kill ffmpeg jobs running longer than this
+VIDEO_JOB_WORKERS = 2  # Background workers for video transcodes and end-of-session combines
 
 # Server settings
 HOST = "0.0.0.0"
@@ -37,6 +53,7 @@ SESSION_ID_PATTERN = "interview_{date}_{time}_{client_suffix}"
 # Combined audio settings
 CREATE_COMBINED_AUDIO = False  # Manual audio combining via Finish button
 COMBINED_AUDIO_FILENAME = "combined_interview.mp3"
+COMBINED_VIDEO_FILENAME = "combined_interview.mp4"
 
 # Backup settings
 AUTO_BACKUP = False
@@ -54,12 +71,40 @@ OPENAI_MODEL = "gpt-3.5-turbo"  # or "gpt-4" for better responses
 OPENAI_MAX_TOKENS = 150
 OPENAI_TEMPERATURE = 0.7
 USE_OPENAI_FOR_INTERVIEW = True
+INTERVIEWER_BACKEND = "openai"  # Default question source: "openai", "local" or "rules"; sessions may pick another with /ws?backend=
+LOCAL_LLM_MODEL_PATH = None  # GGUF model for the "local" backend (needs: pip install llama-cpp-python)
+LOCAL_LLM_CONTEXT_TOKENS = 4096
+LOCAL_LLM_THREADS = None  # CPU threads for the local model (None = llama.cpp default)
+OPENAI_STREAM_FOLLOW_UPS = True  # Stream follow-ups to the browser token by token, speaking each sentence as it completes
+CONTEXT_RECENT_TURNS = 6  # Interview turns sent verbatim; older ones are folded into a rolling summary
+CONTEXT_TOKEN_BUDGET = 3000  # Max prompt tokens for summary and history (counted with tiktoken; estimated to within ~25% without it)
+CONTEXT_SUMMARY_MAX_TOKENS = 200
+OPENAI_JSON_MODE = True  # Ask for a JSON reply in the fallback follow-up request; set False for models without JSON mode (e.g. "gpt-4")
+OPENAI_MAX_CONCURRENCY = 16  # Max API requests awaiting a response across all sessions (streams count until they start)
+OPENAI_MAX_CONNECTIONS = 20  # Pooled keep-alive HTTP connections
+OPENAI_KEEPALIVE_SECONDS = 60
+OPENAI_TIMEOUT_SECONDS = 30
+OPENAI_MAX_RETRIES = 2  # Retries with exponential backoff on transient errors
+
+# Response cache settings (generated summaries and follow-ups)
+RESPONSE_CACHE_BACKEND = "memory"  # memory, or sqlite to share across workers
+RESPONSE_CACHE_PATH = Path("cache") / "responses.sqlite3"
+RESPONSE_CACHE_MAX_ENTRIES = 1000
+RESPONSE_CACHE_MAX_BYTES = 1024 * 1024
+RESPONSE_CACHE_TTL_SECONDS = 3600
 
 # OpenAI TTS settings
 USE_OPENAI_TTS = True  # Enable AI-powered voice synthesis
 OPENAI_TTS_VOICE = "alloy"  # Options: alloy, echo, fable, onyx, nova, shimmer
 OPENAI_TTS_MODEL = "tts-1"  # Options: tts-1, tts-1-hd (HD is higher quality but slower)
 
+# TTS cache settings (interviewer speech, keyed on text, voice and model)
+TTS_CACHE_DIR = Path("cache") / "tts"
+TTS_CACHE_MAX_BYTES = 200 * 1024 * 1024  # Least recently used clips are evicted past this
+TTS_CACHE_VOICES = [OPENAI_TTS_VOICE]  # Voices pre-rendered by `python3 tts_cache.py warmup`
+TTS_CACHE_WARMUP_ON_STARTUP = False  # Pre-render the predefined questions when the server starts
+PREPARED_SPEECH_TTL_SECONDS = 600  # How long pre-synthesized greetings and follow-ups stay fetchable
+
 # Server settings
 SERVER_HOST = "localhost"
 SERVER_PORT = 8080
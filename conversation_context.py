@@ -0,0 +1,92 @@
+"""
+Bounded conversation context for the interviewer model
+
+Sending the whole interview on every turn makes prompts (and latency and
+cost) grow with the length of the interview until they no longer fit the
+model's context. Instead the prompt holds a rolling summary of the earlier
+interview plus the most recent messages verbatim, trimmed to a token budget.
+
+Messages older than the last `recent_turns` turns are folded into the
+summary by a separate chat request that runs in the background, off the
+critical path of the turn. Until it finishes, those messages are still sent
+verbatim as far as the budget allows.
+
+Tokens are counted with tiktoken (in requirements.txt). Without it they are
+estimated as one per four characters, which is typically within about 25%
+for English text but can be off by more for code, non-Latin scripts or long
+numbers, so leave headroom in the budget then.
+"""
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Per-message overhead of the chat format (role and separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def token_counter(model: str = None):
+    """Return a function counting the tokens in a string for model"""
+    if tiktoken is not None:
+        try:
+            encoding = tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding("cl100k_base")
+        except KeyError:
+            encoding = tiktoken.get_encoding("cl100k_base")
+        return lambda text: len(encoding.encode(text or ""))
+    # Roughly four characters per token for English text
+    return lambda text: (len(text or "") + 3) // 4
+
+
+class ContextWindow:
+    """Chooses which messages go into the prompt and which to fold into the summary"""
+
+    def __init__(self, recent_turns: int = 6, token_budget: int = 3000, model: str = None):
+        self.recent_turns = recent_turns
+        self.token_budget = token_budget
+        self.count_tokens = token_counter(model)
+
+    def message_tokens(self, message: dict) -> int:
+        return self.count_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+    def select(self, history: list, summarized: int = 0, summary: str = "", reserved_tokens: int = 0):
+        """Return (messages to send verbatim, index up to which history should be summarized)
+
+        history[:summarized] is already covered by summary. The newest
+        messages not in the summary are kept, newest first, while they fit the
+        budget left after the summary and reserved_tokens (system prompt,
+        latest answer); the most recent message is always kept.
+        """
+        budget = self.token_budget - reserved_tokens - (self.count_tokens(summary) if summary else 0)
+        kept = []
+        used = 0
+        for message in reversed(history[summarized:]):
+            cost = self.message_tokens(message)
+            if kept and used + cost > budget:
+                break
+            kept.append(message)
+            used += cost
+        kept.reverse()
+        fold_upto = max(summarized, len(history) - 2 * self.recent_turns)
+        return kept, fold_upto
+
+    @staticmethod
+    def summary_messages(summary: str, messages: list) -> list:
+        """Chat API messages asking to fold messages into the running summary"""
+        transcript = "\n".join(
+            f"{'Interviewer' if message['role'] == 'interviewer' else 'Candidate'}: {message['content']}"
+            for message in messages
+        )
+        return [
+            {
+                "role": "system",
+                "content": "You keep a running summary of a job interview for the interviewer. "
+                           "Update the summary with the new exchanges. Keep the candidate's background, "
+                           "skills, examples given and topics already covered. Reply with the summary only, "
+                           "in under 150 words."
+            },
+            {
+                "role": "user",
+                "content": f"Current summary:\n{summary or '(none yet)'}\n\nNew exchanges:\n{transcript}"
+            }
+        ]
@@ -13,6 +13,8 @@ import struct
 import websockets
 from pathlib import Path
 
+from manifest import read_manifest
+
 def create_valid_wav_file(filename, duration_seconds=1, sample_rate=16000):
     """Create a valid WAV file with silence"""
     with wave.open(filename, 'w') as wav_file:
@@ -81,15 +83,14 @@ async def debug_session():
             session_dir = recordings_dir / session_id
             
             if session_dir.exists():
-                audio_files = list(session_dir.glob("*.wav"))
-                metadata_files = list(session_dir.glob("*.json"))
-                print(f"   ✓ Recording saved! Audio: {len(audio_files)}, Metadata: {len(metadata_files)}")
+                entries = read_manifest(session_dir)
+                audio_entries = [e for e in entries if e.get("role") == "candidate" and e.get("kind") == "audio"]
+                print(f"   ✓ Recording saved! Audio: {len(audio_entries)}, Manifest entries: {len(entries)}")
                 
-                if metadata_files:
-                    with open(metadata_files[0], 'r') as f:
-                        metadata = json.load(f)
-                        print(f"   Session ID in metadata: {metadata.get('session_id')}")
-                        print(f"   File size: {metadata.get('file_size_mb', 0)}MB")
+                if audio_entries:
+                    metadata = audio_entries[0]
+                    print(f"   Session ID in metadata: {metadata.get('session_id')}")
+                    print(f"   File size: {metadata.get('file_size_mb', 0)}MB")
             else:
                 print(f"   ✗ Recording directory not found: {session_dir}")
             
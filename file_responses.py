@@ -0,0 +1,161 @@
+"""
+Serving recordings with HTTP caching and byte ranges
+
+Recordings are streamed from disk a chunk at a time (or handed to the server
+as a zero-copy send when it supports the ASGI "http.response.zerocopy"
+extension) instead of being read into memory. Single-range Range requests get
+a 206 so browsers can seek within long videos, and ETag / Last-Modified let
+them revalidate with a 304 instead of downloading the file again.
+"""
+
+import os
+from email.utils import formatdate, parsedate_to_datetime
+
+import aiofiles
+from starlette.responses import Response
+
+FILE_CHUNK_SIZE = 256 * 1024
+
+
+class RangeNotSatisfiable(Exception):
+    """Raised when a Range header does not overlap the file"""
+
+
+def make_etag(stat_result: os.stat_result) -> str:
+    """Strong validator derived from the file's modification time and size"""
+    return f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+
+
+def parse_range(header: str, size: int):
+    """Parse a Range header into an inclusive (start, end) byte range
+
+    Returns None when the header should be ignored (malformed, not bytes, or
+    several ranges, which are served as the full file) and raises
+    RangeNotSatisfiable when the range lies outside the file.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if not first:
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length <= 0 or size == 0:
+                raise RangeNotSatisfiable()
+            return max(size - length, 0), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start < 0 or (last and end < start):
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable()
+    return start, min(end, size - 1)
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against our ETag"""
+    if header.strip() == "*":
+        return True
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+def not_modified_since(header: str, stat_result: os.stat_result) -> bool:
+    try:
+        since = parsedate_to_datetime(header).timestamp()
+    except (TypeError, ValueError):
+        return False
+    return int(stat_result.st_mtime) <= since
+
+
+class FileRangeResponse(Response):
+    """Send bytes start..end (inclusive) of a file without loading it into memory"""
+
+    def __init__(self, path, start: int, end: int, status_code: int = 200,
+                 headers: dict = None, media_type: str = None, method: str = "GET"):
+        self.path = path
+        self.start = start
+        self.count = end - start + 1
+        self.status_code = status_code
+        self.media_type = media_type
+        self.background = None
+        self.send_header_only = method.upper() == "HEAD"
+        self.init_headers(headers)
+        self.headers["content-length"] = str(self.count)
+
+    async def __call__(self, scope, receive, send):
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers
+        })
+        if self.send_header_only or self.count <= 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        if "http.response.zerocopy" in scope.get("extensions", {}):
+            with open(self.path, "rb") as f:
+                await send({
+                    "type": "http.response.zerocopy",
+                    "file": f,
+                    "offset": self.start,
+                    "count": self.count,
+                    "more_body": False
+                })
+            return
+
+        async with aiofiles.open(self.path, "rb") as f:
+            await f.seek(self.start)
+            remaining = self.count
+            while remaining > 0:
+                chunk = await f.read(min(FILE_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                # The file shrank while being sent; end the body cleanly
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def file_response(request, path, media_type: str, headers: dict = None) -> Response:
+    """Build the 200/206/304/416 response for a GET or HEAD of a file"""
+    stat_result = os.stat(path)
+    size = stat_result.st_size
+    etag = make_etag(stat_result)
+    last_modified = formatdate(stat_result.st_mtime, usegmt=True)
+    headers = dict(headers or {})
+    headers.update({"accept-ranges": "bytes", "etag": etag, "last-modified": last_modified})
+
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    if (if_none_match is not None and etag_matches(if_none_match, etag)) or \
+            (if_none_match is None and if_modified_since and not_modified_since(if_modified_since, stat_result)):
+        return Response(status_code=304, headers={"etag": etag, "last-modified": last_modified})
+
+    byte_range = None
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range in (etag, last_modified)):
+        try:
+            byte_range = parse_range(range_header, size)
+        except RangeNotSatisfiable:
+            return Response(status_code=416, headers={"content-range": f"bytes */{size}", "accept-ranges": "bytes"})
+
+    if byte_range is None:
+        return FileRangeResponse(path, 0, size - 1, headers=headers, media_type=media_type, method=request.method)
+
+    start, end = byte_range
+    headers["content-range"] = f"bytes {start}-{end}/{size}"
+    return FileRangeResponse(path, start, end, status_code=206, headers=headers,
+                             media_type=media_type, method=request.method)
@@ -0,0 +1,96 @@
+"""
+Fallback follow-ups in a single round trip
+
+When the interviewer model can't be used for a turn, the fallback follow-up
+is a short summary of the answer plus one question. Both come from a single
+chat request that replies with a JSON object, parsed here without any further
+model calls. Answers that are obviously a request to move on, or too short
+to follow up on, are handled locally without calling the model at all.
+"""
+
+import json
+import re
+
+# Ways the candidate might ask to move to the next question
+SKIP_PHRASES = [
+    "next question",
+    "move on",
+    "let's move on",
+    "next topic",
+    "different question",
+    "don't ask that again",
+    "stop asking",
+    "change the question",
+    "ask something else"
+]
+
+# Answers with fewer words than this are asked to elaborate
+SHORT_ANSWER_WORDS = 10
+
+DEFAULT_SUMMARY = "Thanks for sharing that."
+SKIP_SUMMARY = "Sure, let's move on."
+ELABORATE_QUESTION = "Could you elaborate a bit more?"
+
+_JSON_OBJECT = re.compile(r"\{.*\}", re.DOTALL)
+_LABELLED_LINE = re.compile(r"^\s*[\"']?(summary|follow[ _-]?up|question)[\"']?\s*[:=]\s*(.+?)\s*,?\s*$",
+                            re.IGNORECASE | re.MULTILINE)
+
+
+def is_skip_request(response: str) -> bool:
+    """Whether the candidate asked to move on to another question"""
+    text = response.lower()
+    return any(phrase in text for phrase in SKIP_PHRASES)
+
+
+def is_short_answer(response: str) -> bool:
+    return len(response.split()) < SHORT_ANSWER_WORDS
+
+
+def follow_up_messages(question_type: str, response: str) -> list:
+    """Chat API messages asking for the summary and the follow-up as one JSON object"""
+    return [
+        {
+            "role": "system",
+            "content": "You are a friendly and professional AI interviewer. Reply with a JSON object with two "
+                       "string fields:\n"
+                       "\"summary\": one brief sentence summarizing what the person said, addressing them as "
+                       "'You' and focusing on the key points only.\n"
+                       f"\"follow_up\": one clear, direct follow-up question about their answer ({question_type}) "
+                       "that is easy to answer.\n"
+                       "Reply with the JSON object only."
+        },
+        {"role": "user", "content": f"Person's response: {response}"}
+    ]
+
+
+def _clean(value) -> str:
+    return value.strip().strip("\"'").strip() if isinstance(value, str) else ""
+
+
+def parse_follow_up(text: str):
+    """Return (summary, follow_up) from the model's reply, or None if it has no follow-up
+
+    The reply should be a JSON object, but a fenced or prefixed object and
+    "Summary: ... / Follow-up: ..." lines are accepted too. A missing summary
+    falls back to DEFAULT_SUMMARY.
+    """
+    if not text:
+        return None
+    fields = {}
+    match = _JSON_OBJECT.search(text)
+    if match:
+        try:
+            data = json.loads(match.group(0))
+            if isinstance(data, dict):
+                fields = {key.lower().replace("-", "_"): value for key, value in data.items()}
+        except ValueError:
+            pass
+    if not fields:
+        for label, value in _LABELLED_LINE.findall(text):
+            label = label.lower()
+            fields.setdefault("summary" if label == "summary" else "follow_up", value)
+    summary = _clean(fields.get("summary"))
+    follow_up = _clean(fields.get("follow_up") or fields.get("question"))
+    if not follow_up:
+        return None
+    return summary or DEFAULT_SUMMARY, follow_up
@@ -0,0 +1,59 @@
+"""
+Predefined interview questions and the follow-ups used when no LLM is available
+
+Every candidate hears these verbatim, which makes them worth pre-rendering
+into the TTS cache (see tts_cache.py warmup).
+"""
+
+INTERVIEW_QUESTIONS = {
+    "introduction": {
+        "question": "Hello! I'm your AI interviewer today. Could you please introduce yourself?",
+        "follow_ups": [
+            "What was your most challenging project?",
+            "How did you handle difficult situations in your previous roles?",
+            "What skills did you develop from these experiences?"
+        ]
+    },
+    "experience": {
+        "question": "Could you tell me about your relevant experience?",
+        "follow_ups": [
+            "What was your most challenging project?",
+            "How did you handle difficult situations in your previous roles?",
+            "What skills did you develop from these experiences?"
+        ]
+    },
+    "skills": {
+        "question": "What are your key technical skills?",
+        "follow_ups": [
+            "How do you stay updated with new technologies?",
+            "Can you give an example of how you applied these skills?",
+            "What areas are you looking to improve?"
+        ]
+    },
+    "problem_solving": {
+        "question": "How do you approach problem-solving in your work?",
+        "follow_ups": [
+            "Can you share a specific example?",
+            "What was the outcome?",
+            "What did you learn from that experience?"
+        ]
+    },
+    "future": {
+        "question": "Where do you see yourself in the next 5 years?",
+        "follow_ups": [
+            "What steps are you taking to achieve these goals?",
+            "How does this role align with your career path?",
+            "What are you most excited about in your career?"
+        ]
+    }
+}
+
+
+def predefined_prompts() -> list:
+    """Every predefined question and follow-up, once each, in interview order"""
+    prompts = []
+    for question in INTERVIEW_QUESTIONS.values():
+        for text in [question["question"]] + question["follow_ups"]:
+            if text not in prompts:
+                prompts.append(text)
+    return prompts
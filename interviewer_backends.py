@@ -0,0 +1,185 @@
+"""
+Interchangeable backends for the interviewer's questions
+
+Greetings, follow-ups and conversation summaries are generated by whichever
+InterviewerBackend the session uses:
+
+- "openai": the OpenAI chat API through the shared client
+- "local": a GGUF model run on this machine's CPU with llama.cpp
+  (needs the optional llama-cpp-python package and LOCAL_LLM_MODEL_PATH)
+- "rules": no model at all; every turn uses the predefined questions
+
+Each session picks a backend when it connects, falling back to the default
+(and then to the rule-based backend) if the one it asked for isn't available.
+"""
+
+import asyncio
+import os
+import threading
+
+try:
+    import llama_cpp
+except ImportError:
+    llama_cpp = None
+
+
+class InterviewerBackend:
+    """A chat model the interviewer's questions come from
+
+    Messages use the chat API format. complete() returns the reply, or None
+    when the backend has nothing to say, in which case the caller falls back
+    to the predefined questions. Backends with generates_text False never
+    have anything to say, so callers can skip asking them.
+    """
+
+    name = None
+    model = None
+    generates_text = True
+
+    def available(self) -> bool:
+        return True
+
+    async def complete(self, messages: list, max_tokens: int, temperature: float, json_mode: bool = False):
+        raise NotImplementedError
+
+    async def stream(self, messages: list, max_tokens: int, temperature: float):
+        """Yield the reply as text deltas; by default the whole reply at once"""
+        text = await self.complete(messages, max_tokens, temperature)
+        if text:
+            yield text
+
+
+class OpenAIBackend(InterviewerBackend):
+    """The OpenAI chat API, through the shared pooled client"""
+
+    name = "openai"
+
+    def __init__(self, model: str, api_key: str = None):
+        self.model = model
+        self.api_key = api_key
+
+    def available(self) -> bool:
+        return bool(self.api_key)
+
+    async def complete(self, messages: list, max_tokens: int, temperature: float, json_mode: bool = False):
+        from openai_client import chat_completion
+        response = await chat_completion(
+            model=self.model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            **({"response_format": {"type": "json_object"}} if json_mode else {})
+        )
+        return response.choices[0].message.content
+
+    async def stream(self, messages: list, max_tokens: int, temperature: float):
+        from openai_client import chat_completion_stream
+        async for delta in chat_completion_stream(
+            model=self.model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature
+        ):
+            yield delta
+
+
+class LocalLLMBackend(InterviewerBackend):
+    """A local GGUF model run with llama.cpp
+
+    The model is loaded on first use and generates one reply at a time in a
+    worker thread, so the event loop keeps serving other sessions meanwhile.
+    """
+
+    name = "local"
+
+    def __init__(self, model_path: str = None, context_tokens: int = 2048, threads: int = None):
+        self.model_path = model_path
+        self.model = os.path.basename(model_path) if model_path else None
+        self.context_tokens = context_tokens
+        self.threads = threads
+        self._llm = None
+        self._lock = None
+
+    def available(self) -> bool:
+        return llama_cpp is not None and bool(self.model_path) and os.path.exists(self.model_path)
+
+    def _get_lock(self) -> asyncio.Lock:
+        # Created lazily so it binds to the server's running event loop
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    def _create(self, messages: list, max_tokens: int, temperature: float, json_mode: bool = False,
+                stream: bool = False):
+        if self._llm is None:
+            self._llm = llama_cpp.Llama(
+                model_path=self.model_path,
+                n_ctx=self.context_tokens,
+                n_threads=self.threads,
+                verbose=False
+            )
+        return self._llm.create_chat_completion(
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stream=stream,
+            **({"response_format": {"type": "json_object"}} if json_mode else {})
+        )
+
+    async def complete(self, messages: list, max_tokens: int, temperature: float, json_mode: bool = False):
+        loop = asyncio.get_running_loop()
+        async with self._get_lock():
+            response = await loop.run_in_executor(None, self._create, messages, max_tokens, temperature, json_mode)
+        return response["choices"][0]["message"]["content"]
+
+    async def stream(self, messages: list, max_tokens: int, temperature: float):
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        stop = threading.Event()
+
+        def generate():
+            try:
+                for chunk in self._create(messages, max_tokens, temperature, stream=True):
+                    if stop.is_set():
+                        break
+                    delta = chunk["choices"][0]["delta"].get("content")
+                    if delta:
+                        loop.call_soon_threadsafe(queue.put_nowait, delta)
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, None)
+
+        async with self._get_lock():
+            worker = loop.run_in_executor(None, generate)
+            try:
+                while True:
+                    item = await queue.get()
+                    if item is None:
+                        break
+                    if isinstance(item, Exception):
+                        raise item
+                    yield item
+            finally:
+                # Keep the model locked until the thread has stopped using it
+                stop.set()
+                await worker
+
+
+class RuleBasedBackend(InterviewerBackend):
+    """No model: the interviewer asks the predefined questions"""
+
+    name = "rules"
+    generates_text = False
+
+    async def complete(self, messages: list, max_tokens: int, temperature: float, json_mode: bool = False):
+        return None
+
+
+def choose_backend(backends: dict, requested: str = None, default: str = "openai") -> InterviewerBackend:
+    """The requested backend if it's available, else the default, else the rule-based one"""
+    for name in (requested, default):
+        backend = backends.get(name) if name else None
+        if backend is not None and backend.available():
+            return backend
+    return backends.get("rules") or RuleBasedBackend()
@@ -0,0 +1,344 @@
+"""
+Background jobs for slow media work
+
+Uploads are persisted first and their processing (e.g. the WebM to MP4
+transcode behind /save-video) is queued here, so the request can return a
+job id straight away. A bounded pool of asyncio workers drains the queue.
+
+Each job is recorded as JSON under its session directory
+(recordings/<session_id>/jobs/<job_id>.json) whenever its status changes, so
+GET /jobs/{id} works from any worker, and a pointer file
+(recordings/.jobs/<job_id>) maps each job id to its session. Jobs that were
+queued or running when the server stopped are picked up again on the next
+start, by whichever worker takes the recovery lease. Finished jobs are only
+kept in memory for a while; after that they are read back from disk.
+
+Listeners only hear about jobs run by their own worker. A session's WebSocket
+may be on another worker, so watch() polls the session's job records for
+updates made elsewhere; running jobs save their progress every so often for it.
+
+A job may depend on other jobs (e.g. a session's video combine on its
+pending transcodes); it stays queued until they have finished.
+"""
+
+import asyncio
+import fcntl
+import json
+import os
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+# Directory under recordings_dir holding job pointers and the recovery lease
+INDEX_DIRNAME = ".jobs"
+RECOVERY_LEASE_FILENAME = "recover.lock"
+
+# Finished jobs kept in memory for quick lookups
+FINISHED_JOBS_KEPT = 256
+
+# Running jobs save their progress at most this often, for watchers on other workers
+PROGRESS_SAVE_SECONDS = 1.0
+
+# How often watch() re-reads a session's job records
+WATCH_POLL_SECONDS = 1.0
+
+
+class JobQueue:
+    """Bounded pool of workers running persisted background jobs"""
+
+    def __init__(self, recordings_dir, workers: int = 2):
+        self.recordings_dir = Path(recordings_dir)
+        self.workers = max(1, workers)
+        self.handlers = {}
+        self.listeners = []
+        # Unfinished jobs of this worker, and the most recently finished ones
+        self.jobs = {}
+        self._recent = OrderedDict()
+        self._finished = {}
+        self._queue = None
+        self._tasks = []
+        self._lease = None
+        self._created = time.time()
+
+    def register(self, job_type: str, handler):
+        """Register the coroutine handler(job, report_progress) run for a job type"""
+        self.handlers[job_type] = handler
+
+    def add_listener(self, listener):
+        """Register a coroutine called with a copy of the job on every update"""
+        self.listeners.append(listener)
+
+    def _get_queue(self) -> asyncio.Queue:
+        # Created lazily so it binds to the server's running event loop
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        return self._queue
+
+    def _job_path(self, session_id: str, job_id: str) -> Path:
+        return self.recordings_dir / session_id / "jobs" / f"{job_id}.json"
+
+    def _pointer_path(self, job_id: str) -> Path:
+        return self.recordings_dir / INDEX_DIRNAME / job_id
+
+    def _write_pointer(self, job: dict):
+        path = self._pointer_path(job["job_id"])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(job["session_id"])
+
+    def _save(self, job: dict):
+        """Write the job record atomically so a crash never leaves half a file"""
+        path = self._job_path(job["session_id"], job["job_id"])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(job, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def _notify(self, job: dict):
+        for listener in self.listeners:
+            asyncio.ensure_future(self._call_listener(listener, dict(job)))
+
+    async def _call_listener(self, listener, job: dict):
+        try:
+            await listener(job)
+        except Exception as e:
+            print(f"Error notifying job listener: {e}")
+
+    def _enqueue(self, job: dict):
+        """Queue a job, once the jobs it depends on have finished"""
+        depends_on = job.get("depends_on")
+        if depends_on:
+            asyncio.ensure_future(self._enqueue_after(job["job_id"], depends_on))
+        else:
+            self._get_queue().put_nowait(job["job_id"])
+
+    async def _enqueue_after(self, job_id: str, depends_on: list):
+        for dependency in depends_on:
+            try:
+                await self.wait(dependency)
+            except Exception as e:
+                print(f"Error waiting for job {dependency}: {e}")
+        self._get_queue().put_nowait(job_id)
+
+    def submit(self, job_type: str, session_id: str, params: dict = None, depends_on: list = None) -> dict:
+        """Persist a new job and queue it (after the jobs in depends_on), returning its record"""
+        if job_type not in self.handlers:
+            raise ValueError(f"Unknown job type: {job_type}")
+        now = time.time()
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "type": job_type,
+            "session_id": session_id,
+            "status": QUEUED,
+            "params": params or {},
+            "depends_on": list(depends_on or []),
+            "progress": None,
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now
+        }
+        self.jobs[job["job_id"]] = job
+        self._finished[job["job_id"]] = asyncio.Event()
+        self._save(job)
+        self._write_pointer(job)
+        self._enqueue(job)
+        self._notify(job)
+        return dict(job)
+
+    async def wait(self, job_id: str, timeout: float = None, poll_seconds: float = 0.5) -> dict:
+        """Wait for a job to finish and return its record
+
+        Jobs run by this worker are awaited directly; others are polled on disk.
+        """
+        finished = self._finished.get(job_id)
+        if finished is not None:
+            await asyncio.wait_for(finished.wait(), timeout)
+            return self.get(job_id)
+
+        async def poll():
+            while True:
+                job = self.get(job_id)
+                if job is None or job["status"] in (COMPLETED, FAILED):
+                    return job
+                await asyncio.sleep(poll_seconds)
+        return await asyncio.wait_for(poll(), timeout)
+
+    def session_jobs(self, session_id: str) -> list:
+        """Records of all of a session's jobs, as last saved by whichever worker runs them"""
+        jobs = []
+        for path in (self.recordings_dir / session_id / "jobs").glob("*.json"):
+            try:
+                with open(path) as f:
+                    jobs.append(json.load(f))
+            except (OSError, ValueError) as e:
+                print(f"Error reading job {path}: {e}")
+        return jobs
+
+    def outstanding(self, session_id: str, job_type: str = None) -> list:
+        """Ids of a session's queued or running jobs (of job_type), on any worker"""
+        return [
+            job["job_id"] for job in self.session_jobs(session_id)
+            if job.get("status") in (QUEUED, RUNNING) and job_type in (None, job.get("type"))
+        ]
+
+    async def watch(self, session_id: str, listener, poll_seconds: float = WATCH_POLL_SECONDS):
+        """Call listener with a session's jobs run by other workers whenever they change, until cancelled
+
+        Jobs already there when the watch starts are only reported once they change.
+        """
+        loop = asyncio.get_event_loop()
+        seen = {}
+        first = True
+        while True:
+            for job in await loop.run_in_executor(None, self.session_jobs, session_id):
+                job_id = job["job_id"]
+                changed = seen.get(job_id) != job.get("updated_at")
+                seen[job_id] = job.get("updated_at")
+                # Listeners hear about this worker's own jobs directly
+                if changed and not first and job_id not in self.jobs and job_id not in self._recent:
+                    await self._call_listener(listener, job)
+            first = False
+            await asyncio.sleep(poll_seconds)
+
+    def get(self, job_id: str):
+        """Return a job record, reading it from disk if this worker doesn't have it"""
+        job = self.jobs.get(job_id) or self._recent.get(job_id)
+        if job is not None:
+            return dict(job)
+        if not job_id.isalnum():
+            return None
+        try:
+            session_id = self._pointer_path(job_id).read_text().strip()
+            with open(self._job_path(session_id, job_id)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Error reading job {job_id}: {e}")
+            return None
+
+    def _take_recovery_lease(self) -> bool:
+        """Hold an exclusive lock for as long as this queue runs, so only one worker recovers"""
+        path = self.recordings_dir / INDEX_DIRNAME / RECOVERY_LEASE_FILENAME
+        path.parent.mkdir(parents=True, exist_ok=True)
+        lease = open(path, "a")
+        try:
+            fcntl.flock(lease, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lease.close()
+            return False
+        self._lease = lease
+        return True
+
+    def _release_recovery_lease(self):
+        if self._lease is not None:
+            self._lease.close()
+            self._lease = None
+
+    def recover(self) -> int:
+        """Re-queue jobs left queued or running by a previous run
+
+        Only the worker holding the recovery lease does this, and only for jobs
+        last updated before this queue was created, so jobs just submitted by
+        another worker are never run twice.
+        """
+        if self._lease is None and not self._take_recovery_lease():
+            return 0
+        recovered = 0
+        for path in self.recordings_dir.glob("*/jobs/*.json"):
+            try:
+                with open(path) as f:
+                    job = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Error reading job {path}: {e}")
+                continue
+            if job.get("status") not in (QUEUED, RUNNING) or job["job_id"] in self.jobs:
+                continue
+            if job.get("updated_at", 0) >= self._created:
+                continue
+            job["status"] = QUEUED
+            job["progress"] = None
+            job["updated_at"] = time.time()
+            self.jobs[job["job_id"]] = job
+            self._finished[job["job_id"]] = asyncio.Event()
+            self._save(job)
+            self._write_pointer(job)
+            self._enqueue(job)
+            recovered += 1
+        return recovered
+
+    async def start(self):
+        """Recover unfinished jobs and start the workers"""
+        recovered = self.recover()
+        if recovered:
+            print(f"Re-queued {recovered} unfinished background job(s)")
+        self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """Stop the workers; interrupted jobs stay on disk and resume on restart"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._release_recovery_lease()
+
+    async def _worker(self):
+        queue = self._get_queue()
+        while True:
+            job_id = await queue.get()
+            try:
+                await self._run(self.jobs[job_id])
+            finally:
+                queue.task_done()
+
+    async def _run(self, job: dict):
+        saved = {"at": 0.0}
+
+        def report_progress(progress: dict):
+            job["progress"] = progress
+            job["updated_at"] = time.time()
+            if job["updated_at"] - saved["at"] >= PROGRESS_SAVE_SECONDS:
+                self._save(job)
+                saved["at"] = job["updated_at"]
+            self._notify(job)
+
+        job["status"] = RUNNING
+        job["started_at"] = job["updated_at"] = time.time()
+        self._save(job)
+        self._notify(job)
+
+        try:
+            job["result"] = await self.handlers[job["type"]](dict(job), report_progress)
+            job["status"] = COMPLETED
+        except asyncio.CancelledError:
+            # Shutting down: leave the job marked running so recover() re-queues it
+            raise
+        except Exception as e:
+            print(f"Background job {job['job_id']} failed: {e}")
+            job["status"] = FAILED
+            job["error"] = str(e)
+
+        job["finished_at"] = job["updated_at"] = time.time()
+        self._save(job)
+        self._notify(job)
+        # Keep only the most recently finished jobs in memory
+        self.jobs.pop(job["job_id"], None)
+        self._recent[job["job_id"]] = job
+        while len(self._recent) > FINISHED_JOBS_KEPT:
+            self._recent.popitem(last=False)
+        finished = self._finished.pop(job["job_id"], None)
+        if finished is not None:
+            finished.set()
+
+    def stats(self) -> dict:
+        counts = {}
+        for job in list(self.jobs.values()) + list(self._recent.values()):
+            counts[job["status"]] = counts.get(job["status"], 0) + 1
+        return {"workers": self.workers, "queued": self._get_queue().qsize(), "jobs": counts}
@@ -13,7 +13,15 @@ from pathlib import Path
 from datetime import datetime
 import argparse
 
-RECORDINGS_DIR = Path("recordings")
+from recordings_index import RecordingsIndex
+from manifest import read_manifest
+# The same paths and filenames as the server, so the index it reads is the one kept up to date here
+from settings import RECORDINGS_DIR, RECORDINGS_INDEX_PATH, COMBINED_AUDIO_FILENAME, COMBINED_VIDEO_FILENAME
+
+def open_index(index_path) -> RecordingsIndex:
+    """Open the recordings index, classifying combined files by the configured names"""
+    return RecordingsIndex(index_path, combined_audio_filename=COMBINED_AUDIO_FILENAME,
+                           combined_video_filename=COMBINED_VIDEO_FILENAME)
 
 def list_recordings():
     """List all available interview recordings"""
@@ -26,6 +34,16 @@ def list_recordings():
     
     for session_dir in RECORDINGS_DIR.iterdir():
         if session_dir.is_dir():
+            entries = read_manifest(session_dir)
+            if entries:
+                audio = [e for e in entries if e.get("kind") == "audio" and e.get("role") != "combined"]
+                print(f"\nSession: {session_dir.name}")
+                print(f"  Audio Files: {len(audio)}")
+                print(f"  Video Files: {len([e for e in entries if e.get('kind') == 'video'])}")
+                print(f"  Duration: {sum(e.get('duration') or 0 for e in audio):.1f}s")
+                print(f"  Start Time: {entries[0].get('timestamp', 'Unknown')}")
+                continue
+            
             audio_files = list(session_dir.glob("*.wav"))
             metadata_files = list(session_dir.glob("*.json"))
             
@@ -53,6 +71,19 @@ def show_session_details(session_id):
     print(f"\nSession Details: {session_id}")
     print("=" * 50)
     
+    entries = read_manifest(session_dir)
+    if entries:
+        print(f"Recordings ({len(entries)}):")
+        for entry in entries:
+            duration = entry.get("duration")
+            duration_text = f"{duration:.1f}s" if duration is not None else "unknown length"
+            print(f"  {entry['order'] + 1}. {entry['filename']} [{entry.get('role')} {entry.get('kind')}] - {duration_text}")
+            if entry.get("interview_question"):
+                print(f"    - Question: {entry['interview_question']}")
+            if entry.get("text"):
+                print(f"    - Text: {entry['text']}")
+        return
+    
     audio_files = list(session_dir.glob("*.wav"))
     metadata_files = list(session_dir.glob("*.json"))
     
@@ -128,8 +159,10 @@ def cleanup_old_recordings(days_old=30):
     print(f"Cleaning up recordings older than {days_old} days...")
     
     removed_count = 0
+    index = open_index(RECORDINGS_INDEX_PATH) if RECORDINGS_INDEX_PATH.exists() else None
     for session_dir in RECORDINGS_DIR.iterdir():
-        if session_dir.is_dir():
+        # Dot directories (e.g. .jobs) hold the server's bookkeeping, not sessions
+        if session_dir.is_dir() and not session_dir.name.startswith("."):
             # Check if any file in the session is older than cutoff
             session_old = False
             for file_path in session_dir.iterdir():
@@ -141,16 +174,26 @@ def cleanup_old_recordings(days_old=30):
                 shutil.rmtree(session_dir)
                 print(f"  Removed: {session_dir.name}")
                 removed_count += 1
+                if index:
+                    index.remove_session(session_dir.name)
     
     print(f"Cleanup complete. Removed {removed_count} old sessions.")
 
+def rebuild_index(index_path: Path = None):
+    """Rebuild the recordings index used by the server's /recordings endpoint"""
+    index_path = Path(index_path) if index_path else RECORDINGS_INDEX_PATH
+    print(f"Rebuilding recordings index at {index_path} from {RECORDINGS_DIR}...")
+    count = open_index(index_path).rebuild(RECORDINGS_DIR)
+    print(f"Index rebuilt with {count} sessions.")
+
 def main():
     parser = argparse.ArgumentParser(description="Manage AI Interview Recordings")
-    parser.add_argument("action", choices=["list", "show", "download", "archive", "cleanup"],
+    parser.add_argument("action", choices=["list", "show", "download", "archive", "cleanup", "rebuild-index"],
                        help="Action to perform")
     parser.add_argument("--session", "-s", help="Session ID for show/download/archive actions")
     parser.add_argument("--output", "-o", help="Output directory or file")
     parser.add_argument("--days", "-d", type=int, default=30, help="Days old for cleanup (default: 30)")
+    parser.add_argument("--index", help=f"Recordings index for rebuild-index (default: {RECORDINGS_INDEX_PATH})")
     
     args = parser.parse_args()
     
@@ -173,6 +216,8 @@ def main():
         create_session_archive(args.session, args.output)
     elif args.action == "cleanup":
         cleanup_old_recordings(args.days)
+    elif args.action == "rebuild-index":
+        rebuild_index(args.index)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,171 @@
+"""
+Per-session recording manifest
+
+Every recording written to a session directory (candidate answers,
+interviewer speech, videos, combined outputs) is described by one JSON line
+appended to <session_dir>/manifest.jsonl, replacing the separate
+metadata_*.json / interviewer_metadata_*.json files. A later line for the
+same filename updates that entry (e.g. the MP4 produced by a transcode job)
+without rewriting the file, so the manifest stays append-only.
+
+Each recording also gets a per-session sequence number ("seq") from
+next_sequence(), a counter kept in <session_dir>/.sequence under a file lock
+so it stays monotonic across workers and restarts. Entries are returned in
+sequence order (falling back to the order they were first written), with their role
+(candidate, interviewer or combined), kind (audio or video) and duration, so
+listing, combining and analytics don't need to glob or stat the directory.
+Reads are served from an in-memory view that only parses lines appended
+since the last read.
+"""
+
+import fcntl
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+MANIFEST_FILENAME = "manifest.jsonl"
+SEQUENCE_FILENAME = ".sequence"
+
+
+def merge_records(records, entries: OrderedDict = None) -> OrderedDict:
+    """Fold manifest records into entries keyed by filename, keeping first-seen order"""
+    entries = entries if entries is not None else OrderedDict()
+    for record in records:
+        filename = record.get("filename")
+        if not filename:
+            continue
+        if filename in entries:
+            entries[filename].update(record)
+        else:
+            entries[filename] = dict(record)
+    return entries
+
+
+def ordered_entries(entries) -> list:
+    """Sort merged entries by sequence number, first-written first for entries without one"""
+    ordered = sorted(enumerate(entries), key=lambda item: (item[1].get("seq", 0), item[0]))
+    return [dict(entry, order=i) for i, (_, entry) in enumerate(ordered)]
+
+
+def read_manifest(session_dir) -> list:
+    """Read a session's manifest from disk, returning [] if it has none"""
+    path = Path(session_dir) / MANIFEST_FILENAME
+    if not path.exists():
+        return []
+    records = []
+    with open(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    return ordered_entries(merge_records(records).values())
+
+
+class _ManifestView:
+    def __init__(self):
+        self.offset = 0
+        self.entries = OrderedDict()
+
+
+class ManifestStore:
+    """Appends to session manifests and keeps a cached view of recently read ones"""
+
+    def __init__(self, max_sessions: int = 256):
+        self.max_sessions = max_sessions
+        self._views = OrderedDict()
+        self._lock = threading.RLock()
+
+    def path(self, session_dir) -> Path:
+        return Path(session_dir) / MANIFEST_FILENAME
+
+    def exists(self, session_dir) -> bool:
+        return self.path(session_dir).exists()
+
+    def next_sequence(self, session_dir) -> int:
+        """Allocate the session's next sequence number, starting at 1"""
+        path = Path(session_dir) / SEQUENCE_FILENAME
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(str(path), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                seq = int(os.read(fd, 32).strip() or 0) + 1
+            except ValueError:
+                seq = 1
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.ftruncate(fd, 0)
+            os.write(fd, str(seq).encode())
+            return seq
+        finally:
+            os.close(fd)
+
+    def append(self, session_dir, entry: dict) -> dict:
+        """Append an entry (or an update to an existing filename) to the manifest"""
+        record = dict(entry)
+        record.setdefault("recorded_at", time.time())
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        path = self.path(session_dir)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # One write() on an O_APPEND file, so lines from several workers never interleave
+        fd = os.open(str(path), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line.encode())
+        finally:
+            os.close(fd)
+        return record
+
+    def update(self, session_dir, filename: str, **fields) -> dict:
+        """Record new fields for an existing entry"""
+        return self.append(session_dir, dict(fields, filename=filename))
+
+    def entries(self, session_dir, role: str = None, kind: str = None) -> list:
+        """Entries in sequence order (with an "order" index), optionally filtered"""
+        path = self.path(session_dir)
+        key = str(path)
+        with self._lock:
+            view = self._views.pop(key, None) or _ManifestView()
+            self._views[key] = view
+            while len(self._views) > self.max_sessions:
+                self._views.popitem(last=False)
+            self._refresh(path, view)
+            entries = ordered_entries(view.entries.values())
+
+        if role is not None:
+            entries = [entry for entry in entries if entry.get("role") == role]
+        if kind is not None:
+            entries = [entry for entry in entries if entry.get("kind") == kind]
+        return entries
+
+    def _refresh(self, path: Path, view: _ManifestView):
+        """Parse only the complete lines appended since the last read"""
+        try:
+            size = path.stat().st_size
+        except FileNotFoundError:
+            view.offset = 0
+            view.entries = OrderedDict()
+            return
+        if size < view.offset:
+            # Replaced or truncated: start over
+            view.offset = 0
+            view.entries = OrderedDict()
+        if size == view.offset:
+            return
+        with open(path, "rb") as f:
+            f.seek(view.offset)
+            data = f.read(size - view.offset)
+        end = data.rfind(b"\n") + 1
+        records = []
+        for line in data[:end].splitlines():
+            if line.strip():
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    print(f"Skipping malformed manifest line in {path}")
+        merge_records(records, view.entries)
+        view.offset += end
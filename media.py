@@ -0,0 +1,170 @@
+"""
+ffmpeg helpers for candidate answers
+
+Audio is decoded straight to 16 kHz mono float32 arrays on an ffmpeg stdout
+pipe, which is what Whisper's transcribe() accepts, so nothing is written to
+temporary files and Whisper never has to spawn its own ffmpeg. Inputs can be
+file paths, bytes already in memory or an async stream of upload chunks (fed
+on stdin). Commands run through the shared non-blocking media runner.
+"""
+
+import subprocess
+
+import numpy as np
+
+from media_runner import media_runner
+
+WHISPER_SAMPLE_RATE = 16000
+
+_ffmpeg_available = None
+
+
+def check_ffmpeg(refresh: bool = False) -> bool:
+    """Check once whether ffmpeg can be run and remember the result"""
+    global _ffmpeg_available
+    if _ffmpeg_available is None or refresh:
+        try:
+            result = subprocess.run(['ffmpeg', '-version'], capture_output=True, text=True)
+            _ffmpeg_available = result.returncode == 0
+        except FileNotFoundError:
+            _ffmpeg_available = False
+        if not _ffmpeg_available:
+            print("Warning: ffmpeg not found. Audio conversion will be skipped.")
+    return _ffmpeg_available
+
+
+def input_args(source):
+    """ffmpeg input arguments and stdin payload for a file path, bytes or an async chunk stream"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return ['-i', 'pipe:0'], bytes(source)
+    if hasattr(source, '__aiter__'):
+        return ['-i', 'pipe:0'], source
+    return ['-i', str(source)], None
+
+
+def pcm_output_args() -> list:
+    """ffmpeg output arguments producing Whisper-ready PCM on stdout"""
+    return [
+        '-map', '0:a:0',
+        '-f', 's16le', '-acodec', 'pcm_s16le',
+        '-ar', str(WHISPER_SAMPLE_RATE),
+        '-ac', '1',
+        'pipe:1'
+    ]
+
+
+def mp3_output_args(mp3_path: str) -> list:
+    """ffmpeg output arguments for a saved candidate answer"""
+    return [
+        '-map', '0:a:0',
+        '-acodec', 'mp3',
+        '-ab', '128k',  # 128 kbps bitrate
+        '-ar', '44100',
+        '-ac', '1',
+        '-y', str(mp3_path)
+    ]
+
+
+def decode_audio_command(source):
+    """Command and stdin payload that decode a source to 16 kHz PCM on stdout"""
+    args, data = input_args(source)
+    return ['ffmpeg', '-loglevel', 'error'] + args + pcm_output_args(), data
+
+
+def pcm16_to_float32(data: bytes) -> np.ndarray:
+    """Convert signed 16-bit little-endian PCM to the float32 samples Whisper expects"""
+    return np.frombuffer(data, np.int16).astype(np.float32) / 32768.0
+
+
+async def decode_audio(source, allow_truncated: bool = False) -> np.ndarray:
+    """Decode a path or bytes (audio or video) to 16 kHz mono float32 samples
+
+    With allow_truncated, output decoded before an error is still returned,
+    which is what a stream cut mid-cluster by MediaRecorder timeslices needs.
+    """
+    cmd, data = decode_audio_command(source)
+    result = await media_runner.run(cmd, input=data)
+    if result.returncode != 0 and not (allow_truncated and result.stdout):
+        raise RuntimeError(f"ffmpeg failed to decode audio: {result.stderr}")
+    return pcm16_to_float32(result.stdout)
+
+
+async def transcode_answer(source, mp3_path: str = None) -> np.ndarray:
+    """Decode an answer once, writing the MP3 and returning 16 kHz PCM for Whisper
+
+    The MP3 (if mp3_path is given) goes straight to its final location; the
+    Whisper input comes back on stdout.
+    """
+    args, data = input_args(source)
+    cmd = ['ffmpeg', '-loglevel', 'error'] + args
+    if mp3_path:
+        cmd += mp3_output_args(mp3_path)
+    cmd += pcm_output_args()
+
+    result = await media_runner.run(cmd, input=data)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed to transcode audio: {result.stderr}")
+    return pcm16_to_float32(result.stdout)
+
+
+async def encode_mp3(source, mp3_path: str) -> bool:
+    """Encode a path or bytes to the MP3 format used for saved answers"""
+    args, data = input_args(source)
+    cmd = ['ffmpeg', '-loglevel', 'error'] + args + mp3_output_args(mp3_path)
+    result = await media_runner.run(cmd, input=data)
+    if result.returncode != 0:
+        print(f"Error converting audio: {result.stderr}")
+        return False
+    return True
+
+
+# MPEG audio Layer III bitrates (kbps) by bitrate index, for MPEG-1 and MPEG-2/2.5
+_MP3_BITRATES = {
+    3: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    0: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_MP3_SAMPLE_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+
+
+def mp3_frames(data: bytes):
+    """Yield (offset, length, samples, sample_rate) for each Layer III frame in MP3 data
+
+    A leading ID3v2 tag and the Xing/Info header frame written by encoders are
+    skipped, since neither holds audio.
+    """
+    pos = 0
+    if data[:3] == b"ID3" and len(data) >= 10:
+        pos = 10 + ((data[6] & 0x7F) << 21 | (data[7] & 0x7F) << 14 | (data[8] & 0x7F) << 7 | (data[9] & 0x7F))
+    first = True
+    while pos + 4 <= len(data):
+        b1, b2 = data[pos + 1], data[pos + 2]
+        version = (b1 >> 3) & 3
+        layer = (b1 >> 1) & 3
+        bitrate_index = (b2 >> 4) & 0xF
+        rate_index = (b2 >> 2) & 3
+        if (data[pos] != 0xFF or (b1 & 0xE0) != 0xE0 or version == 1 or layer != 1
+                or bitrate_index in (0, 15) or rate_index == 3):
+            pos += 1
+            continue
+        sample_rate = _MP3_SAMPLE_RATES[version][rate_index]
+        samples = 1152 if version == 3 else 576
+        length = (samples // 8) * _MP3_BITRATES[version][bitrate_index] * 1000 // sample_rate + ((b2 >> 1) & 1)
+        if first and (b"Xing" in data[pos:pos + length] or b"Info" in data[pos:pos + length]):
+            first = False
+            pos += length
+            continue
+        first = False
+        yield pos, length, samples, sample_rate
+        pos += length
+
+
+def mp3_duration(source) -> float:
+    """Duration in seconds of MP3 bytes or an MP3 file, from its frame headers"""
+    if not isinstance(source, (bytes, bytearray)):
+        with open(source, "rb") as f:
+            source = f.read()
+    duration = 0.0
+    for _, _, samples, sample_rate in mp3_frames(source):
+        duration += samples / sample_rate
+    return round(duration, 3)
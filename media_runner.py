@@ -0,0 +1,153 @@
+"""
+Non-blocking runner for ffmpeg jobs
+
+Media commands run as asyncio subprocesses so a long transcode never blocks
+the event loop. A global semaphore (sized to the CPU count by default)
+bounds how many run at once; each job has a timeout, stderr is captured,
+and cancelling the awaiting task (e.g. when the client disconnects) kills
+the process. Jobs run with "-progress pipe:1" can report progress as they go.
+"""
+
+import asyncio
+import os
+
+
+class MediaJobTimeout(Exception):
+    """Raised when a media job exceeds its timeout"""
+
+
+class ClientDisconnected(Exception):
+    """Raised when a media job was cancelled because the client went away"""
+
+
+class MediaResult:
+    """Outcome of a finished media job"""
+
+    def __init__(self, cmd: list, returncode: int, stdout: bytes, stderr: bytes):
+        self.cmd = cmd
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr.decode(errors='ignore') if isinstance(stderr, bytes) else stderr
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0
+
+
+class MediaJobRunner:
+    """Runs media subprocesses with bounded concurrency and per-job timeouts"""
+
+    def __init__(self, max_concurrency: int = None, timeout_seconds: float = None):
+        self.configure(max_concurrency, timeout_seconds)
+
+    def configure(self, max_concurrency: int = None, timeout_seconds: float = None):
+        """Set the concurrency limit (default: CPU count) and default timeout"""
+        self.max_concurrency = max_concurrency or os.cpu_count() or 1
+        self.timeout_seconds = timeout_seconds
+        self._semaphore = None
+        self.running = 0
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the server's running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def run(self, cmd: list, cwd=None, input=None, timeout: float = None,
+                  on_progress=None) -> MediaResult:
+        """Run a command, returning its result once it exits
+
+        input may be bytes or an async iterable of byte chunks, which is fed
+        to stdin as it is produced. on_progress, if given, is called with the
+        seconds of media processed so far; the command must write ffmpeg
+        "-progress pipe:1" output to stdout.
+        """
+        timeout = timeout if timeout is not None else self.timeout_seconds
+        async with self._get_semaphore():
+            process = await asyncio.create_subprocess_exec(
+                *[str(part) for part in cmd],
+                cwd=str(cwd) if cwd else None,
+                stdin=asyncio.subprocess.PIPE if input is not None else asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            self.running += 1
+            try:
+                stdout, stderr = await asyncio.wait_for(self._communicate(process, input, on_progress), timeout)
+            except asyncio.TimeoutError:
+                await self._kill(process)
+                raise MediaJobTimeout(f"{cmd[0]} timed out after {timeout}s")
+            except BaseException:
+                # Cancelled, or the input iterator failed (e.g. upload too large)
+                await self._kill(process)
+                raise
+            finally:
+                self.running -= 1
+            return MediaResult(cmd, process.returncode, stdout, stderr)
+
+    async def _communicate(self, process, input, on_progress):
+        streaming = input is not None and not isinstance(input, (bytes, bytearray))
+        if on_progress is None and not streaming:
+            return await process.communicate(input)
+
+        async def feed():
+            try:
+                if streaming:
+                    async for chunk in input:
+                        process.stdin.write(chunk)
+                        await process.stdin.drain()
+                elif input is not None:
+                    process.stdin.write(input)
+                    await process.stdin.drain()
+            except (BrokenPipeError, ConnectionResetError):
+                # ffmpeg exited early; its stderr says why
+                pass
+            finally:
+                if input is not None:
+                    process.stdin.close()
+
+        async def read_stdout():
+            if on_progress is None:
+                return await process.stdout.read()
+            async for line in process.stdout:
+                key, _, value = line.decode(errors='ignore').strip().partition('=')
+                # Despite its name, ffmpeg reports out_time_ms in microseconds
+                if key == 'out_time_ms' and value.isdigit():
+                    on_progress(int(value) / 1000000)
+            return b""
+
+        _, stdout, stderr = await asyncio.gather(feed(), read_stdout(), process.stderr.read())
+        await process.wait()
+        return stdout, stderr
+
+    async def _kill(self, process):
+        if process.returncode is None:
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+            await process.wait()
+
+    def stats(self) -> dict:
+        return {"max_concurrency": self.max_concurrency, "running": self.running}
+
+
+async def cancel_on_disconnect(request, coro, poll_interval: float = 0.5):
+    """Await coro, cancelling it (and any media job it is running) if the client goes away"""
+    task = asyncio.ensure_future(coro)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                task.cancel()
+                print("Client disconnected, cancelled media job")
+                raise ClientDisconnected()
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+# Shared runner used by all media helpers
+media_runner = MediaJobRunner()
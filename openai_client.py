@@ -0,0 +1,163 @@
+"""
+Shared asynchronous OpenAI client
+
+A single AsyncOpenAI instance backed by a pooled httpx client is reused for
+chat, summary and TTS requests, so connections stay alive between calls and
+a slow response never blocks the event loop. A semaphore caps the number of
+requests waiting on the API; timeouts and retries with exponential backoff are
+handled by the SDK.
+
+Streaming calls only hold the semaphore until the response starts, so a few
+long streams read by slow browsers don't hold up every other API call.
+
+stream_speech() streams TTS audio as the provider produces it. The pinned SDK
+reads speech responses in full, so it posts to the speech endpoint through
+the same pooled httpx client instead, retrying the request the way the SDK
+does until the audio starts arriving.
+"""
+
+import asyncio
+import random
+
+import httpx
+import openai
+
+from settings import (
+    OPENAI_API_KEY,
+    OPENAI_MAX_CONCURRENCY,
+    OPENAI_MAX_CONNECTIONS,
+    OPENAI_KEEPALIVE_SECONDS,
+    OPENAI_TIMEOUT_SECONDS,
+    OPENAI_MAX_RETRIES,
+)
+
+_client = None
+_http_client = None
+_semaphore = None
+
+SPEECH_CHUNK_SIZE = 16 * 1024
+
+# Statuses the SDK retries too: timeouts, lock conflicts, rate limits and server errors
+RETRY_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+MAX_RETRY_DELAY_SECONDS = 8.0
+
+
+def get_openai_client() -> openai.AsyncOpenAI:
+    """Return the process-wide AsyncOpenAI client, creating it on first use"""
+    global _client, _http_client
+    if _client is None:
+        _http_client = http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=OPENAI_MAX_CONNECTIONS,
+                keepalive_expiry=OPENAI_KEEPALIVE_SECONDS
+            ),
+            timeout=OPENAI_TIMEOUT_SECONDS
+        )
+        _client = openai.AsyncOpenAI(
+            api_key=OPENAI_API_KEY,
+            timeout=OPENAI_TIMEOUT_SECONDS,
+            max_retries=OPENAI_MAX_RETRIES,
+            http_client=http_client
+        )
+    return _client
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    # Created lazily so it binds to the server's running event loop
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(OPENAI_MAX_CONCURRENCY)
+    return _semaphore
+
+
+async def chat_completion(**kwargs):
+    """Create a chat completion through the shared client"""
+    async with _get_semaphore():
+        return await get_openai_client().chat.completions.create(**kwargs)
+
+
+async def chat_completion_stream(**kwargs):
+    """Stream a chat completion through the shared client, yielding text deltas"""
+    # Only the (retried) request counts against the limit, not reading the stream
+    async with _get_semaphore():
+        stream = await get_openai_client().chat.completions.create(stream=True, **kwargs)
+    try:
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    finally:
+        await stream.response.aclose()
+
+
+async def speech(**kwargs) -> bytes:
+    """Synthesize speech through the shared client and return the MP3 bytes"""
+    async with _get_semaphore():
+        response = await get_openai_client().audio.speech.create(**kwargs)
+        return response.content
+
+
+def _retry_delay(attempt: int, response: httpx.Response = None) -> float:
+    """Exponential backoff with jitter, or the server's Retry-After if it gives a short one"""
+    if response is not None:
+        try:
+            retry_after = float(response.headers.get("retry-after", ""))
+            if 0 < retry_after <= 60:
+                return retry_after
+        except ValueError:
+            pass
+    delay = min(MAX_RETRY_DELAY_SECONDS, 0.5 * 2 ** attempt)
+    return delay * (1 - 0.25 * random.random())
+
+
+async def _open_speech_stream(kwargs: dict) -> httpx.Response:
+    """Send the speech request, retrying transient failures until the response starts"""
+    client = get_openai_client()
+    request = _http_client.build_request(
+        "POST",
+        client.base_url.join("audio/speech"),
+        json=kwargs,
+        headers={"Authorization": f"Bearer {client.api_key}"}
+    )
+    for attempt in range(OPENAI_MAX_RETRIES + 1):
+        response = None
+        try:
+            async with _get_semaphore():
+                response = await _http_client.send(request, stream=True)
+        except httpx.TransportError as e:
+            # Connection errors and timeouts
+            error = e
+        else:
+            if response.status_code < 400:
+                return response
+            await response.aread()
+            await response.aclose()
+            error = RuntimeError(f"Speech request failed ({response.status_code}): {response.text}")
+            if response.status_code not in RETRY_STATUSES:
+                raise error
+        if attempt < OPENAI_MAX_RETRIES:
+            await asyncio.sleep(_retry_delay(attempt, response))
+    raise error
+
+
+async def stream_speech(**kwargs):
+    """Synthesize speech through the shared connection pool, yielding MP3 chunks as they arrive
+
+    Failures before the audio starts are retried; once chunks have been
+    yielded, an error is raised to the caller.
+    """
+    response = await _open_speech_stream(kwargs)
+    try:
+        async for chunk in response.aiter_bytes(SPEECH_CHUNK_SIZE):
+            yield chunk
+    finally:
+        await response.aclose()
+
+
+async def close_openai_client():
+    """Close pooled connections on shutdown"""
+    global _client, _http_client
+    if _client is not None:
+        await _client.close()
+        _client = None
+        _http_client = None
@@ -0,0 +1,216 @@
+"""
+Persistent catalog of recorded interview sessions
+
+/recordings used to walk every session directory and stat every file on each
+request. Instead, each file is added to this SQLite index when the server
+writes it, and listings are answered from the index with keyset pagination
+(newest sessions first) and filters. rebuild() reconstructs the index from
+an existing RECORDINGS_DIR layout, e.g. after files were copied in by hand.
+"""
+
+import base64
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+def classify_file(filename: str, combined_audio_filename: str = "combined_interview.mp3",
+                  combined_video_filename: str = "combined_interview.mp4"):
+    """Return the listing category of a recording file, or None to leave it out"""
+    suffix = Path(filename).suffix
+    if suffix == ".mp3":
+        if filename.startswith("interviewer_"):
+            return "interviewer"
+        if filename == combined_audio_filename:
+            return "combined_audio"
+        return "candidate"
+    if suffix == ".wav":
+        return "candidate"
+    if suffix in (".mp4", ".webm"):
+        return "combined_video" if filename == combined_video_filename else "video"
+    if suffix in (".json", ".jsonl"):
+        return "metadata"
+    return None
+
+
+def encode_cursor(created_at: float, session_id: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps([created_at, session_id]).encode()).decode()
+
+
+def decode_cursor(cursor: str):
+    try:
+        created_at, session_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(created_at), str(session_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+class RecordingsIndex:
+    """SQLite index of session directories and the files in them"""
+
+    def __init__(self, path, combined_audio_filename: str = "combined_interview.mp3",
+                 combined_video_filename: str = "combined_interview.mp4"):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.combined_audio_filename = combined_audio_filename
+        self.combined_video_filename = combined_video_filename
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "session_id TEXT PRIMARY KEY, created_at REAL NOT NULL, updated_at REAL NOT NULL, "
+            "has_video INTEGER NOT NULL DEFAULT 0);"
+            "CREATE INDEX IF NOT EXISTS sessions_created ON sessions (created_at DESC, session_id DESC);"
+            "CREATE TABLE IF NOT EXISTS files ("
+            "session_id TEXT NOT NULL, filename TEXT NOT NULL, category TEXT NOT NULL, "
+            "PRIMARY KEY (session_id, filename));"
+        )
+        self._lock = threading.RLock()
+
+    def add_file(self, session_id: str, filename: str, mtime: float = None):
+        """Record a file written to a session directory"""
+        category = classify_file(filename, self.combined_audio_filename, self.combined_video_filename)
+        mtime = mtime if mtime is not None else time.time()
+        has_video = 1 if category in ("video", "combined_video") else 0
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT INTO sessions (session_id, created_at, updated_at, has_video) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (session_id) DO UPDATE SET "
+                    "created_at = MIN(created_at, excluded.created_at), "
+                    "updated_at = MAX(updated_at, excluded.updated_at), "
+                    "has_video = MAX(has_video, excluded.has_video)",
+                    (session_id, mtime, mtime, has_video)
+                )
+                if category:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO files (session_id, filename, category) VALUES (?, ?, ?)",
+                        (session_id, filename, category)
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def remove_session(self, session_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM files WHERE session_id = ?", (session_id,))
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def rebuild(self, recordings_dir) -> int:
+        """Replace the index with the contents of recordings_dir, returning the session count"""
+        recordings_dir = Path(recordings_dir)
+        sessions = []
+        files = []
+        if recordings_dir.exists():
+            for session_dir in recordings_dir.iterdir():
+                # Dot directories (e.g. .jobs) hold bookkeeping, not sessions
+                if not session_dir.is_dir() or session_dir.name.startswith("."):
+                    continue
+                mtimes = []
+                has_video = 0
+                for file_path in session_dir.iterdir():
+                    if not file_path.is_file():
+                        continue
+                    mtimes.append(file_path.stat().st_mtime)
+                    category = classify_file(file_path.name, self.combined_audio_filename,
+                                             self.combined_video_filename)
+                    if category:
+                        files.append((session_dir.name, file_path.name, category))
+                        has_video = has_video or category in ("video", "combined_video")
+                created_at = min(mtimes) if mtimes else session_dir.stat().st_mtime
+                updated_at = max(mtimes) if mtimes else created_at
+                sessions.append((session_dir.name, created_at, updated_at, int(has_video)))
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM files")
+                self._conn.execute("DELETE FROM sessions")
+                self._conn.executemany("INSERT INTO sessions VALUES (?, ?, ?, ?)", sessions)
+                self._conn.executemany("INSERT INTO files VALUES (?, ?, ?)", files)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(sessions)
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def list_sessions(self, limit: int = 100, cursor: str = None, since: float = None, has_video: bool = None):
+        """Return (sessions, next_cursor), newest first
+
+        Each session has the same shape /recordings has always returned.
+        since keeps sessions updated at or after a Unix timestamp.
+        """
+        clauses = []
+        params = []
+        if cursor:
+            created_at, session_id = decode_cursor(cursor)
+            clauses.append("(created_at < ? OR (created_at = ? AND session_id < ?))")
+            params += [created_at, created_at, session_id]
+        if since is not None:
+            clauses.append("updated_at >= ?")
+            params.append(since)
+        if has_video is not None:
+            clauses.append("has_video = ?")
+            params.append(1 if has_video else 0)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT session_id, created_at, updated_at FROM sessions {where} "
+                "ORDER BY created_at DESC, session_id DESC LIMIT ?",
+                params + [limit + 1]
+            ).fetchall()
+            page = rows[:limit]
+            files = {}
+            if page:
+                placeholders = ",".join("?" for _ in page)
+                for session_id, filename, category in self._conn.execute(
+                    f"SELECT session_id, filename, category FROM files WHERE session_id IN ({placeholders}) "
+                    "ORDER BY filename",
+                    [row[0] for row in page]
+                ):
+                    files.setdefault(session_id, []).append((filename, category))
+
+        sessions = [self._session_info(row, files.get(row[0], [])) for row in page]
+        next_cursor = encode_cursor(page[-1][1], page[-1][0]) if len(rows) > limit else None
+        return sessions, next_cursor
+
+    def _session_info(self, row, files: list) -> dict:
+        session_id, created_at, updated_at = row
+        session_info = {
+            "session_id": session_id,
+            "audio_files": [],
+            "video_files": [],
+            "metadata_files": [],
+            "interviewer_files": [],
+            "candidate_files": [],
+            "combined_audio": None,
+            "combined_video": None,
+            "created_at": created_at,
+            "updated_at": updated_at
+        }
+        for filename, category in files:
+            if category == "interviewer":
+                session_info["interviewer_files"].append(filename)
+                session_info["audio_files"].append(filename)
+            elif category == "candidate":
+                session_info["candidate_files"].append(filename)
+                session_info["audio_files"].append(filename)
+            elif category == "combined_audio":
+                session_info["combined_audio"] = filename
+                session_info["audio_files"].append(filename)
+            elif category == "video":
+                session_info["video_files"].append(filename)
+            elif category == "combined_video":
+                session_info["combined_video"] = filename
+            elif category == "metadata":
+                session_info["metadata_files"].append(filename)
+        return session_info
@@ -0,0 +1,188 @@
+"""
+Bounded cache for generated interviewer text (summaries and follow-ups)
+
+Entries are keyed on a hash of the full content plus the question type and
+model, expire after a TTL and are evicted least-recently-used once the
+entry or byte budget is exceeded. Storage is pluggable: the in-memory
+backend is private to one process, the SQLite backend can be shared by
+several workers on the same machine.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+
+class MemoryCacheBackend:
+    """In-process LRU storage"""
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self.total_bytes = 0
+
+    def get(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        value, expires_at, _ = entry
+        return value, expires_at
+
+    def set(self, key: str, value: str, expires_at: float, size: int):
+        self.delete(key)
+        self._entries[key] = (value, expires_at, size)
+        self.total_bytes += size
+
+    def delete(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry[2]
+
+    def pop_lru(self):
+        """Remove the least recently used entry and return its key"""
+        if not self._entries:
+            return None
+        key, (_, _, size) = self._entries.popitem(last=False)
+        self.total_bytes -= size
+        return key
+
+    def clear(self):
+        self._entries.clear()
+        self.total_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteCacheBackend:
+    """On-disk LRU storage that several worker processes can share"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._connection = None
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        # Opened on first use, so creating the backend (e.g. importing the server) touches no files
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, "
+                "size INTEGER NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_last_access ON cache (last_access)")
+            self._connection = conn
+        return self._connection
+
+    def get(self, key: str):
+        row = self._conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        self._conn.execute("UPDATE cache SET last_access = ? WHERE key = ?", (time.time(), key))
+        return row[0], row[1]
+
+    def set(self, key: str, value: str, expires_at: float, size: int):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at, size, last_access) VALUES (?, ?, ?, ?, ?)",
+            (key, value, expires_at, size, time.time())
+        )
+
+    def delete(self, key: str):
+        self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def pop_lru(self):
+        row = self._conn.execute("SELECT key FROM cache ORDER BY last_access LIMIT 1").fetchone()
+        if row is None:
+            return None
+        self.delete(row[0])
+        return row[0]
+
+    def clear(self):
+        self._conn.execute("DELETE FROM cache")
+
+    @property
+    def total_bytes(self) -> int:
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+
+class ResponseCache:
+    """LRU + TTL cache with entry/byte budgets and hit/miss/eviction counters"""
+
+    def __init__(self, backend=None, max_entries: int = 1000, max_bytes: int = 1024 * 1024,
+                 ttl_seconds: float = 3600):
+        self.backend = backend if backend is not None else MemoryCacheBackend()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(kind: str, content: str, question_type: str = None, model: str = None) -> str:
+        """Build a cache key from the full content rather than a prefix of it"""
+        digest = hashlib.sha256()
+        for part in (kind, model or "", question_type or "", content):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return f"{kind}:{digest.hexdigest()}"
+
+    def get(self, key: str):
+        """Return the cached value, or None if missing or expired"""
+        with self._lock:
+            entry = self.backend.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= time.time():
+                self.backend.delete(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: str):
+        """Store a value, evicting least recently used entries to stay within budget"""
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self.backend.set(key, value, time.time() + self.ttl_seconds, size)
+            while len(self.backend) > self.max_entries or self.backend.total_bytes > self.max_bytes:
+                if self.backend.pop_lru() is None:
+                    break
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self.backend.clear()
+
+    def stats(self) -> dict:
+        """Counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.backend),
+                "bytes": self.backend.total_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+            }
@@ -0,0 +1,41 @@
+"""
+Splitting streamed LLM output into sentences for TTS
+
+Follow-ups are streamed from the chat API a few tokens at a time. Each
+sentence is handed to TTS as soon as it is complete, so the interviewer can
+start speaking the first sentence while the rest is still being generated.
+Very short fragments (e.g. "Great!") are held back and spoken together with
+the next sentence, which avoids choppy one-word clips.
+"""
+
+import re
+
+# End of a sentence: terminal punctuation (plus closing quotes/brackets) followed by whitespace
+_SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*\s+")
+
+
+class SentenceChunker:
+    """Accumulates streamed text and returns sentences as they complete"""
+
+    def __init__(self, min_chars: int = 20):
+        self.min_chars = min_chars
+        self.text = ""
+        self._start = 0
+
+    def feed(self, delta: str) -> list:
+        """Add streamed text, returning any sentences completed by it"""
+        self.text += delta
+        sentences = []
+        for match in _SENTENCE_END.finditer(self.text, self._start):
+            sentence = self.text[self._start:match.end()].strip()
+            if len(sentence) < self.min_chars:
+                continue
+            sentences.append(sentence)
+            self._start = match.end()
+        return sentences
+
+    def flush(self) -> list:
+        """Return whatever is left once the stream has ended"""
+        rest = self.text[self._start:].strip()
+        self._start = len(self.text)
+        return [rest] if rest else []
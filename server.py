@@ -1,18 +1,37 @@
 import os
-import whisper
 import asyncio
+import functools
 from fastapi import FastAPI, WebSocket, UploadFile, File, Form, Response, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from fastapi.responses import StreamingResponse
 import uvicorn
-import tempfile
 import json
 from datetime import datetime
 import aiofiles
 from pathlib import Path
-import subprocess
-from config import *
-import openai
+from settings import *
+from transcription import TranscriptionPool
+from streaming_transcription import StreamingTranscriber
+from openai_client import close_openai_client
+from response_cache import ResponseCache, MemoryCacheBackend, SQLiteCacheBackend
+from session_registry import SessionRegistry
+from state_store import create_state_store
+from media import check_ffmpeg, decode_audio, encode_mp3, transcode_answer, mp3_duration, WHISPER_SAMPLE_RATE
+from media_runner import media_runner, cancel_on_disconnect
+from jobs import JobQueue
+from uploads import UploadReader, UploadTooLarge, save_upload
+from file_responses import file_response
+from recordings_index import RecordingsIndex
+from manifest import ManifestStore, MANIFEST_FILENAME
+from combined_audio import IncrementalCombiner
+from interview_questions import INTERVIEW_QUESTIONS
+from tts_cache import TTSCache, SpeechPrefetcher, SpeechStream, speech_chunks, warmup_predefined
+from sentence_chunker import SentenceChunker
+from conversation_context import ContextWindow
+from interviewer_backends import OpenAIBackend, LocalLLMBackend, RuleBasedBackend, choose_backend
+from follow_up import (is_skip_request, is_short_answer, follow_up_messages, parse_follow_up,
+                       DEFAULT_SUMMARY, SKIP_SUMMARY, ELABORATE_QUESTION)
 
 app = FastAPI()
 
@@ -25,28 +44,177 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Create recordings directory
-RECORDINGS_DIR.mkdir(exist_ok=True)
+@app.on_event("startup")
+async def create_recordings_dir():
+    # Created on startup rather than import, so importing the server writes nothing
+    RECORDINGS_DIR.mkdir(parents=True, exist_ok=True)
 
-# Load Whisper model
-model = whisper.load_model(WHISPER_MODEL)
+# ffmpeg jobs run as async subprocesses with bounded concurrency
+media_runner.configure(MEDIA_JOB_CONCURRENCY, MEDIA_JOB_TIMEOUT_SECONDS)
 
-# Initialize OpenAI client if API key is available
+# Slow media work (e.g. the /save-video transcode) runs as background jobs
+job_queue = JobQueue(RECORDINGS_DIR, workers=VIDEO_JOB_WORKERS)
+
+@app.on_event("startup")
+async def start_job_queue():
+    await job_queue.start()
+
+@app.on_event("shutdown")
+async def stop_job_queue():
+    await job_queue.stop()
+
+# Per-session manifests describing every recording, cached in memory
+manifests = ManifestStore()
+
+# Combined interview audio, extended as each clip is saved
+combiner = IncrementalCombiner(COMBINED_AUDIO_FILENAME)
+
+# Catalog of recorded sessions behind /recordings, updated as files are written.
+# Opened on startup; its SQLite calls run in the default executor, off the event loop.
+recordings_index = None
+
+def add_to_index(session_id: str, paths: tuple):
+    for path in paths:
+        try:
+            recordings_index.add_file(session_id, Path(path).name, Path(path).stat().st_mtime)
+        except Exception as e:
+            print(f"Error indexing recording {path}: {e}")
+
+def index_recording(session_id: str, *paths: Path):
+    """Add files just written to a session directory to the recordings index, in the background"""
+    if recordings_index is not None:
+        asyncio.get_running_loop().run_in_executor(None, add_to_index, session_id, paths)
+
+def open_recordings_index():
+    index = RecordingsIndex(RECORDINGS_INDEX_PATH, combined_audio_filename=COMBINED_AUDIO_FILENAME,
+                            combined_video_filename=COMBINED_VIDEO_FILENAME)
+    # First start with an existing recordings directory: catalog what is there
+    if index.count() == 0 and any(RECORDINGS_DIR.iterdir()):
+        print(f"Indexed {index.rebuild(RECORDINGS_DIR)} recorded session(s)")
+    return index
+
+@app.on_event("startup")
+async def build_recordings_index():
+    global recordings_index
+    recordings_index = await asyncio.get_running_loop().run_in_executor(None, open_recordings_index)
+
+# Whisper runs in a dedicated worker pool, never on the event loop
+transcription_pool = TranscriptionPool(
+    WHISPER_MODEL,
+    workers=TRANSCRIPTION_WORKERS,
+    mode=TRANSCRIPTION_EXECUTOR,
+    preload=WHISPER_PRELOAD
+)
+
+@app.on_event("startup")
+async def start_transcription_pool():
+    check_ffmpeg()
+    transcription_pool.start()
+    # Load (and warm up) the models in the background; /ready reports when they are done
+    if transcription_pool.preload:
+        asyncio.ensure_future(warm_up_transcription())
+
+async def warm_up_transcription():
+    try:
+        timings = await transcription_pool.warmup(transcribe=WHISPER_WARMUP)
+        print(f"✅ Whisper ready in {timings['ready_after_seconds']}s "
+              f"(load {timings['load_seconds']}s, warmup transcription {timings['transcribe_seconds']}s)")
+    except Exception as e:
+        print(f"Error warming up Whisper: {e}")
+
+@app.on_event("shutdown")
+async def stop_transcription_pool():
+    transcription_pool.shutdown()
+
+async def evict_idle_sessions():
+    """Periodically reclaim sessions idle for longer than SESSION_TIMEOUT_MINUTES"""
+    interval = max(1, min(60, session_registry.timeout_seconds / 4))
+    while True:
+        await asyncio.sleep(interval)
+        for session_info in await in_store(session_registry.evict_idle):
+            print(f"Evicted idle session: {session_info['session_id']}")
+            websocket = active_connections.get(session_info["client_id"])
+            if websocket is not None:
+                try:
+                    await websocket.close()
+                except Exception as e:
+                    print(f"Error closing idle WebSocket: {e}")
+
+@app.on_event("startup")
+async def start_session_eviction():
+    asyncio.ensure_future(evict_idle_sessions())
+
+@app.on_event("shutdown")
+async def stop_openai_client():
+    await close_openai_client()
+
+# The shared OpenAI client is created on first use if an API key is available
 if OPENAI_API_KEY:
-    openai.api_key = OPENAI_API_KEY
     print("✅ OpenAI API initialized")
 else:
     print("⚠️  OpenAI API key not found. Using fallback interview questions.")
 
-# Store active connections and their conversation states
+# WebSocket objects can't be shared, so connections stay local to this worker
 active_connections = {}
-conversation_history = {}
-interview_sessions = {}
-used_questions = {}
-current_question_types = {}
 
-# Simple cache for responses
-response_cache = {}
+# Sessions and conversation state live in the (optionally shared) state store
+state_store = create_state_store(STATE_STORE, STATE_STORE_PATH)
+session_registry = SessionRegistry(timeout_minutes=SESSION_TIMEOUT_MINUTES, store=state_store)
+
+async def in_store(fn, *args, **kwargs):
+    """Run a state store call in a worker thread
+
+    A SQLite store write waits for other workers' transactions (up to its busy
+    timeout), which must not stall this worker's event loop.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(fn, *args, **kwargs))
+
+async def get_conversation(client_id: str) -> list:
+    """Get the conversation history for a client"""
+    return await in_store(state_store.get, "conversations", client_id, [])
+
+async def append_conversation(client_id: str, role: str, content: str):
+    """Add a message to a client's conversation history"""
+    await in_store(state_store.update, "conversations", client_id, lambda history: history.append({
+        "role": role,
+        "content": content
+    }), default=[])
+
+async def get_used_questions(client_id: str) -> set:
+    """Get the questions already asked to a client"""
+    return set(await in_store(state_store.get, "used_questions", client_id, []))
+
+async def mark_question_used(client_id: str, question: str):
+    """Remember that a question was asked to a client"""
+    def add(questions):
+        if question not in questions:
+            questions.append(question)
+    await in_store(state_store.update, "used_questions", client_id, add, default=[])
+
+async def set_question_type(client_id: str, question_type: str):
+    """Remember the current question type for a client"""
+    await in_store(state_store.set, "question_types", client_id, question_type)
+
+async def clear_conversation_state(client_id: str):
+    """Drop all conversation state for a disconnected client"""
+    def clear():
+        with state_store.transaction():
+            for namespace in ("conversations", "context_summaries", "used_questions", "question_types"):
+                state_store.delete(namespace, client_id)
+    await in_store(clear)
+
+# Bounded cache for generated summaries and follow-ups
+if RESPONSE_CACHE_BACKEND == "sqlite":
+    response_cache_backend = SQLiteCacheBackend(RESPONSE_CACHE_PATH)
+else:
+    response_cache_backend = MemoryCacheBackend()
+response_cache = ResponseCache(
+    backend=response_cache_backend,
+    max_entries=RESPONSE_CACHE_MAX_ENTRIES,
+    max_bytes=RESPONSE_CACHE_MAX_BYTES,
+    ttl_seconds=RESPONSE_CACHE_TTL_SECONDS
+)
 
 def get_cached_response(key: str):
     """Get a cached response"""
@@ -54,63 +222,21 @@ def get_cached_response(key: str):
 
 def cache_response(key: str, value: str):
     """Cache a response"""
-    response_cache[key] = value
-
-# Interview questions and follow-up prompts
-INTERVIEW_QUESTIONS = {
-    "introduction": {
-        "question": "Hello! I'm your AI interviewer today. Could you please introduce yourself?",
-        "follow_ups": [
-            "What was your most challenging project?",
-            "How did you handle difficult situations in your previous roles?",
-            "What skills did you develop from these experiences?"
-        ]
-    },
-    "experience": {
-        "question": "Could you tell me about your relevant experience?",
-        "follow_ups": [
-            "What was your most challenging project?",
-            "How did you handle difficult situations in your previous roles?",
-            "What skills did you develop from these experiences?"
-        ]
-    },
-    "skills": {
-        "question": "What are your key technical skills?",
-        "follow_ups": [
-            "How do you stay updated with new technologies?",
-            "Can you give an example of how you applied these skills?",
-            "What areas are you looking to improve?"
-        ]
-    },
-    "problem_solving": {
-        "question": "How do you approach problem-solving in your work?",
-        "follow_ups": [
-            "Can you share a specific example?",
-            "What was the outcome?",
-            "What did you learn from that experience?"
-        ]
-    },
-    "future": {
-        "question": "Where do you see yourself in the next 5 years?",
-        "follow_ups": [
-            "What steps are you taking to achieve these goals?",
-            "How does this role align with your career path?",
-            "What are you most excited about in your career?"
-        ]
-    }
-}
+    response_cache.set(key, value)
 
-async def generate_openai_response(conversation_history: list, candidate_response: str = None):
-    """Generate interview response using OpenAI Chat API"""
-    if not OPENAI_API_KEY:
-        return None
-    
-    try:
-        # Build the conversation context
-        messages = [
-            {
-                "role": "system",
-                "content": """You are a professional AI interviewer conducting a job interview. Your role is to:
+# Synthesized interviewer speech, shared by every session that says the same thing
+tts_cache = TTSCache(TTS_CACHE_DIR, max_bytes=TTS_CACHE_MAX_BYTES)
+
+# Greetings and follow-ups are synthesized as soon as they are generated
+prepared_speech = SpeechPrefetcher(tts_cache, ttl_seconds=PREPARED_SPEECH_TTL_SECONDS)
+
+@app.on_event("startup")
+async def warm_tts_cache():
+    # Pre-render the predefined prompts in the background so the first greeting is instant
+    if TTS_CACHE_WARMUP_ON_STARTUP and USE_OPENAI_TTS and OPENAI_API_KEY:
+        asyncio.ensure_future(warmup_predefined(tts_cache, TTS_CACHE_VOICES, OPENAI_TTS_MODEL))
+
+INTERVIEWER_SYSTEM_PROMPT = """You are a professional AI interviewer conducting a job interview. Your role is to:
 1. Ask relevant, contextual questions based on the candidate's responses
 2. Provide natural, conversational follow-up questions
 3. Keep responses concise (1-2 sentences)
@@ -119,112 +245,174 @@ async def generate_openai_response(conversation_history: list, candidate_respons
 6. Focus on understanding the candidate's experience, skills, and fit for the role
 
 Start with an introduction if this is the first interaction."""
-            }
-        ]
-        
-        # Add conversation history
-        for msg in conversation_history:
-            if msg["role"] == "interviewer":
-                messages.append({"role": "assistant", "content": msg["content"]})
-            elif msg["role"] == "candidate":
-                messages.append({"role": "user", "content": msg["content"]})
-        
-        # Add current candidate response if provided
-        if candidate_response:
-            messages.append({"role": "user", "content": candidate_response})
-        
-        # Generate response using new OpenAI API format
-        client = openai.OpenAI(api_key=OPENAI_API_KEY)
-        response = client.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=messages,
+
+# Where a session's questions come from; each session may pick its own
+interviewer_backends = {
+    "openai": OpenAIBackend(OPENAI_MODEL, OPENAI_API_KEY),
+    "local": LocalLLMBackend(LOCAL_LLM_MODEL_PATH, context_tokens=LOCAL_LLM_CONTEXT_TOKENS, threads=LOCAL_LLM_THREADS),
+    "rules": RuleBasedBackend()
+}
+
+def interviewer_backend(name: str = None):
+    """The named interviewer backend, or the configured default if it isn't available"""
+    return choose_backend(interviewer_backends, name, INTERVIEWER_BACKEND)
+
+print(f"Interviewer backend: {interviewer_backend().name}")
+
+# Prompts hold a rolling summary plus the most recent turns, within a token budget
+context_window = ContextWindow(
+    recent_turns=CONTEXT_RECENT_TURNS,
+    token_budget=CONTEXT_TOKEN_BUDGET,
+    model=OPENAI_MODEL
+)
+summarizing_clients = set()
+
+async def interview_context(client_id: str, backend, candidate_response: str = None):
+    """Return (recent history, summary) for the next prompt, summarizing older turns in the background"""
+    history = await get_conversation(client_id)
+    state = await in_store(state_store.get, "context_summaries", client_id, {"summary": "", "summarized": 0})
+    reserved_tokens = context_window.count_tokens(INTERVIEWER_SYSTEM_PROMPT)
+    if candidate_response:
+        reserved_tokens += context_window.count_tokens(candidate_response)
+    recent, fold_upto = context_window.select(history, state["summarized"], state["summary"], reserved_tokens)
+    # A backend without a model can't summarize, so don't schedule it every turn
+    if backend.generates_text and fold_upto > state["summarized"] and client_id not in summarizing_clients:
+        asyncio.ensure_future(summarize_conversation(client_id, fold_upto, backend))
+    return recent, state["summary"]
+
+async def summarize_conversation(client_id: str, fold_upto: int, backend):
+    """Fold history[:fold_upto] into the client's rolling conversation summary"""
+    summarizing_clients.add(client_id)
+    try:
+        state = await in_store(state_store.get, "context_summaries", client_id, {"summary": "", "summarized": 0})
+        messages = (await get_conversation(client_id))[state["summarized"]:fold_upto]
+        if not messages:
+            return
+        summary = await backend.complete(
+            context_window.summary_messages(state["summary"], messages),
+            max_tokens=CONTEXT_SUMMARY_MAX_TOKENS,
+            temperature=0.3
+        )
+        if not summary:
+            return
+        summary = summary.strip()
+        
+        def apply(current):
+            # Another worker may have folded these turns in the meantime
+            if current["summarized"] == state["summarized"]:
+                current.update(summary=summary, summarized=fold_upto)
+        def store():
+            with state_store.transaction():
+                # The client may have disconnected while the summary was generated
+                if state_store.get("conversations", client_id) is not None:
+                    state_store.update("context_summaries", client_id, apply, default={"summary": "", "summarized": 0})
+        await in_store(store)
+    except Exception as e:
+        print(f"Error summarizing conversation: {e}")
+    finally:
+        summarizing_clients.discard(client_id)
+
+def build_interview_messages(conversation_history: list, candidate_response: str = None, summary: str = None) -> list:
+    """Chat API messages for the interviewer: system prompt, summary, history and the latest answer"""
+    messages = [{"role": "system", "content": INTERVIEWER_SYSTEM_PROMPT}]
+    if summary:
+        messages.append({"role": "system", "content": f"Summary of the interview so far:\n{summary}"})
+    
+    # Add conversation history
+    for msg in conversation_history:
+        if msg["role"] == "interviewer":
+            messages.append({"role": "assistant", "content": msg["content"]})
+        elif msg["role"] == "candidate":
+            messages.append({"role": "user", "content": msg["content"]})
+    
+    # Add current candidate response if provided
+    if candidate_response:
+        messages.append({"role": "user", "content": candidate_response})
+    return messages
+
+async def generate_interviewer_response(backend, conversation_history: list, candidate_response: str = None,
+                                        summary: str = None):
+    """Generate interview response with the session's interviewer backend"""
+    try:
+        messages = build_interview_messages(conversation_history, candidate_response, summary)
+        response = await backend.complete(
+            messages,
             max_tokens=OPENAI_MAX_TOKENS,
             temperature=OPENAI_TEMPERATURE
         )
-        
-        return response.choices[0].message.content.strip()
+        return response.strip() if response else None
     
     except Exception as e:
-        print(f"Error generating OpenAI response: {e}")
+        print(f"Error generating {backend.name} response: {e}")
         return None
 
-def convert_webm_to_wav(input_path: str, output_path: str):
-    """Convert WebM audio to WAV format using ffmpeg"""
+async def stream_interviewer_response(websocket: WebSocket, session_id: str, backend, conversation_history: list,
+                                      candidate_response: str = None, voice: str = None, summary: str = None):
+    """Stream an interview response to the browser as follow_up_delta frames
+    
+    Each sentence is handed to TTS as soon as it is complete; the frame that
+    completes it carries the sentence and the audio_url of its speech.
+    Returns the full response, or None if nothing was generated.
+    """
+    chunker = SentenceChunker()
+    
+    async def send_delta(delta: str, sentences: list):
+        frame = {"type": "follow_up_delta", "delta": delta, "session_id": session_id}
+        for sentence in sentences:
+            await websocket.send_json(dict(frame, sentence=sentence, **prepare_interviewer_speech(sentence, voice, session_id)))
+            frame["delta"] = ""
+        if frame["delta"]:
+            await websocket.send_json(frame)
+    
     try:
-        # Check if ffmpeg is available
-        result = subprocess.run(['ffmpeg', '-version'], capture_output=True, text=True)
-        if result.returncode != 0:
-            print("Warning: ffmpeg not found. Audio conversion skipped.")
-            return False
-        
-        # Convert WebM to WAV
-        cmd = [
-            'ffmpeg', '-i', input_path,
-            '-acodec', 'pcm_s16le',
-            '-ar', '44100',
-            '-ac', '1',
-            '-y',  # Overwrite output file
-            output_path
-        ]
-        
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode == 0:
-            print(f"Successfully converted {input_path} to {output_path}")
-            return True
-        else:
-            print(f"Error converting audio: {result.stderr}")
-            return False
+        async for delta in backend.stream(
+            build_interview_messages(conversation_history, candidate_response, summary),
+            max_tokens=OPENAI_MAX_TOKENS,
+            temperature=OPENAI_TEMPERATURE
+        ):
+            await send_delta(delta, chunker.feed(delta))
     except Exception as e:
-        print(f"Error during audio conversion: {e}")
-        return False
+        # Keep whatever was already streamed; the caller falls back if that is nothing
+        print(f"Error streaming {backend.name} response: {e}")
+    
+    await send_delta("", chunker.flush())
+    return chunker.text.strip() or None
 
-def convert_to_mp3(input_path: str, output_path: str):
-    """Convert any audio format to MP3 using ffmpeg"""
-    try:
-        # Check if ffmpeg is available
-        result = subprocess.run(['ffmpeg', '-version'], capture_output=True, text=True)
-        if result.returncode != 0:
-            print("Warning: ffmpeg not found. Audio conversion skipped.")
-            return False
-        
-        # Convert to MP3
-        cmd = [
-            'ffmpeg', '-i', input_path,
-            '-acodec', 'mp3',
-            '-ab', '128k',  # 128 kbps bitrate
-            '-ar', '44100',
-            '-ac', '1',
-            '-y',  # Overwrite output file
-            output_path
-        ]
-        
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode == 0:
-            print(f"Successfully converted {input_path} to {output_path}")
-            return True
-        else:
-            print(f"Error converting audio: {result.stderr}")
-            return False
-    except Exception as e:
-        print(f"Error during audio conversion: {e}")
-        return False
+# Leave out encoder tags, creation times and input metadata so the same inputs combine to the same bytes
+BITEXACT_ARGS = ['-map_metadata', '-1', '-fflags', '+bitexact', '-flags', '+bitexact']
 
-def combine_audio_files(session_dir: Path, output_filename: str = None):
+def progress_args(on_progress) -> list:
+    """ffmpeg arguments that report progress on stdout, when someone is listening for it"""
+    return ['-progress', 'pipe:1', '-nostats'] if on_progress else []
+
+def recording_sort_key(path: Path):
+    """Order legacy recordings by the timestamp in their name (e.g. response_20240101_120000.mp3)"""
+    return path.stem.split("_", 1)[-1], path.name
+
+async def combine_audio_files(session_dir: Path, output_filename: str = None, on_progress=None):
     """Combine all audio files in a session directory into a single MP3 file"""
     try:
         if not output_filename:
-            output_filename = "combined_interview.mp3"
+            output_filename = COMBINED_AUDIO_FILENAME
         
         output_path = session_dir / output_filename
         
-        # Find all audio files in the session directory
-        audio_files = []
-        for file in session_dir.glob("*.mp3"):
-            if file.name != output_filename:  # Exclude the output file itself
-                audio_files.append(file)
-        
-        # Sort files by creation time to maintain chronological order
-        audio_files.sort(key=lambda x: x.stat().st_ctime)
+        if manifests.exists(session_dir):
+            # The manifest lists answers and interviewer speech in the order they were recorded
+            audio_files = [
+                session_dir / entry["filename"]
+                for entry in manifests.entries(session_dir, kind="audio")
+                if entry.get("role") in ("candidate", "interviewer") and entry["filename"].endswith(".mp3")
+            ]
+        else:
+            # Sessions recorded before manifests: find all audio files in the session directory
+            audio_files = []
+            for file in session_dir.glob("*.mp3"):
+                if file.name != output_filename:  # Exclude the output file itself
+                    audio_files.append(file)
+            
+            # Filenames carry their recording timestamp, so order by name rather than filesystem ctime
+            audio_files.sort(key=recording_sort_key)
         
         if not audio_files:
             print(f"No audio files found in {session_dir}")
@@ -241,13 +429,13 @@ def combine_audio_files(session_dir: Path, output_filename: str = None):
         cmd = [
             'ffmpeg', '-f', 'concat', '-safe', '0',
             '-i', 'file_list.txt',
-            '-c', 'copy', '-y', str(output_path)
+            '-c', 'copy', *BITEXACT_ARGS, *progress_args(on_progress), '-y', str(output_path)
         ]
         
         print(f"Found {len(audio_files)} audio files to combine: {[f.name for f in audio_files]}")
         print(f"Running ffmpeg command from {session_dir}: {' '.join(cmd)}")
         
-        result = subprocess.run(cmd, capture_output=True, text=True, cwd=session_dir)
+        result = await media_runner.run(cmd, cwd=session_dir, on_progress=on_progress)
         
         # Clean up the file list
         file_list_path.unlink(missing_ok=True)
@@ -263,30 +451,44 @@ def combine_audio_files(session_dir: Path, output_filename: str = None):
         print(f"Error combining audio files: {e}")
         return False
 
-def combine_video_files(session_dir: Path, output_filename: str = None):
+async def combine_video_files(session_dir: Path, output_filename: str = None, on_progress=None):
     """Combine all video files in a session directory into a single MP4 file"""
     try:
         if not output_filename:
-            output_filename = "combined_interview.mp4"
+            output_filename = COMBINED_VIDEO_FILENAME
         
         output_path = session_dir / output_filename
         
-        # Find all video files in the session directory
-        video_files = []
-        for file in session_dir.glob("*.mp4"):
-            if file.name != output_filename:  # Exclude the output file itself
-                video_files.append(file)
-        for file in session_dir.glob("*.webm"):
-            if file.name != output_filename:  # Exclude the output file itself
-                video_files.append(file)
-        
-        # Sort files by creation time to maintain chronological order
-        video_files.sort(key=lambda x: x.stat().st_ctime)
+        if manifests.exists(session_dir):
+            # One file per recorded video, in order, using the MP4 once it has been transcoded
+            video_files = [
+                session_dir / (entry.get("mp4_filename") or entry["filename"])
+                for entry in manifests.entries(session_dir, role="candidate", kind="video")
+            ]
+        else:
+            # Sessions recorded before manifests: find all video files in the session directory
+            video_files = []
+            for file in session_dir.glob("*.mp4"):
+                if file.name != output_filename:  # Exclude the output file itself
+                    video_files.append(file)
+            for file in session_dir.glob("*.webm"):
+                # Skip WebMs already transcoded, as the MP4 next to them is used instead
+                if file.name != output_filename and not file.with_suffix(".mp4").exists():
+                    video_files.append(file)
+            
+            # Filenames carry their recording timestamp, so order by name rather than filesystem ctime
+            video_files.sort(key=recording_sort_key)
         
         if not video_files:
             print(f"No video files found in {session_dir}")
             return False
         
+        # A WebM left over means its transcode failed, and concat can't mix it with MP4s
+        untranscoded = [f.name for f in video_files if f.suffix != ".mp4"]
+        if untranscoded:
+            print(f"Not combining videos in {session_dir}: not transcoded to MP4: {untranscoded}")
+            return False
+        
         # Create a file list for ffmpeg concat
         file_list_path = session_dir / "video_file_list.txt"
         
@@ -316,13 +518,13 @@ def combine_video_files(session_dir: Path, output_filename: str = None):
         cmd = [
             'ffmpeg', '-f', 'concat', '-safe', '0',
             '-i', 'video_file_list.txt',
-            '-c', 'copy', '-y', str(output_path)
+            '-c', 'copy', *BITEXACT_ARGS, *progress_args(on_progress), '-y', str(output_path)
         ]
         
         print(f"Found {len(video_files)} video files to combine: {[f.name for f in video_files]}")
         print(f"Running ffmpeg command from {session_dir}: {' '.join(cmd)}")
         
-        result = subprocess.run(cmd, capture_output=True, text=True, cwd=session_dir)
+        result = await media_runner.run(cmd, cwd=session_dir, on_progress=on_progress)
         
         # Clean up the file list only after ffmpeg completes
         try:
@@ -342,170 +544,67 @@ def combine_video_files(session_dir: Path, output_filename: str = None):
         print(f"Error combining video files: {e}")
         return False
 
-def generate_follow_up(question_type, response, client_id=None):
-    """Generate a contextual follow-up question based on the candidate's response"""
-    if client_id not in used_questions:
-        used_questions[client_id] = set()
-    
-    # Generate a summary of the response
-    try:
-        # Check cache for similar responses
-        cache_key = f"summary_{response[:100]}"  # Use first 100 chars as key
-        cached = get_cached_response(cache_key)
-        if cached:
-            summary = cached
-        else:
-            if OPENAI_API_KEY:
-                client = openai.OpenAI(api_key=OPENAI_API_KEY)
-                summary_response = client.chat.completions.create(
-                    model=OPENAI_MODEL,
-                    messages=[
-                        {"role": "system", "content": """You are a friendly and professional AI interviewer. Summarize what the person said in one sentence, using 'You' instead of 'The candidate'. 
-                        Make your summary:
-                        1. Brief and to the point
-                        2. Focus on key points only
-                        3. Use natural language
-                        Keep it to one sentence."""},
-                        {"role": "user", "content": f"Person's response: {response}\nProvide a brief summary."}
-                    ],
-                    temperature=0.7,
-                    max_tokens=50
-                )
-                summary = summary_response.choices[0].message.content
-                cache_response(cache_key, summary)
-            else:
-                summary = "Thanks for sharing that."
-    except Exception as e:
-        print(f"Error generating summary: {e}")
-        summary = "Thanks for sharing that."
+async def next_predefined_question(question_type, client_id=None):
+    """Move on to the first question of the next question type"""
+    question_types = list(INTERVIEW_QUESTIONS.keys())
+    current_index = question_types.index(question_type) if question_type in question_types else 0
+    next_type = question_types[(current_index + 1) % len(question_types)]
+    next_question = INTERVIEW_QUESTIONS[next_type]["question"]
+    await mark_question_used(client_id, next_question)
+    await set_question_type(client_id, next_type)
+    return next_question
+
+async def predefined_follow_up(question_type, client_id=None):
+    """Next unused predefined follow-up, or the next question type once they are used up"""
+    follow_ups = INTERVIEW_QUESTIONS.get(question_type, {}).get("follow_ups", [])
+    used = await get_used_questions(client_id)
+    available_follow_ups = [q for q in follow_ups if q not in used]
+    if not available_follow_ups:
+        return await next_predefined_question(question_type, client_id)
+    await mark_question_used(client_id, available_follow_ups[0])
+    return available_follow_ups[0]
+
+async def generate_follow_up(question_type, response, client_id=None, backend=None):
+    """Generate a contextual follow-up question based on the candidate's response
     
-    # Check for various ways the user might ask to move to the next question
-    skip_phrases = [
-        "next question",
-        "move on",
-        "let's move on",
-        "next topic",
-        "different question",
-        "don't ask that again",
-        "stop asking",
-        "change the question",
-        "ask something else"
-    ]
+    Requests to move on and very short answers are answered locally. Otherwise
+    the summary and follow-up come from one structured request to backend,
+    falling back to the predefined follow-ups; pass no backend when the
+    caller has already seen the model fail this turn.
+    """
+    # Fast paths that don't need the model
+    if is_skip_request(response):
+        return f"{SKIP_SUMMARY}\n\n{await next_predefined_question(question_type, client_id)}"
+    if is_short_answer(response):
+        return f"{DEFAULT_SUMMARY}\n\n{ELABORATE_QUESTION}"
     
-    if any(phrase in response.lower() for phrase in skip_phrases):
+    if backend is not None:
         try:
-            # Check cache for similar questions
-            cache_key = f"next_question_{question_type}"
+            # Check cache for similar responses
+            cache_key = ResponseCache.make_key("follow_up_turn", response, question_type, backend.model)
             cached = get_cached_response(cache_key)
-            if cached:
-                next_question = cached
-            else:
-                if OPENAI_API_KEY:
-                    client = openai.OpenAI(api_key=OPENAI_API_KEY)
-                    system_prompt = f"""You are a friendly and professional AI interviewer. Generate a brief follow-up question about {question_type}. 
-                    The question should be:
-                    1. One sentence only
-                    2. Clear and direct
-                    3. Easy to answer
-                    Keep it concise."""
-                    response_obj = client.chat.completions.create(
-                        model=OPENAI_MODEL,
-                        messages=[
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": f"Generate a brief follow-up question about {question_type}."}
-                        ],
-                        temperature=0.7,
-                        max_tokens=50
-                    )
-                    next_question = response_obj.choices[0].message.content
-                    cache_response(cache_key, next_question)
-                else:
-                    # Fallback to predefined questions
-                    question_types = list(INTERVIEW_QUESTIONS.keys())
-                    current_index = question_types.index(question_type) if question_type in question_types else 0
-                    next_type = question_types[(current_index + 1) % len(question_types)]
-                    next_question = INTERVIEW_QUESTIONS[next_type]["question"]
-            
-            used_questions[client_id].add(next_question)
-            current_question_types[client_id] = question_type
-            return f"{summary}\n\n{next_question}"
+            parsed = parse_follow_up(cached) if cached else None
+            if not parsed:
+                reply = await backend.complete(
+                    follow_up_messages(question_type, response),
+                    max_tokens=120,
+                    temperature=0.7,
+                    json_mode=OPENAI_JSON_MODE
+                )
+                parsed = parse_follow_up(reply)
+                if parsed:
+                    cache_response(cache_key, json.dumps({"summary": parsed[0], "follow_up": parsed[1]}))
+                elif reply:
+                    print("Error generating follow-up: reply had no follow-up question")
+            if parsed:
+                summary, follow_up = parsed
+                await mark_question_used(client_id, follow_up)
+                return f"{summary}\n\n{follow_up}"
         except Exception as e:
             print(f"Error generating follow-up: {e}")
-            # Fallback to predefined questions if OpenAI fails
-            question_types = list(INTERVIEW_QUESTIONS.keys())
-            current_index = question_types.index(question_type) if question_type in question_types else 0
-            next_type = question_types[(current_index + 1) % len(question_types)]
-            next_question = INTERVIEW_QUESTIONS[next_type]["question"]
-            used_questions[client_id].add(next_question)
-            current_question_types[client_id] = next_type
-            return f"{summary}\n\n{next_question}"
-    
-    # Check if the response is too short or unclear
-    if len(response.split()) < 10:
-        return f"{summary}\n\nCould you elaborate a bit more?"
     
-    try:
-        # Check cache for similar follow-ups
-        cache_key = f"follow_up_{response[:100]}"  # Use first 100 chars as key
-        cached = get_cached_response(cache_key)
-        if cached:
-            follow_up = cached
-        else:
-            if OPENAI_API_KEY:
-                client = openai.OpenAI(api_key=OPENAI_API_KEY)
-                system_prompt = """You are a friendly and professional AI interviewer. Generate a brief follow-up question based on the candidate's response. 
-                The question should be:
-                1. One sentence only
-                2. Direct and relevant
-                3. Easy to understand
-                Keep it concise."""
-                response_obj = client.chat.completions.create(
-                    model=OPENAI_MODEL,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": f"Candidate's response: {response}\nGenerate a brief follow-up question."}
-                    ],
-                    temperature=0.7,
-                    max_tokens=50
-                )
-                follow_up = response_obj.choices[0].message.content
-                cache_response(cache_key, follow_up)
-            else:
-                # Fallback to predefined questions
-                follow_ups = INTERVIEW_QUESTIONS[question_type]["follow_ups"]
-                available_follow_ups = [q for q in follow_ups if q not in used_questions[client_id]]
-                
-                if not available_follow_ups:
-                    question_types = list(INTERVIEW_QUESTIONS.keys())
-                    current_index = question_types.index(question_type) if question_type in question_types else 0
-                    next_type = question_types[(current_index + 1) % len(question_types)]
-                    next_question = INTERVIEW_QUESTIONS[next_type]["question"]
-                    used_questions[client_id].add(next_question)
-                    current_question_types[client_id] = next_type
-                    return f"{summary}\n\n{next_question}"
-                
-                follow_up = available_follow_ups[0]
-        
-        used_questions[client_id].add(follow_up)
-        return f"{summary}\n\n{follow_up}"
-    except Exception as e:
-        print(f"Error generating follow-up: {e}")
-        # Fallback to predefined questions if OpenAI fails
-        follow_ups = INTERVIEW_QUESTIONS[question_type]["follow_ups"]
-        available_follow_ups = [q for q in follow_ups if q not in used_questions[client_id]]
-        
-        if not available_follow_ups:
-            question_types = list(INTERVIEW_QUESTIONS.keys())
-            current_index = question_types.index(question_type) if question_type in question_types else 0
-            next_type = question_types[(current_index + 1) % len(question_types)]
-            next_question = INTERVIEW_QUESTIONS[next_type]["question"]
-            used_questions[client_id].add(next_question)
-            current_question_types[client_id] = next_type
-            return f"{summary}\n\n{next_question}"
-        
-        follow_up = available_follow_ups[0]
-        used_questions[client_id].add(follow_up)
-        return f"{summary}\n\n{follow_up}"
+    # Fallback to predefined questions
+    return f"{DEFAULT_SUMMARY}\n\n{await predefined_follow_up(question_type, client_id)}"
 
 def analyze_response(response):
     """Analyze the candidate's response and provide feedback"""
@@ -527,29 +626,50 @@ def analyze_response(response):
             "next_question": "Let's continue with our discussion."
         }
 
-async def save_audio_file(client_id: str, audio_data: bytes, session_info: dict):
-    """Save audio file with metadata"""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+def new_recording_stamp(session_dir: Path):
+    """Allocate the next sequence number for a session and the timestamp used in filenames
+    
+    The sequence number keeps clips saved within the same second apart and
+    orders them for combining.
+    """
+    seq = manifests.next_sequence(session_dir)
+    return seq, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{seq:04d}"
+
+def new_audio_path(session_info: dict, client_id: str):
+    """Choose the sequenced path for a new candidate answer in its session directory"""
     session_id = session_info.get("session_id", client_id)
     
     # Create session directory
     session_dir = RECORDINGS_DIR / session_id
     session_dir.mkdir(exist_ok=True)
     
-    # Save audio file
+    seq, timestamp = new_recording_stamp(session_dir)
     audio_filename = AUDIO_FILENAME_PATTERN.format(timestamp=timestamp, ext=AUDIO_FORMAT)
-    audio_path = session_dir / audio_filename
-    
-    async with aiofiles.open(audio_path, 'wb') as f:
-        await f.write(audio_data)
-    
-    # Calculate file size
-    file_size = len(audio_data)
-    
-    # Save metadata
+    return seq, timestamp, session_dir / audio_filename
+
+async def record_audio_clip(session_dir: Path, entry: dict) -> dict:
+    """Append a saved MP3 clip to the session's combined track and record it in the manifest"""
+    async with combiner.lock(session_dir):
+        if entry["filename"].endswith(".mp3"):
+            # Only extend the track in sequence order; a clip that finished saving
+            # after a later one is left to the full combine at finish
+            appended = [e.get("seq", 0) for e in manifests.entries(session_dir, kind="audio") if e.get("in_combined")]
+            entry["in_combined"] = entry.get("seq", 0) > max(appended, default=0) and \
+                await combiner.append(session_dir, session_dir / entry["filename"])
+        return manifests.append(session_dir, entry)
+
+async def save_audio_metadata(client_id: str, session_info: dict, seq: int, timestamp: str, audio_path: Path,
+                              file_size: int, upload_sha256: str = None, duration: float = None):
+    """Record an answer already written to the session directory in the session manifest"""
+    session_id = session_info.get("session_id", client_id)
     metadata = {
+        "seq": seq,
+        "filename": audio_path.name,
+        "role": "candidate",
+        "kind": "audio",
+        "duration": duration,
         "timestamp": timestamp,
-        "audio_file": audio_filename,
+        "audio_file": audio_path.name,
         "session_id": session_id,
         "client_id": client_id,
         "interview_question": session_info.get("current_question", "Unknown"),
@@ -560,20 +680,50 @@ async def save_audio_file(client_id: str, audio_data: bytes, session_info: dict)
         "audio_quality": AUDIO_QUALITY,
         "whisper_model": WHISPER_MODEL
     }
+    if upload_sha256:
+        metadata["upload_sha256"] = upload_sha256
     
     # Add transcription if enabled
     if SAVE_TRANSCRIPTION and "transcription" in session_info:
         metadata["transcription"] = session_info["transcription"]
     
-    metadata_filename = METADATA_FILENAME_PATTERN.format(timestamp=timestamp)
-    metadata_path = session_dir / metadata_filename
+    metadata = await record_audio_clip(audio_path.parent, metadata)
+    index_recording(session_id, audio_path, manifests.path(audio_path.parent))
+    
+    # Record the answer on the session
+    await in_store(session_registry.update, session_id, lambda session: session["audio_files"].append(metadata))
+    return metadata
+
+async def save_audio_file(client_id: str, audio_data: bytes, session_info: dict):
+    """Save audio file with metadata"""
+    seq, timestamp, audio_path = new_audio_path(session_info, client_id)
+    
+    async with aiofiles.open(audio_path, 'wb') as f:
+        await f.write(audio_data)
     
-    async with aiofiles.open(metadata_path, 'w') as f:
-        await f.write(json.dumps(metadata, indent=2))
+    metadata = await save_audio_metadata(client_id, session_info, seq, timestamp, audio_path, len(audio_data))
+    return str(audio_path), metadata
+
+async def save_candidate_recording(client_id: str, target_session: dict, content: bytes):
+    """Encode a candidate answer to MP3 directly in the session directory"""
+    seq, timestamp, audio_path = new_audio_path(target_session, client_id)
+    if check_ffmpeg() and await encode_mp3(content, str(audio_path)):
+        metadata = await save_audio_metadata(
+            client_id, target_session, seq, timestamp, audio_path, audio_path.stat().st_size,
+            duration=mp3_duration(audio_path)
+        )
+        print(f"Saved converted MP3 file: {audio_path}")
+    else:
+        # Fall back to original file
+        audio_path, metadata = await save_audio_file(client_id, content, target_session)
+        print(f"Saved original file: {audio_path}")
+    
+    print(f"Audio saved successfully for session: {target_session['session_id']}")
     
+    # Audio combining will only happen when Finish button is clicked
     return str(audio_path), metadata
 
-def create_session_info(client_id: str):
+def create_session_info(client_id: str, backend_name: str = None):
     """Create a new interview session"""
     session_id = f"interview_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{client_id[-6:]}"
     return {
@@ -581,99 +731,205 @@ def create_session_info(client_id: str):
         "start_time": datetime.now().isoformat(),
         "current_question": "introduction",
         "response_count": 0,
+        "interviewer_backend": backend_name,
         "audio_files": [],
         "video_files": []
     }
 
+async def respond_to_transcription(websocket: WebSocket, client_id: str, session_id: str, transcription: str,
+                                   voice: str = None, backend=None):
+    """Record the candidate's answer and send the interviewer's follow-up"""
+    backend = backend or interviewer_backend()
+    if USE_OPENAI_FOR_INTERVIEW:
+        # Taken before the answer is recorded: the prompt adds the answer itself
+        history, summary = await interview_context(client_id, backend, transcription)
+    await append_conversation(client_id, "candidate", transcription)
+    
+    # Update session info
+    def count_response(session):
+        session["response_count"] += 1
+    await in_store(session_registry.update, session_id, count_response)
+    
+    # Generate follow-up with the session's interviewer backend or fallback
+    streamed = False
+    if USE_OPENAI_FOR_INTERVIEW:
+        if OPENAI_STREAM_FOLLOW_UPS:
+            follow_up = await stream_interviewer_response(websocket, session_id, backend, history, transcription,
+                                                          voice, summary)
+            streamed = follow_up is not None
+        else:
+            follow_up = await generate_interviewer_response(backend, history, transcription, summary)
+        if not follow_up:
+            # The model already failed this turn, so don't wait on it again
+            follow_up = await generate_follow_up("introduction", transcription, client_id)
+    else:
+        # Summary and follow-up in a single request
+        follow_up = await generate_follow_up("introduction", transcription, client_id, backend)
+    
+    # Send follow-up, with its speech already being synthesized (or, when it
+    # was streamed, already sent sentence by sentence)
+    await websocket.send_json({
+        "type": "follow_up",
+        "message": follow_up,
+        "session_id": session_id,
+        "streamed": streamed,
+        **({} if streamed else prepare_interviewer_speech(follow_up, voice, session_id))
+    })
+    
+    await append_conversation(client_id, "interviewer", follow_up)
+
+async def send_partial_transcription(websocket: WebSocket, streamer: StreamingTranscriber, session_id: str,
+                                     partial_pass: asyncio.Future):
+    """Wait for a sliding-window pass and push the partial result to the browser"""
+    generation = streamer.generation
+    try:
+        partial = await partial_pass
+    except Exception as e:
+        print(f"Error during partial transcription: {e}")
+        return
+    # Drop results that belong to an answer that has already been finalised
+    if generation != streamer.generation or not partial:
+        return
+    try:
+        await websocket.send_json({
+            "type": "partial_transcription",
+            "transcription": partial,
+            "session_id": session_id
+        })
+    except Exception as e:
+        print(f"Error sending partial transcription: {e}")
+
+async def save_streamed_answer(client_id: str, audio_data: bytes, transcription: str):
+    """Save an answer that was streamed over the WebSocket into the session directory"""
+    target_session = await in_store(session_registry.get, client_id)
+    if not target_session or not audio_data:
+        return
+    try:
+        target_session["transcription"] = transcription
+        await in_store(session_registry.update, target_session["session_id"],
+                       lambda session: session.update(transcription=transcription))
+        await save_candidate_recording(client_id, target_session, audio_data)
+    except Exception as e:
+        print(f"Error saving streamed audio: {e}")
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
     client_id = str(datetime.now().timestamp())
+    # Voice the browser will play interviewer messages in; it may change it later
+    voice = websocket.query_params.get("voice")
+    # Where this session's questions come from
+    backend = interviewer_backend(websocket.query_params.get("backend"))
     active_connections[client_id] = websocket
-    conversation_history[client_id] = []
-    interview_sessions[client_id] = create_session_info(client_id)
-    session_id = interview_sessions[client_id]["session_id"]
+    session_info = await in_store(session_registry.create, client_id, create_session_info(client_id, backend.name))
+    session_id = session_info["session_id"]
+    streamer = StreamingTranscriber(
+        transcription_pool,
+        window_seconds=STREAM_WINDOW_SECONDS,
+        step_seconds=STREAM_STEP_SECONDS
+    )
+    partial_task = None
+    # Updates of this session's jobs run by other workers, read from their job files
+    job_watch = asyncio.ensure_future(job_queue.watch(
+        session_id, lambda job: websocket.send_json({"type": "job_update", "job": job})
+    ))
     
     try:
-        # Generate initial greeting using OpenAI or fallback
-        if USE_OPENAI_FOR_INTERVIEW and OPENAI_API_KEY:
-            initial_message = await generate_openai_response(conversation_history[client_id])
+        # Generate initial greeting with the session's backend or fallback
+        if USE_OPENAI_FOR_INTERVIEW:
+            initial_message = await generate_interviewer_response(backend, await get_conversation(client_id))
             if not initial_message:
                 initial_message = INTERVIEW_QUESTIONS["introduction"]["question"]
         else:
             initial_message = INTERVIEW_QUESTIONS["introduction"]["question"]
         
-        # Send initial greeting
+        # Send initial greeting, with its speech already being synthesized
         await websocket.send_json({
             "type": "greeting",
             "message": initial_message,
-            "session_id": session_id
+            "session_id": session_id,
+            **prepare_interviewer_speech(initial_message, voice, session_id)
         })
         
         # Add to conversation history
-        conversation_history[client_id].append({
-            "role": "interviewer",
-            "content": initial_message
-        })
+        await append_conversation(client_id, "interviewer", initial_message)
         
         while True:
-            data = await websocket.receive_text()
-            response_data = json.loads(data)
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
             
-            # Process the response
-            if "transcription" in response_data:
-                transcription = response_data["transcription"]
-                conversation_history[client_id].append({
-                    "role": "candidate",
-                    "content": transcription
-                })
-                
-                # Update session info
-                interview_sessions[client_id]["response_count"] += 1
-                
-                # Generate follow-up using OpenAI or fallback
-                if USE_OPENAI_FOR_INTERVIEW and OPENAI_API_KEY:
-                    follow_up = await generate_openai_response(conversation_history[client_id], transcription)
-                    if not follow_up:
-                        # Fallback to predefined questions
-                        current_question = conversation_history[client_id][-2]["content"] if len(conversation_history[client_id]) > 1 else "introduction"
-                        follow_up = generate_follow_up("introduction", transcription, client_id)
-                else:
-                    # Use fallback questions
-                    current_question = conversation_history[client_id][-2]["content"] if len(conversation_history[client_id]) > 1 else "introduction"
-                    follow_up = generate_follow_up("introduction", transcription, client_id)
+            # Binary frames are MediaRecorder timeslices of the answer being recorded
+            if message.get("bytes") is not None:
+                streamer.add_chunk(message["bytes"])
+                # Idle tracking only needs last_active to within a few seconds
+                if session_registry.touch_due(session_id):
+                    await in_store(session_registry.touch, session_id)
+                if streamer.should_run_partial():
+                    partial_task = asyncio.ensure_future(
+                        send_partial_transcription(websocket, streamer, session_id, streamer.start_partial())
+                    )
+                continue
+            
+            response_data = json.loads(message["text"])
+            
+            # The candidate picked another interviewer voice
+            if response_data.get("voice"):
+                voice = response_data["voice"]
+                continue
+            
+            # A new streamed answer is starting
+            if response_data.get("audio_start"):
+                streamer.reset()
+                continue
+            
+            # The candidate stopped speaking: finish the tail of the stream
+            if response_data.get("audio_end"):
+                if not streamer.has_audio:
+                    continue
+                audio_data = streamer.data
+                try:
+                    transcription = (await streamer.final()).strip()
+                except Exception as e:
+                    print(f"Error during final transcription: {e}")
+                    transcription = ""
+                streamer.reset()
+                print(f"Transcription: {transcription}")
                 
-                # Send follow-up
                 await websocket.send_json({
-                    "type": "follow_up",
-                    "message": follow_up,
+                    "type": "final_transcription",
+                    "transcription": transcription,
                     "session_id": session_id
                 })
                 
-                conversation_history[client_id].append({
-                    "role": "interviewer",
-                    "content": follow_up
-                })
+                # Saving the answer does not need to delay the follow-up
+                asyncio.ensure_future(save_streamed_answer(client_id, audio_data, transcription))
+                
+                if transcription:
+                    await respond_to_transcription(websocket, client_id, session_id, transcription, voice, backend)
+                continue
+            
+            # Process a transcription produced by /transcribe
+            if "transcription" in response_data:
+                await respond_to_transcription(websocket, client_id, session_id, response_data["transcription"], voice,
+                                              backend)
                 
     except Exception as e:
         print(f"WebSocket error: {e}")
     finally:
+        # Stop any decode still running for a client that has gone away
+        if partial_task and not partial_task.done():
+            partial_task.cancel()
+        job_watch.cancel()
         if client_id in active_connections:
             del active_connections[client_id]
-        if client_id in conversation_history:
-            del conversation_history[client_id]
-        if client_id in interview_sessions:
-            del interview_sessions[client_id]
+        await clear_conversation_state(client_id)
+        await in_store(state_store.delete, "recorded_utterances", session_id)
+        await in_store(session_registry.close, client_id)
+        combiner.forget(RECORDINGS_DIR / session_id)
 
 @app.post("/transcribe")
-async def transcribe_audio(file: UploadFile = File(...), client_id: str = Form(None), session_id: str = Form(None)):
-    # Check file size
-    content = await file.read()
-    file_size_mb = len(content) / (1024 * 1024)
-    
-    if file_size_mb > MAX_RECORDING_SIZE_MB:
-        return {"error": f"File too large. Maximum size is {MAX_RECORDING_SIZE_MB}MB"}
-    
+async def transcribe_audio(request: Request, file: UploadFile = File(...), client_id: str = Form(None), session_id: str = Form(None)):
     # Determine file extension based on content type and filename
     file_extension = "webm"  # Default for MediaRecorder
     if file.content_type:
@@ -695,148 +951,119 @@ async def transcribe_audio(file: UploadFile = File(...), client_id: str = Form(N
     
     print(f"Detected file type: {file_extension}, content_type: {file.content_type}, filename: {file.filename}")
     
-    # Save the uploaded file temporarily
-    with tempfile.NamedTemporaryFile(delete=False, suffix=f".{file_extension}") as temp_file:
-        temp_file.write(content)
-        temp_file.flush()
-        temp_file_path = temp_file.name
-        
-        try:
-            # Convert to WAV if needed
-            wav_file_path = None
-            if file_extension != "wav":
-                wav_file_path = temp_file_path.replace(f".{file_extension}", ".wav")
-                print(f"Converting {temp_file_path} to {wav_file_path}")
-                if convert_webm_to_wav(temp_file_path, wav_file_path):
-                    # Use the converted WAV file for transcription
-                    transcription_file = wav_file_path
-                    print(f"Using converted WAV file: {transcription_file}")
-                else:
-                    # Fall back to original file
-                    transcription_file = temp_file_path
-                    print(f"Conversion failed, using original file: {transcription_file}")
-            else:
-                transcription_file = temp_file_path
-                print(f"Using original WAV file: {transcription_file}")
-            
-            # Transcribe using Whisper
-            result = model.transcribe(transcription_file)
-            transcription = result["text"]
-            print(f"Transcription: {transcription}")
-            
-        except Exception as e:
-            # Clean up temp files
-            os.unlink(temp_file_path)
-            if wav_file_path and os.path.exists(wav_file_path):
-                os.unlink(wav_file_path)
-            return {"error": f"Failed to transcribe audio: {str(e)}"}
-        
-        # Find the session to save to
-        target_session = None
-        target_client_id = None
-        
-        if session_id:
-            # Look for session by session_id
-            for client_key, session_info in interview_sessions.items():
-                if session_info.get("session_id") == session_id:
-                    target_session = session_info
-                    target_client_id = client_key
-                    break
-        elif client_id:
-            # Look for session by client_id
-            if client_id in interview_sessions:
-                target_session = interview_sessions[client_id]
-                target_client_id = client_id
-            else:
-                # Try to find by session_id if client_id looks like a session_id
-                for client_key, session_info in interview_sessions.items():
-                    if session_info.get("session_id") == client_id:
-                        target_session = session_info
-                        target_client_id = client_key
-                        break
-        
-        # Save audio file if session found
+    # Find the session to save to
+    target_client_id, target_session = await in_store(session_registry.find, session_id=session_id, client_id=client_id)
+    save_client_id = target_client_id or client_id or "unknown"
+    if not target_session:
+        print(f"No active session found for client_id: {client_id}, session_id: {session_id}")
+        print(f"Active sessions: {await in_store(len, session_registry)}")
+    
+    if not check_ffmpeg():
+        return {"error": "Failed to transcribe audio: ffmpeg is not available"}
+    
+    seq = None
+    timestamp = None
+    audio_path = None
+    # The upload is fed to ffmpeg a chunk at a time, checking its size as it goes
+    upload = UploadReader(file, max_bytes=MAX_RECORDING_SIZE_MB * 1024 * 1024, chunk_size=UPLOAD_CHUNK_SIZE)
+    try:
         if target_session:
-            try:
-                target_session["transcription"] = transcription
-                
-                # Convert to MP3 for saving
-                mp3_file_path = temp_file_path.replace(f".{file_extension}", ".mp3")
-                if convert_to_mp3(temp_file_path, mp3_file_path):
-                    # Save the converted MP3 file
-                    with open(mp3_file_path, 'rb') as mp3_file:
-                        mp3_content = mp3_file.read()
-                    audio_path, metadata = await save_audio_file(target_client_id or client_id or "unknown", mp3_content, target_session)
-                    print(f"Saved converted MP3 file: {audio_path}")
-                    
-                    # Clean up MP3 temp file
-                    if os.path.exists(mp3_file_path):
-                        os.unlink(mp3_file_path)
-                else:
-                    # Fall back to original file
-                    audio_path, metadata = await save_audio_file(target_client_id or client_id or "unknown", content, target_session)
-                    print(f"Saved original file: {audio_path}")
-                
-                target_session["audio_files"].append(metadata)
-                print(f"Audio saved successfully for session: {target_session['session_id']}")
-                
-                # Audio combining will only happen when Finish button is clicked
-                # Removed automatic combining here
-                    
-            except Exception as e:
-                print(f"Error saving audio file: {e}")
-                # Continue even if saving fails
-        else:
-            print(f"No active session found for client_id: {client_id}, session_id: {session_id}")
-            print(f"Available sessions: {list(interview_sessions.keys())}")
+            seq, timestamp, audio_path = new_audio_path(target_session, save_client_id)
+        # Single ffmpeg pass: MP3 straight into the session directory, 16 kHz
+        # PCM for Whisper on a pipe; abandoned if the client goes away
+        audio = await cancel_on_disconnect(
+            request, transcode_answer(upload, str(audio_path) if audio_path else None)
+        )
         
-        # Clean up temp files
-        os.unlink(temp_file_path)
-        if wav_file_path and os.path.exists(wav_file_path):
-            os.unlink(wav_file_path)
+        # Transcribe using the Whisper worker pool
+        result = await transcription_pool.transcribe(audio)
+        transcription = result["text"]
+        print(f"Transcription: {transcription}")
         
-        return {"transcription": transcription}
+    except UploadTooLarge:
+        if audio_path and audio_path.exists():
+            audio_path.unlink()
+        return {"error": f"File too large. Maximum size is {MAX_RECORDING_SIZE_MB}MB"}
+    except Exception as e:
+        if audio_path and audio_path.exists():
+            audio_path.unlink()
+        return {"error": f"Failed to transcribe audio: {str(e)}"}
+    
+    # Save audio metadata if session found
+    if target_session:
+        try:
+            target_session["transcription"] = transcription
+            await in_store(session_registry.update, target_session["session_id"],
+                       lambda session: session.update(transcription=transcription))
+            await save_audio_metadata(
+                save_client_id, target_session, seq, timestamp, audio_path, audio_path.stat().st_size,
+                upload_sha256=upload.sha256, duration=round(len(audio) / WHISPER_SAMPLE_RATE, 3)
+            )
+            print(f"Saved converted MP3 file: {audio_path}")
+            print(f"Audio saved successfully for session: {target_session['session_id']}")
+        except Exception as e:
+            print(f"Error saving audio file: {e}")
+            # Continue even if saving fails
+    
+    return {"transcription": transcription}
 
 @app.get("/recordings")
-async def list_recordings():
-    """List all interview recordings"""
-    recordings = []
-    for session_dir in RECORDINGS_DIR.iterdir():
-        if session_dir.is_dir():
-            session_info = {
-                "session_id": session_dir.name,
-                "audio_files": [],
-                "video_files": [],
-                "metadata_files": [],
-                "interviewer_files": [],
-                "candidate_files": [],
-                "combined_audio": None,
-                "combined_video": None
-            }
-            
-            for file_path in session_dir.iterdir():
-                if file_path.suffix == ".mp3":
-                    if file_path.name.startswith('interviewer_'):
-                        session_info["interviewer_files"].append(file_path.name)
-                    elif file_path.name == COMBINED_AUDIO_FILENAME:
-                        session_info["combined_audio"] = file_path.name
-                    else:
-                        session_info["candidate_files"].append(file_path.name)
-                    session_info["audio_files"].append(file_path.name)
-                elif file_path.suffix == ".wav":
-                    session_info["candidate_files"].append(file_path.name)
-                    session_info["audio_files"].append(file_path.name)
-                elif file_path.suffix in [".mp4", ".webm"]:
-                    if file_path.name == "combined_interview.mp4":
-                        session_info["combined_video"] = file_path.name
-                    else:
-                        session_info["video_files"].append(file_path.name)
-                elif file_path.suffix == ".json":
-                    session_info["metadata_files"].append(file_path.name)
-            
-            recordings.append(session_info)
+async def list_recordings(limit: int = RECORDINGS_PAGE_SIZE, cursor: str = None, since: str = None, has_video: bool = None):
+    """List interview recordings, newest first, from the recordings index
     
-    return {"recordings": recordings}
+    Pass the returned next_cursor to fetch the following page. since accepts a
+    Unix timestamp or ISO date and keeps sessions updated at or after it.
+    """
+    limit = max(1, min(limit, 1000))
+    since_timestamp = None
+    if since:
+        try:
+            since_timestamp = float(since)
+        except ValueError:
+            try:
+                since_timestamp = datetime.fromisoformat(since).timestamp()
+            except ValueError:
+                return {"error": f"Invalid since value: {since}"}
+    
+    try:
+        recordings, next_cursor = await asyncio.get_running_loop().run_in_executor(
+            None, lambda: recordings_index.list_sessions(
+                limit=limit, cursor=cursor, since=since_timestamp, has_video=has_video
+            )
+        )
+    except ValueError as e:
+        return {"error": str(e)}
+    
+    return {"recordings": recordings, "next_cursor": next_cursor}
+
+def session_recordings_from_manifest(session_id: str, entries: list) -> dict:
+    """Build the session recordings listing from its manifest entries"""
+    recordings = {
+        "session_id": session_id,
+        "audio_files": [],
+        "video_files": [],
+        "metadata_files": [MANIFEST_FILENAME],
+        "interviewer_files": [],
+        "candidate_files": [],
+        "combined_audio": None,
+        "combined_video": None,
+        "manifest": entries
+    }
+    for entry in entries:
+        filename = entry["filename"]
+        if entry.get("role") == "combined":
+            recordings[f"combined_{entry.get('kind')}"] = filename
+            if entry.get("kind") == "audio":
+                recordings["audio_files"].append(filename)
+        elif entry.get("kind") == "audio":
+            recordings["audio_files"].append(filename)
+            if entry.get("role") in ("candidate", "interviewer"):
+                recordings[f"{entry['role']}_files"].append(filename)
+        elif entry.get("kind") == "video":
+            recordings["video_files"].append(filename)
+            if entry.get("mp4_filename"):
+                recordings["video_files"].append(entry["mp4_filename"])
+    return recordings
 
 @app.get("/recordings/{session_id}")
 async def get_session_recordings(session_id: str):
@@ -845,6 +1072,10 @@ async def get_session_recordings(session_id: str):
     if not session_dir.exists():
         return {"error": "Session not found"}
     
+    if manifests.exists(session_dir):
+        return session_recordings_from_manifest(session_id, manifests.entries(session_dir))
+    
+    # Sessions recorded before manifests: walk the directory
     audio_files = []
     video_files = []
     metadata_files = []
@@ -866,7 +1097,7 @@ async def get_session_recordings(session_id: str):
             candidate_files.append(file.name)
             audio_files.append(file.name)
         elif file.suffix in ['.mp4', '.webm']:
-            if file.name == "combined_interview.mp4":
+            if file.name == COMBINED_VIDEO_FILENAME:
                 combined_video = file.name
             else:
                 video_files.append(file.name)
@@ -884,96 +1115,178 @@ async def get_session_recordings(session_id: str):
         "combined_video": combined_video
     }
 
+@app.get("/ready")
+async def readiness(response: Response):
+    """Readiness probe: 200 once the Whisper models are loaded and warm, 503 until then
+    
+    With WHISPER_PRELOAD off the models load on the first transcription, so
+    this is 200 from the start.
+    """
+    status = transcription_pool.status()
+    if not status["ready"]:
+        response.status_code = 503
+    return status
+
+@app.get("/cache-stats")
+async def get_cache_stats():
+    """Hit/miss/eviction counters for monitoring"""
+    return {
+        "response_cache": response_cache.stats(),
+        "tts_cache": tts_cache.stats(),
+        "prepared_speech": prepared_speech.stats()
+    }
+
 @app.get("/interview-questions")
 async def get_interview_questions():
     return {"questions": [q["question"] for q in INTERVIEW_QUESTIONS.values()]}
 
-@app.post("/tts")
-async def text_to_speech(text: str = Form(...), voice: str = Form(None), session_id: str = Form(None)):
-    """Convert text to speech using OpenAI TTS and optionally save it"""
-    if not USE_OPENAI_TTS or not OPENAI_API_KEY:
-        return {"error": "OpenAI TTS not enabled or API key not configured"}
-    
+async def save_interviewer_speech(session_id: str, text: str, voice: str, speech: SpeechStream):
+    """Save interviewer speech to the session while it is still arriving from the provider"""
     try:
-        client = openai.OpenAI(api_key=OPENAI_API_KEY)
-        
-        # Use the provided voice or default to config setting
-        selected_voice = voice if voice else OPENAI_TTS_VOICE
+        session_dir = RECORDINGS_DIR / session_id
+        session_dir.mkdir(parents=True, exist_ok=True)
         
-        # Generate speech
-        response = client.audio.speech.create(
-            model=OPENAI_TTS_MODEL,
-            voice=selected_voice,
-            input=text
-        )
+        # Sequence number and timestamp for the interviewer speech
+        seq, timestamp = new_recording_stamp(session_dir)
+        interviewer_filename = f"interviewer_{timestamp}.mp3"
+        interviewer_path = session_dir / interviewer_filename
+        
+        # Save the interviewer speech in the same MP3 format as answers, so it
+        # can be appended to the combined track as is. ffmpeg reads the chunks
+        # as they are streamed to the browser.
+        if not (check_ffmpeg() and await encode_mp3(speech, str(interviewer_path))):
+            audio_content = await speech.wait()
+            async with aiofiles.open(interviewer_path, "wb") as f:
+                await f.write(audio_content)
+        
+        if not speech.complete:
+            interviewer_path.unlink(missing_ok=True)
+            print(f"Discarded incomplete interviewer speech for session {session_id}")
+            return
+        
+        # Record the interviewer speech in the session manifest
+        await record_audio_clip(session_dir, {
+            "seq": seq,
+            "filename": interviewer_filename,
+            "role": "interviewer",
+            "kind": "audio",
+            "duration": mp3_duration(interviewer_path),
+            "type": "interviewer_speech",
+            "timestamp": timestamp,
+            "text": text,
+            "voice": voice,
+            "model": OPENAI_TTS_MODEL,
+            "file_size": interviewer_path.stat().st_size
+        })
+        index_recording(session_id, interviewer_path, manifests.path(session_dir))
         
-        # Save to temporary file
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3")
-        response.stream_to_file(temp_file.name)
+        print(f"Saved interviewer speech: {interviewer_path}")
         
-        # Read the file content
-        with open(temp_file.name, "rb") as f:
-            audio_content = f.read()
+        # Audio combining will only happen when Finish button is clicked
+        # Removed automatic combining here
         
-        # Save interviewer speech if session_id is provided
+    except Exception as e:
+        print(f"Error saving interviewer speech: {e}")
+
+def speech_recorder(session_id: str, text: str, voice: str):
+    """Callback saving a SpeechStream of interviewer speech to the session, if there is one"""
+    def on_start(speech: SpeechStream):
         if session_id:
-            try:
-                session_dir = RECORDINGS_DIR / session_id
-                session_dir.mkdir(parents=True, exist_ok=True)
-                
-                # Generate timestamp for the interviewer speech
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                interviewer_filename = f"interviewer_{timestamp}.mp3"
-                interviewer_path = session_dir / interviewer_filename
-                
-                # Save the interviewer speech
-                with open(interviewer_path, "wb") as f:
-                    f.write(audio_content)
-                
-                # Save metadata for the interviewer speech
-                metadata = {
-                    "type": "interviewer_speech",
-                    "timestamp": timestamp,
-                    "text": text,
-                    "voice": selected_voice,
-                    "model": OPENAI_TTS_MODEL,
-                    "filename": interviewer_filename,
-                    "file_size": len(audio_content)
-                }
-                
-                metadata_filename = f"interviewer_metadata_{timestamp}.json"
-                metadata_path = session_dir / metadata_filename
-                
-                async with aiofiles.open(metadata_path, 'w') as f:
-                    await f.write(json.dumps(metadata, indent=2))
-                
-                print(f"Saved interviewer speech: {interviewer_path}")
-                
-                # Audio combining will only happen when Finish button is clicked
-                # Removed automatic combining here
-                
-            except Exception as e:
-                print(f"Error saving interviewer speech: {e}")
-        
-        # Clean up temp file
-        os.unlink(temp_file.name)
-        
-        return Response(
-            content=audio_content,
-            media_type="audio/mpeg",
-            headers={"Content-Disposition": "attachment; filename=speech.mp3"}
-        )
-        
+            asyncio.ensure_future(save_interviewer_speech(session_id, text, voice, speech))
+    return on_start
+
+def prepare_interviewer_speech(text: str, voice: str, session_id: str) -> dict:
+    """Start synthesizing a message the browser is about to speak
+    
+    Returns the fields to add to the message: the voice and the URL that
+    streams the speech, or nothing if TTS is disabled.
+    """
+    if not USE_OPENAI_TTS or not OPENAI_API_KEY or not text:
+        return {}
+    voice = voice or OPENAI_TTS_VOICE
+    # Recorded in the session when the browser fetches it to play, like speech from /tts
+    speech_id = prepared_speech.prepare(text, voice, OPENAI_TTS_MODEL, speech_chunks,
+                                        on_fetch=speech_recorder(session_id, text, voice))
+    return {"audio_url": f"/tts/{speech_id}", "voice": voice}
+
+async def stream_tts(text: str, voice: str = None, session_id: str = None):
+    """Stream speech to the client as the provider produces it, teeing it into the session"""
+    if not USE_OPENAI_TTS or not OPENAI_API_KEY:
+        return {"error": "OpenAI TTS not enabled or API key not configured"}
+    
+    # Use the provided voice or default to config setting
+    selected_voice = voice if voice else OPENAI_TTS_VOICE
+    
+    # Served from the TTS cache when this text was already spoken in this voice
+    chunks = tts_cache.stream(text, selected_voice, OPENAI_TTS_MODEL, speech_chunks,
+                              on_start=speech_recorder(session_id, text, selected_voice))
+    try:
+        # Wait for the first chunk so a failed request still gets an error response
+        first_chunk = await chunks.__anext__()
+    except StopAsyncIteration:
+        return {"error": "TTS generation failed: empty response"}
     except Exception as e:
         print(f"Error generating TTS: {e}")
         return {"error": f"TTS generation failed: {str(e)}"}
+    
+    async def body():
+        yield first_chunk
+        async for chunk in chunks:
+            yield chunk
+    
+    return StreamingResponse(
+        body(),
+        media_type="audio/mpeg",
+        headers={"Content-Disposition": "attachment; filename=speech.mp3"}
+    )
 
-@app.get("/recordings/{session_id}/{filename}")
-async def serve_audio_file(session_id: str, filename: str):
-    """Serve audio/video files from recordings directory"""
+@app.post("/tts")
+async def text_to_speech(text: str = Form(...), voice: str = Form(None), session_id: str = Form(None)):
+    """Convert text to speech using OpenAI TTS and optionally save it"""
+    return await stream_tts(text, voice, session_id)
+
+async def claim_utterance(session_id: str, utterance_id: str) -> bool:
+    """Whether this is the first request for an utterance of the session, on any worker"""
+    claimed = {}
+    def add(utterance_ids):
+        claimed["first"] = utterance_id not in utterance_ids
+        if claimed["first"]:
+            utterance_ids.append(utterance_id)
+    await in_store(state_store.update, "recorded_utterances", session_id, add, default=[])
+    return claimed["first"]
+
+@app.get("/tts")
+async def text_to_speech_stream(text: str, voice: str = None, session_id: str = None, utterance_id: str = None):
+    """Same as POST /tts, for use as an <audio> source so playback starts with the first chunk
+    
+    Browsers may fetch an <audio> source more than once (metadata probe, seek),
+    so the speech is only recorded in the session for the first request with
+    a given utterance_id; without one, GET /tts only plays it.
+    """
+    record = session_id and utterance_id and await claim_utterance(session_id, utterance_id)
+    return await stream_tts(text, voice, session_id if record else None)
+
+@app.get("/tts/{speech_id}")
+async def prepared_text_to_speech(speech_id: str):
+    """Stream speech that was started when its greeting or follow-up was sent"""
+    try:
+        speech = await prepared_speech.get(speech_id)
+    except Exception as e:
+        return {"error": f"TTS generation failed: {str(e)}"}
+    if speech is None:
+        raise HTTPException(status_code=404, detail="Speech not found")
+    return StreamingResponse(
+        speech.__aiter__(),
+        media_type="audio/mpeg",
+        headers={"Content-Disposition": "attachment; filename=speech.mp3"}
+    )
+
+@app.api_route("/recordings/{session_id}/{filename}", methods=["GET", "HEAD"])
+async def serve_audio_file(request: Request, session_id: str, filename: str):
+    """Serve audio/video files from recordings directory (HEAD sends only the headers)"""
     file_path = RECORDINGS_DIR / session_id / filename
     
-    if not file_path.exists():
+    if not file_path.is_file():
         raise HTTPException(status_code=404, detail="File not found")
     
     # Determine content type based on file extension
@@ -987,18 +1300,94 @@ async def serve_audio_file(session_id: str, filename: str):
     elif filename.endswith(".webm"):
         content_type = "video/webm"
     
-    # Read and return the file
-    with open(file_path, "rb") as f:
-        content = f.read()
-    
-    return Response(
-        content=content,
+    # Stream the file, honouring Range and conditional requests so players can seek
+    return file_response(
+        request,
+        file_path,
         media_type=content_type,
         headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
 
+async def finish_combined_audio(session_dir: Path, on_progress=None) -> bool:
+    """Produce the combined interview audio, without ffmpeg when every clip was appended as it was saved"""
+    clips = [
+        entry for entry in manifests.entries(session_dir, kind="audio")
+        if entry.get("role") in ("candidate", "interviewer")
+    ]
+    if clips and all(entry.get("in_combined") for entry in clips):
+        async with combiner.lock(session_dir):
+            published = await asyncio.get_running_loop().run_in_executor(None, combiner.publish, session_dir)
+            if published:
+                print(f"Published incrementally combined audio for {session_dir.name}")
+                return True
+    # Older sessions, or clips that could not be appended: full ffmpeg combine
+    return await combine_audio_files(session_dir, on_progress=on_progress)
+
+def recorded_duration(session_dir: Path, kind: str):
+    """Total duration of a session's recorded clips of one kind, or None if any is unknown"""
+    durations = [
+        entry.get("duration") for entry in manifests.entries(session_dir, kind=kind)
+        if entry.get("role") in ("candidate", "interviewer")
+    ]
+    return round(sum(durations), 3) if durations and None not in durations else None
+
+def record_combined(session_dir: Path, filename: str, kind: str):
+    """Add a combined recording to the session manifest and recordings index"""
+    manifests.append(session_dir, {
+        "filename": filename,
+        "role": "combined",
+        "kind": kind,
+        "duration": recorded_duration(session_dir, kind)
+    })
+    index_recording(session_dir.name, session_dir / filename, manifests.path(session_dir))
+
+def combine_progress(report_progress, total_seconds: float = None):
+    """ffmpeg progress callback reporting processed seconds (and a percentage when the total is known)"""
+    def on_progress(seconds):
+        progress = {"processed_seconds": round(seconds, 1), "total_seconds": total_seconds}
+        if total_seconds:
+            progress["percent"] = min(100, round(100 * seconds / total_seconds))
+        report_progress(progress)
+    return on_progress
+
+async def combine_audio_job(job: dict, report_progress):
+    """Background job: publish or build the session's combined interview audio"""
+    session_dir = RECORDINGS_DIR / job["session_id"]
+    on_progress = combine_progress(report_progress, recorded_duration(session_dir, "audio"))
+    if not await finish_combined_audio(session_dir, on_progress=on_progress):
+        return {"combined": False, "filename": None}
+    record_combined(session_dir, COMBINED_AUDIO_FILENAME, "audio")
+    return {"combined": True, "filename": COMBINED_AUDIO_FILENAME}
+
+async def combine_video_job(job: dict, report_progress):
+    """Background job: concatenate the session's videos into one MP4"""
+    session_dir = RECORDINGS_DIR / job["session_id"]
+    on_progress = combine_progress(report_progress, recorded_duration(session_dir, "video"))
+    if not await combine_video_files(session_dir, on_progress=on_progress):
+        return {"combined": False, "filename": None}
+    record_combined(session_dir, COMBINED_VIDEO_FILENAME, "video")
+    return {"combined": True, "filename": COMBINED_VIDEO_FILENAME}
+
+# Post-processing run when a session finishes, as concurrent background jobs.
+# Each job type is registered with job_queue below.
+FINISH_SESSION_JOBS = {
+    "audio": "combine_audio",
+    "video": "combine_video"
+}
+
+# Jobs that must finish before a finish-session job starts: the video combine
+# needs every pending WebM transcode, or it would concat WebM and MP4 clips
+FINISH_SESSION_DEPENDENCIES = {
+    "combine_video": "transcode_video"
+}
+
 @app.post("/finish-session")
 async def finish_session(request: Request):
+    """Start the end-of-session combines as background jobs
+    
+    Returns their job ids straight away; progress arrives as job_update
+    messages on /ws. Pass "wait": true to get the combined results instead.
+    """
     data = await request.json()
     session_id = data.get("session_id")
     if not session_id:
@@ -1007,16 +1396,25 @@ async def finish_session(request: Request):
     if not session_dir.exists():
         return {"success": False, "error": f"Session directory not found: {session_dir}"}
     try:
-        # Combine audio files
-        audio_result = combine_audio_files(session_dir)
-        
-        # Combine video files
-        video_result = combine_video_files(session_dir)
-        
-        if audio_result or video_result:
-            return {"success": True, "audio_combined": audio_result, "video_combined": video_result}
+        jobs = {}
+        for name, job_type in FINISH_SESSION_JOBS.items():
+            dependency = FINISH_SESSION_DEPENDENCIES.get(job_type)
+            depends_on = job_queue.outstanding(session_id, dependency) if dependency else None
+            jobs[name] = job_queue.submit(job_type, session_id, depends_on=depends_on)["job_id"]
+        if not data.get("wait"):
+            return {"success": True, "session_id": session_id, "jobs": jobs}
+        
+        # The jobs run concurrently, so this waits for the slowest of them
+        finished = await asyncio.gather(*(job_queue.wait(job_id) for job_id in jobs.values()))
+        results = {
+            name: bool(job["result"] and job["result"]["combined"])
+            for name, job in zip(jobs, finished)
+        }
+        if any(results.values()):
+            return {"success": True, "session_id": session_id, "jobs": jobs,
+                    "audio_combined": results["audio"], "video_combined": results["video"]}
         else:
-            return {"success": False, "error": "No files to combine"}
+            return {"success": False, "error": "No files to combine", "jobs": jobs}
     except Exception as e:
         return {"success": False, "error": str(e)}
 
@@ -1024,40 +1422,15 @@ async def finish_session(request: Request):
 async def save_video(file: UploadFile = File(...), client_id: str = Form(None), session_id: str = Form(None)):
     """Save video file for a session"""
     try:
-        # Check file size (50MB limit for video)
-        content = await file.read()
-        if len(content) > 50 * 1024 * 1024:  # 50MB
-            return {"error": "Video file too large (max 50MB)"}
-        
         # Determine target session
-        target_session = None
-        target_client_id = None
+        target_client_id, target_session = await in_store(session_registry.find, session_id=session_id,
+                                                          client_id=client_id)
         
-        if session_id:
-            # Look for session by session_id
-            for client_key, session_info in interview_sessions.items():
-                if session_info.get("session_id") == session_id:
-                    target_session = session_info
-                    target_client_id = client_key
-                    break
-        elif client_id:
-            # Look for session by client_id
-            if client_id in interview_sessions:
-                target_session = interview_sessions[client_id]
-                target_client_id = client_id
-            else:
-                # Try to find by session_id if client_id looks like a session_id
-                for client_key, session_info in interview_sessions.items():
-                    if session_info.get("session_id") == client_id:
-                        target_session = session_info
-                        target_client_id = client_key
-                        break
-        
-        # If no session found, create a new one
+        # If no session found, create a detached one (reclaimed once idle)
         if not target_session:
+            target_client_id = f"video_session_{int(datetime.now().timestamp())}"
             if session_id:
                 # Use the provided session_id to create a new session
-                target_client_id = f"video_session_{int(datetime.now().timestamp())}"
                 target_session = {
                     "session_id": session_id,
                     "start_time": datetime.now().isoformat(),
@@ -1066,19 +1439,17 @@ async def save_video(file: UploadFile = File(...), client_id: str = Form(None),
                     "audio_files": [],
                     "video_files": []
                 }
-                interview_sessions[target_client_id] = target_session
             else:
                 # Create a completely new session
-                target_client_id = f"video_session_{int(datetime.now().timestamp())}"
                 target_session = create_session_info(target_client_id)
-                interview_sessions[target_client_id] = target_session
+            target_session = await in_store(session_registry.attach, target_client_id, target_session)
         
         # Create session directory
         session_dir = RECORDINGS_DIR / target_session["session_id"]
         session_dir.mkdir(parents=True, exist_ok=True)
         
-        # Generate timestamp for the video file
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # Sequence number and timestamp for the video file
+        seq, timestamp = new_recording_stamp(session_dir)
         
         # Determine file extension
         content_type = file.content_type
@@ -1093,65 +1464,118 @@ async def save_video(file: UploadFile = File(...), client_id: str = Form(None),
         video_filename = f"response_{timestamp}.{file_extension}"
         video_path = session_dir / video_filename
         
-        # Save video file
-        with open(video_path, "wb") as f:
-            f.write(content)
+        # Stream the video file to disk (50MB limit for video)
+        try:
+            upload = await save_upload(file, video_path, max_bytes=50 * 1024 * 1024, chunk_size=UPLOAD_CHUNK_SIZE)
+        except UploadTooLarge:
+            return {"error": "Video file too large (max 50MB)"}
         
-        # Convert webm to mp4 if needed and keep both
-        mp4_filename = None
-        if file_extension == "webm":
-            mp4_filename = f"response_{timestamp}.mp4"
-            mp4_path = session_dir / mp4_filename
-            try:
-                # Optimized settings for small file size
-                cmd = [
-                    "ffmpeg", "-i", str(video_path),
-                    "-c:v", "libx264", "-preset", "ultrafast", "-crf", "32",
-                    "-s", "640x480",  # Reduce resolution 
-                    "-r", "15",       # Reduce frame rate to 15fps
-                    "-c:a", "aac", "-b:a", "64k",  # Lower audio bitrate
-                    "-movflags", "+faststart", "-y", str(mp4_path)
-                ]
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                if result.returncode == 0:
-                    print(f"Successfully converted {video_path} to {mp4_path}")
-                else:
-                    print(f"Error converting webm to mp4: {result.stderr}")
-                    mp4_filename = None
-            except Exception as e:
-                print(f"Exception during webm to mp4 conversion: {e}")
-                mp4_filename = None
-        
-        # Save metadata
-        metadata = {
+        # Record the video in the session manifest; its duration is filled in by the transcode
+        metadata = manifests.append(session_dir, {
+            "seq": seq,
+            "filename": video_filename,
+            "role": "candidate",
+            "kind": "video",
+            "duration": None,
             "type": "candidate_video",
             "timestamp": timestamp,
-            "filename": video_filename,
             "content_type": content_type,
-            "file_size": len(content),
+            "file_size": upload.size,
+            "sha256": upload.sha256,
             "session_id": target_session["session_id"]
-        }
-        
-        metadata_filename = f"metadata_{timestamp}.json"
-        metadata_path = session_dir / metadata_filename
-        
-        async with aiofiles.open(metadata_path, 'w') as f:
-            await f.write(json.dumps(metadata, indent=2))
+        })
+        index_recording(target_session["session_id"], video_path, manifests.path(session_dir))
         
         # Add to session info
-        if "video_files" not in target_session:
-            target_session["video_files"] = []
-        target_session["video_files"].append(metadata)
+        await in_store(session_registry.update, target_session["session_id"],
+                       lambda session: session.setdefault("video_files", []).append(metadata))
         
         print(f"Video saved successfully for session: {target_session['session_id']}")
         
-        return {"success": True, "filename": video_filename, "mp4_filename": mp4_filename, "session_id": target_session["session_id"]}
+        # Convert webm to mp4 in the background and keep both
+        job = None
+        if file_extension == "webm":
+            job = job_queue.submit("transcode_video", target_session["session_id"], {
+                "filename": video_filename,
+                "mp4_filename": f"response_{timestamp}.mp4"
+            })
+        
+        return {
+            "success": True,
+            "filename": video_filename,
+            "mp4_filename": None,
+            "job_id": job["job_id"] if job else None,
+            "session_id": target_session["session_id"]
+        }
         
     except Exception as e:
         print(f"Error saving video: {e}")
         return {"error": f"Failed to save video: {str(e)}"}
 
-def add_video_annotations(input_path: Path, output_path: Path, annotations: dict = None):
+async def transcode_video_job(job: dict, report_progress):
+    """Background job: transcode an uploaded WebM video to a small MP4"""
+    params = job["params"]
+    session_dir = RECORDINGS_DIR / job["session_id"]
+    video_path = session_dir / params["filename"]
+    mp4_path = session_dir / params["mp4_filename"]
+    # Written under a temporary name so listings never show a half-written MP4
+    partial_path = session_dir / f"{params['mp4_filename']}.part"
+    
+    # Optimized settings for small file size
+    cmd = [
+        "ffmpeg", "-i", str(video_path),
+        "-c:v", "libx264", "-preset", "ultrafast", "-crf", "32",
+        "-s", "640x480",  # Reduce resolution 
+        "-r", "15",       # Reduce frame rate to 15fps
+        "-c:a", "aac", "-b:a", "64k",  # Lower audio bitrate
+        "-movflags", "+faststart",
+        "-progress", "pipe:1", "-nostats",
+        "-f", "mp4", "-y", str(partial_path)
+    ]
+    processed = {"seconds": None}
+    
+    def on_progress(seconds):
+        processed["seconds"] = seconds
+        report_progress({"processed_seconds": round(seconds, 1)})
+    
+    result = await media_runner.run(cmd, on_progress=on_progress)
+    if not result.ok:
+        partial_path.unlink(missing_ok=True)
+        raise RuntimeError(f"Error converting webm to mp4: {result.stderr}")
+    os.replace(partial_path, mp4_path)
+    index_recording(job["session_id"], mp4_path)
+    print(f"Successfully converted {video_path} to {mp4_path}")
+    
+    # Record the MP4 and the video's duration on the original upload's manifest entry
+    duration = round(processed["seconds"], 3) if processed["seconds"] is not None else None
+    manifests.update(session_dir, params["filename"], mp4_filename=params["mp4_filename"], duration=duration)
+    
+    return {"mp4_filename": params["mp4_filename"], "file_size": mp4_path.stat().st_size}
+
+async def push_job_update(job: dict):
+    """Send job progress and results to the session's WebSocket, if it is on this worker
+
+    Jobs run by other workers reach it through the watch started by /ws.
+    """
+    session = await in_store(session_registry.get_by_session_id, job["session_id"])
+    websocket = active_connections.get(session["client_id"]) if session else None
+    if websocket:
+        await websocket.send_json({"type": "job_update", "job": job})
+
+job_queue.register("transcode_video", transcode_video_job)
+job_queue.register("combine_audio", combine_audio_job)
+job_queue.register("combine_video", combine_video_job)
+job_queue.add_listener(push_job_update)
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status, progress and result of a background job"""
+    job = job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+async def add_video_annotations(input_path: Path, output_path: Path, annotations: dict = None):
     """Add annotations to a video file using ffmpeg"""
     try:
         if not annotations:
@@ -1206,7 +1630,7 @@ def add_video_annotations(input_path: Path, output_path: Path, annotations: dict
         ]
         
         print(f"Adding annotations to video: {input_path}")
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = await media_runner.run(cmd)
         
         if result.returncode == 0:
             print(f"Successfully annotated video: {output_path}")
@@ -1242,7 +1666,7 @@ def generate_subtitle_file(transcriptions: list, output_path: Path):
         print(f"Error generating subtitle file: {e}")
         return False
 
-def create_annotated_video(session_dir: Path, video_filename: str, annotations: dict = None):
+async def create_annotated_video(session_dir: Path, video_filename: str, annotations: dict = None):
     """Create an annotated version of a video file"""
     try:
         input_path = session_dir / video_filename
@@ -1256,9 +1680,16 @@ def create_annotated_video(session_dir: Path, video_filename: str, annotations:
         output_path = session_dir / annotated_filename
         
         # Add annotations
-        success = add_video_annotations(input_path, output_path, annotations)
+        success = await add_video_annotations(input_path, output_path, annotations)
         
         if success:
+            manifests.append(session_dir, {
+                "filename": annotated_filename,
+                "role": "annotated",
+                "kind": "video",
+                "source": video_filename
+            })
+            index_recording(session_dir.name, output_path, manifests.path(session_dir))
             return annotated_filename
         else:
             return None
@@ -1267,42 +1698,13 @@ def create_annotated_video(session_dir: Path, video_filename: str, annotations:
         print(f"Error creating annotated video: {e}")
         return None
 
-def extract_audio_from_video(video_path: Path, audio_path: Path):
-    """Extract audio from video file"""
-    try:
-        cmd = [
-            'ffmpeg', '-i', str(video_path),
-            '-vn', '-acodec', 'pcm_s16le',
-            '-ar', '44100', '-ac', '1',
-            '-y', str(audio_path)
-        ]
-        
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        
-        if result.returncode == 0:
-            print(f"Successfully extracted audio: {audio_path}")
-            return True
-        else:
-            print(f"Error extracting audio: {result.stderr}")
-            return False
-            
-    except Exception as e:
-        print(f"Error in extract_audio_from_video: {e}")
-        return False
-
-def transcribe_video_audio(video_path: Path, session_dir: Path):
-    """Extract audio from video and transcribe it"""
+async def transcribe_video_audio(video_path: Path, session_dir: Path):
+    """Decode the audio track of a video in memory and transcribe it"""
     try:
-        # Extract audio to temporary file
-        temp_audio_path = session_dir / "temp_audio.wav"
-        if not extract_audio_from_video(video_path, temp_audio_path):
-            return None
-        
-        # Transcribe the audio
-        result = model.transcribe(str(temp_audio_path))
+        audio = await decode_audio(video_path)
         
-        # Clean up temp file
-        temp_audio_path.unlink(missing_ok=True)
+        # Transcribe the audio in the worker pool
+        result = await transcription_pool.transcribe(audio)
         
         return result.get("text", "")
         
@@ -1327,7 +1729,9 @@ async def annotate_video(request: Request):
             return {"error": f"Session directory not found: {session_id}"}
         
         # Create annotated video
-        annotated_filename = create_annotated_video(session_dir, video_filename, annotations)
+        annotated_filename = await cancel_on_disconnect(
+            request, create_annotated_video(session_dir, video_filename, annotations)
+        )
         
         if annotated_filename:
             return {
@@ -1362,7 +1766,7 @@ async def generate_subtitles(request: Request):
             return {"error": f"Video file not found: {video_filename}"}
         
         # Transcribe video audio
-        transcription = transcribe_video_audio(video_path, session_dir)
+        transcription = await cancel_on_disconnect(request, transcribe_video_audio(video_path, session_dir))
         
         if not transcription:
             return {"error": "Failed to transcribe video audio"}
@@ -1425,7 +1829,7 @@ async def create_enhanced_video(request: Request):
         
         # Generate subtitles if requested
         if options.get("generate_subtitles", True):
-            transcription = transcribe_video_audio(video_path, session_dir)
+            transcription = await cancel_on_disconnect(request, transcribe_video_audio(video_path, session_dir))
             if transcription:
                 subtitle_filename = f"{video_filename.rsplit('.', 1)[0]}.srt"
                 subtitle_path = session_dir / subtitle_filename
@@ -1440,7 +1844,9 @@ async def create_enhanced_video(request: Request):
                     annotations["subtitle_path"] = str(subtitle_path)
         
         # Create enhanced video
-        enhanced_filename = create_annotated_video(session_dir, video_filename, annotations)
+        enhanced_filename = await cancel_on_disconnect(
+            request, create_annotated_video(session_dir, video_filename, annotations)
+        )
         
         if enhanced_filename:
             return {
@@ -0,0 +1,155 @@
+"""
+Registry of live interview sessions
+
+Sessions are indexed both by the WebSocket client_id that owns them and by
+their session_id, so uploads can find their session in O(1) instead of
+scanning every connection. Sessions created for uploads that have no
+WebSocket (e.g. /save-video with an unknown session_id) are detached and,
+like any other session, reclaimed once idle for longer than the timeout.
+
+Records are kept in a state store (see state_store.py), so with a shared
+store every worker process sees the same sessions. Returned session dicts
+are copies: change them through update() rather than in place.
+
+Each session records the worker that created it, and only that worker evicts
+it once idle. A session whose worker has gone away (e.g. restarted) is
+evicted by any worker after twice the timeout.
+"""
+
+import os
+import time
+
+from state_store import InProcessStateStore
+
+SESSIONS = "sessions"  # session_id -> session info
+CLIENTS = "clients"    # client_id -> session_id
+
+# touch() only writes last_active once it is this stale
+TOUCH_INTERVAL_SECONDS = 5
+
+
+class SessionRegistry:
+    """Interview sessions with O(1) lookup by client_id and session_id"""
+
+    def __init__(self, timeout_minutes: float = 60, store=None, owner: str = None):
+        self.timeout_seconds = timeout_minutes * 60
+        self.store = store if store is not None else InProcessStateStore()
+        self.owner = owner or str(os.getpid())
+        self._touched = {}  # session_id -> when this worker last wrote its last_active
+
+    def create(self, client_id: str, session_info: dict, connected: bool = True) -> dict:
+        """Register a new session owned by client_id"""
+        session_id = session_info["session_id"]
+        session_info["client_id"] = client_id
+        session_info["connected"] = connected
+        session_info["owner"] = self.owner
+        session_info["last_active"] = time.time()
+        with self.store.transaction():
+            previous = self.store.get(CLIENTS, client_id)
+            if previous is not None:
+                self.store.delete(SESSIONS, previous)
+            self.store.set(SESSIONS, session_id, session_info)
+            self.store.set(CLIENTS, client_id, session_id)
+        return session_info
+
+    def attach(self, client_id: str, session_info: dict) -> dict:
+        """Register a detached session, or return the one already using its session_id"""
+        with self.store.transaction():
+            existing = self.store.get(SESSIONS, session_info["session_id"])
+            if existing is not None:
+                existing["last_active"] = time.time()
+                self.store.set(SESSIONS, existing["session_id"], existing)
+                return existing
+            return self.create(client_id, session_info, connected=False)
+
+    def get(self, client_id: str):
+        """Return the session owned by client_id, or None"""
+        session_id = self.store.get(CLIENTS, client_id)
+        return self.store.get(SESSIONS, session_id) if session_id is not None else None
+
+    def get_by_session_id(self, session_id: str):
+        """Return the session with the given session_id, or None"""
+        return self.store.get(SESSIONS, session_id)
+
+    def find(self, session_id: str = None, client_id: str = None):
+        """Resolve an upload's session, returning (client_id, session) or (None, None)
+
+        session_id takes precedence; a client_id that is not a known client is
+        also tried as a session_id, since the browser sends the session_id in both.
+        """
+        with self.store.transaction():
+            session = None
+            if session_id:
+                session = self.store.get(SESSIONS, session_id)
+            elif client_id:
+                session = self.get(client_id) or self.store.get(SESSIONS, client_id)
+            if session is None:
+                return None, None
+            session["last_active"] = time.time()
+            self.store.set(SESSIONS, session["session_id"], session)
+            return session["client_id"], session
+
+    def update(self, session_id: str, fn):
+        """Atomically apply fn to a session (mutating it in place) and return the result"""
+        def apply(session):
+            if session is not None:
+                fn(session)
+                session["last_active"] = time.time()
+
+        with self.store.transaction():
+            if self.store.get(SESSIONS, session_id) is None:
+                return None
+            return self.store.update(SESSIONS, session_id, apply)
+
+    def touch_due(self, session_id: str, now: float = None) -> bool:
+        """Whether touch() would write, i.e. this worker last touched the session a while ago"""
+        now = now if now is not None else time.time()
+        return now - self._touched.get(session_id, 0) >= TOUCH_INTERVAL_SECONDS
+
+    def touch(self, session_id: str, now: float = None):
+        """Mark a session as active, at most once every TOUCH_INTERVAL_SECONDS"""
+        now = now if now is not None else time.time()
+        if not self.touch_due(session_id, now):
+            return
+        self._touched[session_id] = now
+        self.update(session_id, lambda session: None)
+
+    def close(self, client_id: str):
+        """Remove the session owned by client_id"""
+        with self.store.transaction():
+            session_id = self.store.get(CLIENTS, client_id)
+            if session_id is None:
+                return None
+            session = self.store.get(SESSIONS, session_id)
+            self.store.delete(CLIENTS, client_id)
+            self.store.delete(SESSIONS, session_id)
+            self._touched.pop(session_id, None)
+            return session
+
+    def evict_idle(self, now: float = None) -> list:
+        """Remove this worker's sessions idle for longer than the timeout and return them
+
+        Other workers' sessions are left to them, unless idle for twice the
+        timeout, by which time a live worker would have evicted them itself.
+        """
+        now = now if now is not None else time.time()
+        with self.store.transaction():
+            expired = [
+                session for _, session in self.store.items(SESSIONS)
+                if now - session.get("last_active", now) > self.timeout_seconds * (
+                    1 if session.get("owner", self.owner) == self.owner else 2)
+            ]
+            for session in expired:
+                self.store.delete(SESSIONS, session["session_id"])
+                self.store.delete(CLIENTS, session["client_id"])
+                self._touched.pop(session["session_id"], None)
+        return expired
+
+    def client_ids(self) -> list:
+        return [client_id for client_id, _ in self.store.items(CLIENTS)]
+
+    def __contains__(self, client_id: str):
+        return self.store.get(CLIENTS, client_id) is not None
+
+    def __len__(self):
+        return self.store.count(SESSIONS)
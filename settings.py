@@ -0,0 +1,69 @@
+"""
+Server configuration: config.py on top of defaults for newer settings
+
+A config.py copied from an older config.example.py doesn't have the settings
+added since, so each of those gets its default here (the same value as in
+config.example.py) and is overridden by config.py when it sets it.
+"""
+
+from pathlib import Path
+
+# Recording settings
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+RECORDINGS_INDEX_PATH = Path("state") / "recordings.sqlite3"
+RECORDINGS_PAGE_SIZE = 100
+
+# Combined recording settings
+COMBINED_VIDEO_FILENAME = "combined_interview.mp4"
+
+# Session settings
+STATE_STORE = "memory"
+STATE_STORE_PATH = Path("state") / "sessions.sqlite3"
+
+# Whisper settings
+TRANSCRIPTION_WORKERS = 2
+TRANSCRIPTION_EXECUTOR = "thread"
+WHISPER_PRELOAD = True
+WHISPER_WARMUP = True
+STREAM_WINDOW_SECONDS = 10.0
+STREAM_STEP_SECONDS = 2.0
+
+# Media (ffmpeg) job settings
+MEDIA_JOB_CONCURRENCY = None
+MEDIA_JOB_TIMEOUT_SECONDS = 600
+VIDEO_JOB_WORKERS = 2
+
+# OpenAI settings
+INTERVIEWER_BACKEND = "openai"
+LOCAL_LLM_MODEL_PATH = None
+LOCAL_LLM_CONTEXT_TOKENS = 4096
+LOCAL_LLM_THREADS = None
+OPENAI_STREAM_FOLLOW_UPS = True
+CONTEXT_RECENT_TURNS = 6
+CONTEXT_TOKEN_BUDGET = 3000
+CONTEXT_SUMMARY_MAX_TOKENS = 200
+OPENAI_JSON_MODE = True
+OPENAI_MAX_CONCURRENCY = 16
+OPENAI_MAX_CONNECTIONS = 20
+OPENAI_KEEPALIVE_SECONDS = 60
+OPENAI_TIMEOUT_SECONDS = 30
+OPENAI_MAX_RETRIES = 2
+
+# Response cache settings
+RESPONSE_CACHE_BACKEND = "memory"
+RESPONSE_CACHE_PATH = Path("cache") / "responses.sqlite3"
+RESPONSE_CACHE_MAX_ENTRIES = 1000
+RESPONSE_CACHE_MAX_BYTES = 1024 * 1024
+RESPONSE_CACHE_TTL_SECONDS = 3600
+
+# TTS cache settings
+TTS_CACHE_DIR = Path("cache") / "tts"
+TTS_CACHE_MAX_BYTES = 200 * 1024 * 1024
+TTS_CACHE_VOICES = None  # Defaults to [OPENAI_TTS_VOICE]
+TTS_CACHE_WARMUP_ON_STARTUP = False
+PREPARED_SPEECH_TTL_SECONDS = 600
+
+from config import *
+
+if TTS_CACHE_VOICES is None:
+    TTS_CACHE_VOICES = [OPENAI_TTS_VOICE]
@@ -0,0 +1,160 @@
+"""
+Pluggable store for per-session server state
+
+Session records, conversation history and question bookkeeping live behind
+this small namespaced key-value interface instead of process-global dicts.
+The in-process store keeps today's single-worker behaviour; the SQLite
+store (WAL mode) lets several uvicorn workers on one machine share state,
+so an upload can land on a different worker than the WebSocket.
+
+Values must be JSON-serialisable. Both stores hand out copies, so callers
+write changes back with set() or update() rather than mutating returned
+objects in place.
+"""
+
+import copy
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+
+class InProcessStateStore:
+    """State held in dictionaries private to this process
+
+    Values are copied on the way in and out, as the SQLite store's are by
+    serialising them, so code that works with one store works with both.
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.RLock()
+
+    @contextmanager
+    def transaction(self):
+        """Group several operations so other threads see them atomically"""
+        with self._lock:
+            yield
+
+    def get(self, namespace: str, key: str, default=None):
+        with self._lock:
+            return copy.deepcopy(self._data.get(namespace, {}).get(key, default))
+
+    def set(self, namespace: str, key: str, value):
+        with self._lock:
+            self._data.setdefault(namespace, {})[key] = copy.deepcopy(value)
+
+    def delete(self, namespace: str, key: str):
+        with self._lock:
+            self._data.get(namespace, {}).pop(key, None)
+
+    def items(self, namespace: str) -> list:
+        with self._lock:
+            return copy.deepcopy(list(self._data.get(namespace, {}).items()))
+
+    def count(self, namespace: str) -> int:
+        with self._lock:
+            return len(self._data.get(namespace, {}))
+
+    def update(self, namespace: str, key: str, fn, default=None):
+        """Atomically apply fn to the stored value (mutating it in place) and return it"""
+        with self.transaction():
+            value = self.get(namespace, key)
+            if value is None:
+                value = copy.deepcopy(default)
+            fn(value)
+            self.set(namespace, key, value)
+            return value
+
+
+class SQLiteStateStore:
+    """State shared by all worker processes through a SQLite file in WAL mode"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._connection = None
+        self._lock = threading.RLock()
+        self._depth = 0
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        # Opened on first use, so creating the store (e.g. importing the server) touches no files
+        with self._lock:
+            if self._connection is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None, timeout=30)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS state ("
+                    "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+                    "PRIMARY KEY (namespace, key))"
+                )
+                self._connection = conn
+            return self._connection
+
+    @contextmanager
+    def transaction(self):
+        """Write transaction that excludes other workers until it commits"""
+        with self._lock:
+            if self._depth == 0:
+                self._conn.execute("BEGIN IMMEDIATE")
+            self._depth += 1
+            try:
+                yield
+            except BaseException:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._conn.execute("ROLLBACK")
+                raise
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._conn.execute("COMMIT")
+
+    def get(self, namespace: str, key: str, default=None):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM state WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set(self, namespace: str, key: str, value):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO state (namespace, key, value) VALUES (?, ?, ?)",
+                (namespace, key, json.dumps(value))
+            )
+
+    def delete(self, namespace: str, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM state WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def items(self, namespace: str) -> list:
+        with self._lock:
+            rows = self._conn.execute("SELECT key, value FROM state WHERE namespace = ?", (namespace,)).fetchall()
+        return [(key, json.loads(value)) for key, value in rows]
+
+    def count(self, namespace: str) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM state WHERE namespace = ?", (namespace,)).fetchone()[0]
+
+    def update(self, namespace: str, key: str, fn, default=None):
+        """Atomically apply fn to the stored value (mutating it in place) and return it"""
+        with self.transaction():
+            value = self.get(namespace, key)
+            if value is None:
+                value = copy.deepcopy(default)
+            fn(value)
+            self.set(namespace, key, value)
+            return value
+
+
+def create_state_store(kind: str = "memory", path=None):
+    """Build the configured state store"""
+    if kind == "sqlite":
+        return SQLiteStateStore(path)
+    if kind == "memory":
+        return InProcessStateStore()
+    raise ValueError(f"Unknown state store: {kind}")
@@ -0,0 +1,198 @@
+"""
+Incremental transcription of answers streamed over the /ws WebSocket
+
+The browser sends MediaRecorder timeslices (WebM/Opus) as binary frames while
+the candidate is speaking. Whisper is re-run over a sliding window of the
+not-yet-committed audio; once the window grows past its limit every segment
+but the last is committed, so the final pass after the candidate stops only
+has to transcribe the tail of the answer.
+
+Decoding is limited to the tail too: ffmpeg gets the WebM header followed by
+the clusters from the last one that starts before the committed audio ends,
+rather than the whole recording on every pass.
+"""
+
+import asyncio
+import time
+
+import numpy as np
+
+from media import WHISPER_SAMPLE_RATE as SAMPLE_RATE, decode_audio
+
+# EBML IDs of a Matroska cluster and of the cluster's timecode (in milliseconds)
+CLUSTER_ID = b"\x1f\x43\xb6\x75"
+TIMECODE_ID = 0xE7
+
+# Decoding restarts at least this far before the committed point, so the
+# decoder has settled again by the time the kept audio begins
+DECODE_PREROLL_SECONDS = 0.2
+
+
+def read_vint(data: bytes, pos: int):
+    """Read an EBML variable-length integer, returning (value, next position) or None"""
+    if pos >= len(data) or data[pos] == 0:
+        return None
+    length = 9 - data[pos].bit_length()
+    if pos + length > len(data):
+        return None
+    value = data[pos] & (0xFF >> length)
+    for byte in data[pos + 1:pos + length]:
+        value = (value << 8) | byte
+    return value, pos + length
+
+
+def cluster_timecode(data: bytes, pos: int):
+    """Timecode of the cluster starting at pos, or None if pos isn't a complete cluster start"""
+    size = read_vint(data, pos + len(CLUSTER_ID))
+    if size is None:
+        return None
+    pos = size[1]
+    if pos >= len(data) or data[pos] != TIMECODE_ID:
+        return None
+    length = read_vint(data, pos + 1)
+    if length is None or not 1 <= length[0] <= 8 or length[1] + length[0] > len(data):
+        return None
+    return int.from_bytes(data[length[1]:length[1] + length[0]], "big")
+
+
+async def decode_webm_stream(data: bytes) -> np.ndarray:
+    """Decode (possibly truncated) WebM/Opus bytes to 16 kHz mono float32 samples"""
+    # A stream cut at a timeslice boundary usually ends mid-cluster, so ffmpeg
+    # may exit non-zero while still having decoded everything before the cut.
+    return await decode_audio(data, allow_truncated=True)
+
+
+class StreamingTranscriber:
+    """Sliding-window Whisper transcription over a growing audio stream"""
+
+    def __init__(self, transcription_pool, window_seconds: float = 10.0, step_seconds: float = 2.0):
+        self.pool = transcription_pool
+        self.window_seconds = window_seconds
+        self.step_seconds = step_seconds
+        self.generation = 0
+        self.reset()
+
+    def reset(self):
+        """Start a new answer"""
+        self.generation += 1
+        self.chunks = []
+        self.committed_text = ""
+        self.committed_samples = 0
+        self.clusters = []  # (byte offset, start sample) of each cluster seen so far
+        self._scanned = 0
+        self.last_pass_time = 0.0
+        self._pass_task = None
+
+    @property
+    def data(self) -> bytes:
+        return b"".join(self.chunks)
+
+    @property
+    def has_audio(self) -> bool:
+        return bool(self.chunks)
+
+    def add_chunk(self, chunk: bytes):
+        self.chunks.append(chunk)
+
+    def should_run_partial(self) -> bool:
+        """True when step_seconds have passed since the last pass started and none is running"""
+        if self._pass_task is not None and not self._pass_task.done():
+            return False
+        return time.monotonic() - self.last_pass_time >= self.step_seconds
+
+    def _scan_clusters(self, data: bytes):
+        """Record (byte offset, start sample) of clusters received since the last scan"""
+        pos = data.find(CLUSTER_ID, max(self._scanned - len(CLUSTER_ID) - 16, 0))
+        while pos != -1:
+            timecode = cluster_timecode(data, pos)
+            if timecode is None and len(data) - pos < 32:
+                # Cut off mid-header; look at it again once more data has arrived
+                self._scanned = pos
+                return
+            sample = None if timecode is None else timecode * SAMPLE_RATE // 1000
+            # Cluster IDs can also turn up inside Opus packets; real clusters only move forward
+            if sample is not None and (not self.clusters or (pos > self.clusters[-1][0]
+                                                             and sample >= self.clusters[-1][1])):
+                self.clusters.append((pos, sample))
+            pos = data.find(CLUSTER_ID, pos + 1)
+        self._scanned = len(data)
+
+    def _uncommitted_stream(self):
+        """WebM bytes covering the uncommitted audio, and the sample they start at
+
+        That's the header plus every cluster from the last one starting at
+        least DECODE_PREROLL_SECONDS before the committed point, or the whole
+        stream while nothing has been committed yet.
+        """
+        data = self.data
+        self._scan_clusters(data)
+        limit = self.committed_samples - int(DECODE_PREROLL_SECONDS * SAMPLE_RATE)
+        start = None
+        for offset, sample in self.clusters[1:]:
+            if sample > limit:
+                break
+            start = (offset, sample)
+        if start is None:
+            return data, 0
+        header_end = self.clusters[0][0]
+        return data[:header_end] + data[start[0]:], start[1]
+
+    async def _transcribe_window(self, final: bool) -> str:
+        """Transcribe uncommitted audio, committing stable segments if the window is full"""
+        # Taken together before the first await, so the whole pass works from one committed point
+        generation = self.generation
+        committed_text, committed_samples = self.committed_text, self.committed_samples
+        data, start_sample = self._uncommitted_stream()
+        audio = await decode_webm_stream(data)
+        if generation != self.generation:
+            # The answer was reset while this pass was decoding
+            return ""
+        window = audio[max(committed_samples - start_sample, 0):]
+        if window.size == 0:
+            return committed_text
+
+        result = await self.pool.transcribe(window, fp16=False)
+        segments = result.get("segments", [])
+        window_duration = window.size / SAMPLE_RATE
+
+        if generation != self.generation:
+            # The answer was reset while this pass was transcribing
+            return ""
+
+        if not final and window_duration > self.window_seconds and len(segments) > 1:
+            # Everything except the last (still changing) segment is stable
+            stable = segments[:-1]
+            # Relative to the committed point this pass started from, so it is only ever counted once
+            committed_text = " ".join(
+                part for part in [committed_text] + [s["text"].strip() for s in stable] if part
+            )
+            self.committed_text = committed_text
+            self.committed_samples = committed_samples + int(stable[-1]["end"] * SAMPLE_RATE)
+            tail = segments[-1]["text"].strip()
+        else:
+            tail = result.get("text", "").strip()
+
+        return " ".join(part for part in (committed_text, tail) if part)
+
+    def start_partial(self) -> asyncio.Future:
+        """Schedule one partial pass, returning the task that resolves to the current best transcription
+
+        The pass is recorded before this returns, so should_run_partial() is
+        False straight away, even for chunks arriving in the same loop tick.
+        """
+        self.last_pass_time = time.monotonic()
+        self._pass_task = asyncio.ensure_future(self._transcribe_window(final=False))
+        return self._pass_task
+
+    async def partial(self) -> str:
+        """Run one partial pass and return the current best transcription"""
+        return await self.start_partial()
+
+    async def final(self) -> str:
+        """Wait for any in-flight pass, then transcribe the remaining tail"""
+        if self._pass_task is not None and not self._pass_task.done():
+            try:
+                await self._pass_task
+            except Exception as e:
+                print(f"Partial transcription failed: {e}")
+        return await self._transcribe_window(final=True)
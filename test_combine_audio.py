@@ -3,22 +3,28 @@
 Test script to manually trigger audio combining
 """
 
+import asyncio
 import requests
 import json
 import time
 import unittest
 import tempfile
 import shutil
-import subprocess
 from pathlib import Path
 import sys
 import os
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 
 # Add the current directory to the path so we can import from server.py
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from server import combine_audio_files, COMBINED_AUDIO_FILENAME
+from server import app, combine_audio_files, COMBINED_AUDIO_FILENAME, BITEXACT_ARGS
+from media_runner import MediaResult
+
+
+def run_combine(*args):
+    """Run the async combine_audio_files to completion"""
+    return asyncio.run(combine_audio_files(*args))
 
 def test_manual_combine():
     """Test manual audio combining for a session"""
@@ -94,6 +100,8 @@ class TestCombineAudioFiles(unittest.TestCase):
         self.test_dir = tempfile.mkdtemp()
         self.session_dir = Path(self.test_dir) / "test_session"
         self.session_dir.mkdir()
+        self.calls = []
+        self.file_lists = []
     
     def tearDown(self):
         """Clean up test fixtures after each test method"""
@@ -107,20 +115,25 @@ class TestCombineAudioFiles(unittest.TestCase):
             f.write(content)
         return file_path
     
-    @patch('subprocess.run')
-    def test_combine_audio_files_success(self, mock_run):
+    def fake_ffmpeg(self, returncode: int = 0, stderr: str = ""):
+        """Stand-in for media_runner.run that records the command and writes the output file"""
+        async def run(cmd, cwd=None, on_progress=None, **kwargs):
+            self.calls.append((cmd, cwd))
+            file_list = Path(cwd) / "file_list.txt"
+            self.file_lists.append(file_list.read_text() if file_list.exists() else None)
+            if returncode == 0:
+                Path(cmd[-1]).write_text("combined audio")
+            return MediaResult(cmd, returncode, b"", stderr.encode())
+        return patch('server.media_runner.run', side_effect=run)
+    
+    def test_combine_audio_files_success(self):
         """Test successful audio file combination"""
-        # Mock ffmpeg version check to return success
-        mock_run.return_value.returncode = 0
-        mock_run.return_value.stderr = ""
-        
         # Create test audio files
-        self.create_test_audio_file("audio1.mp3", "test audio 1")
-        self.create_test_audio_file("audio2.wav", "test audio 2")
-        self.create_test_audio_file("audio3.webm", "test audio 3")
+        self.create_test_audio_file("response_20240101_120000.mp3", "test audio 1")
+        self.create_test_audio_file("interviewer_20240101_120005.mp3", "test audio 2")
         
-        # Test the function
-        result = combine_audio_files(self.session_dir)
+        with self.fake_ffmpeg():
+            result = run_combine(self.session_dir)
         
         # Check that the function returned True
         self.assertTrue(result)
@@ -133,31 +146,22 @@ class TestCombineAudioFiles(unittest.TestCase):
         file_list = self.session_dir / "file_list.txt"
         self.assertFalse(file_list.exists())
         
-        # Verify ffmpeg was called correctly
-        mock_run.assert_called()
-        # First call should be ffmpeg -version
-        self.assertEqual(mock_run.call_args_list[0][0][0], ['ffmpeg', '-version'])
-        # Second call should be the actual combine command
-        combine_call = mock_run.call_args_list[1]
-        self.assertEqual(combine_call[0][0][0], 'ffmpeg')
-        self.assertEqual(combine_call[0][0][1], '-f')
-        self.assertEqual(combine_call[0][0][2], 'concat')
-        self.assertEqual(combine_call[1]['cwd'], self.session_dir)
+        # Verify ffmpeg was run once, from the session directory
+        self.assertEqual(len(self.calls), 1)
+        cmd, cwd = self.calls[0]
+        self.assertEqual(cmd[:3], ['ffmpeg', '-f', 'concat'])
+        self.assertEqual(cwd, self.session_dir)
     
-    @patch('subprocess.run')
-    def test_combine_audio_files_custom_output_filename(self, mock_run):
+    def test_combine_audio_files_custom_output_filename(self):
         """Test audio file combination with custom output filename"""
-        # Mock ffmpeg version check to return success
-        mock_run.return_value.returncode = 0
-        mock_run.return_value.stderr = ""
-        
         # Create test audio files
         self.create_test_audio_file("audio1.mp3", "test audio 1")
-        self.create_test_audio_file("audio2.wav", "test audio 2")
+        self.create_test_audio_file("audio2.mp3", "test audio 2")
         
         # Test with custom output filename
         custom_filename = "custom_combined.mp3"
-        result = combine_audio_files(self.session_dir, custom_filename)
+        with self.fake_ffmpeg():
+            result = run_combine(self.session_dir, custom_filename)
         
         # Check that the function returned True
         self.assertTrue(result)
@@ -167,143 +171,75 @@ class TestCombineAudioFiles(unittest.TestCase):
         self.assertTrue(combined_file.exists())
         
         # Verify the custom filename was used in the ffmpeg command
-        combine_call = mock_run.call_args_list[1]
-        self.assertEqual(combine_call[0][0][-1], custom_filename)
+        self.assertEqual(self.calls[0][0][-1], str(combined_file))
     
     def test_combine_audio_files_no_audio_files(self):
         """Test behavior when no audio files are present"""
         # Test with empty directory
-        result = combine_audio_files(self.session_dir)
+        with self.fake_ffmpeg():
+            result = run_combine(self.session_dir)
         
-        # Check that the function returned False
+        # Check that the function returned False without running ffmpeg
         self.assertFalse(result)
+        self.assertEqual(self.calls, [])
         
         # Check that no combined file was created
         combined_file = self.session_dir / COMBINED_AUDIO_FILENAME
         self.assertFalse(combined_file.exists())
     
-    @patch('subprocess.run')
-    def test_combine_audio_files_skips_combined_file(self, mock_run):
+    def test_combine_audio_files_skips_combined_file(self):
         """Test that the function skips the combined file if it already exists"""
-        # Mock ffmpeg version check to return success
-        mock_run.return_value.returncode = 0
-        mock_run.return_value.stderr = ""
-        
         # Create test audio files
         self.create_test_audio_file("audio1.mp3", "test audio 1")
-        self.create_test_audio_file("audio2.wav", "test audio 2")
+        self.create_test_audio_file("audio2.mp3", "test audio 2")
         
         # Create an existing combined file
-        existing_combined = self.session_dir / COMBINED_AUDIO_FILENAME
-        self.create_test_audio_file(COMBINED_AUDIO_FILENAME, "existing combined")
+        existing_combined = self.create_test_audio_file(COMBINED_AUDIO_FILENAME, "existing combined")
         
-        # Test the function
-        result = combine_audio_files(self.session_dir)
+        with self.fake_ffmpeg():
+            result = run_combine(self.session_dir)
         
         # Check that the function returned True
         self.assertTrue(result)
         
-        # Check that the combined file was updated (not the original content)
-        with open(existing_combined, 'r') as f:
-            content = f.read()
-        self.assertNotEqual(content, "existing combined")
+        # The old combined file is not an input, and was replaced
+        self.assertNotIn(COMBINED_AUDIO_FILENAME, self.file_lists[0])
+        self.assertNotEqual(existing_combined.read_text(), "existing combined")
     
-    @patch('subprocess.run')
-    def test_combine_audio_files_ignores_non_audio_files(self, mock_run):
-        """Test that non-audio files are ignored"""
-        # Mock ffmpeg version check to return success
-        mock_run.return_value.returncode = 0
-        mock_run.return_value.stderr = ""
-        
+    def test_combine_audio_files_ignores_non_mp3_files(self):
+        """Test that only MP3 clips are combined (every clip is saved as MP3)"""
         # Create test audio files
         self.create_test_audio_file("audio1.mp3", "test audio 1")
-        self.create_test_audio_file("audio2.wav", "test audio 2")
+        self.create_test_audio_file("audio2.mp3", "test audio 2")
         
-        # Create non-audio files
+        # Create other files
+        self.create_test_audio_file("audio3.webm", "raw upload")
         self.create_test_audio_file("text.txt", "text content")
         self.create_test_audio_file("image.jpg", "image content")
         self.create_test_audio_file("document.pdf", "pdf content")
         
-        # Test the function
-        result = combine_audio_files(self.session_dir)
+        with self.fake_ffmpeg():
+            result = run_combine(self.session_dir)
         
         # Check that the function returned True
         self.assertTrue(result)
         
-        # Check that the combined file was created
-        combined_file = self.session_dir / COMBINED_AUDIO_FILENAME
-        self.assertTrue(combined_file.exists())
-        
-        # Check that only audio files were included in the file list
-        file_list_content = ""
-        if (self.session_dir / "file_list.txt").exists():
-            with open(self.session_dir / "file_list.txt", 'r') as f:
-                file_list_content = f.read()
-        
-        # Should only contain audio files
+        # Should only contain the MP3 clips
+        file_list_content = self.file_lists[0]
         self.assertIn("audio1.mp3", file_list_content)
-        self.assertIn("audio2.wav", file_list_content)
+        self.assertIn("audio2.mp3", file_list_content)
+        self.assertNotIn("audio3.webm", file_list_content)
         self.assertNotIn("text.txt", file_list_content)
         self.assertNotIn("image.jpg", file_list_content)
         self.assertNotIn("document.pdf", file_list_content)
     
-    @patch('subprocess.run')
-    def test_combine_audio_files_supports_all_audio_formats(self, mock_run):
-        """Test that all supported audio formats are processed"""
-        # Mock ffmpeg version check to return success
-        mock_run.return_value.returncode = 0
-        mock_run.return_value.stderr = ""
-        
-        # Create test audio files with all supported formats
-        self.create_test_audio_file("audio1.mp3", "test audio 1")
-        self.create_test_audio_file("audio2.wav", "test audio 2")
-        self.create_test_audio_file("audio3.webm", "test audio 3")
-        self.create_test_audio_file("audio4.m4a", "test audio 4")
-        
-        # Test the function
-        result = combine_audio_files(self.session_dir)
-        
-        # Check that the function returned True
-        self.assertTrue(result)
-        
-        # Check that the combined file was created
-        combined_file = self.session_dir / COMBINED_AUDIO_FILENAME
-        self.assertTrue(combined_file.exists())
-    
-    @patch('subprocess.run')
-    def test_combine_audio_files_case_insensitive_extensions(self, mock_run):
-        """Test that file extensions are handled case-insensitively"""
-        # Mock ffmpeg version check to return success
-        mock_run.return_value.returncode = 0
-        mock_run.return_value.stderr = ""
-        
-        # Create test audio files with different case extensions
-        self.create_test_audio_file("audio1.MP3", "test audio 1")
-        self.create_test_audio_file("audio2.WAV", "test audio 2")
-        self.create_test_audio_file("audio3.WEBM", "test audio 3")
-        
-        # Test the function
-        result = combine_audio_files(self.session_dir)
-        
-        # Check that the function returned True
-        self.assertTrue(result)
-        
-        # Check that the combined file was created
-        combined_file = self.session_dir / COMBINED_AUDIO_FILENAME
-        self.assertTrue(combined_file.exists())
-    
-    @patch('subprocess.run')
-    def test_combine_audio_files_ffmpeg_not_available(self, mock_run):
+    def test_combine_audio_files_ffmpeg_not_available(self):
         """Test behavior when ffmpeg is not available"""
-        # Mock ffmpeg version check to return failure
-        mock_run.return_value.returncode = 1
-        mock_run.return_value.stderr = "ffmpeg not found"
-        
         # Create test audio files
         self.create_test_audio_file("audio1.mp3", "test audio 1")
         
-        # Test the function
-        result = combine_audio_files(self.session_dir)
+        with patch('server.media_runner.run', side_effect=FileNotFoundError("ffmpeg")):
+            result = run_combine(self.session_dir)
         
         # Check that the function returned False
         self.assertFalse(result)
@@ -317,136 +253,92 @@ class TestCombineAudioFiles(unittest.TestCase):
         non_existent_dir = Path("/non/existent/directory")
         
         # Test the function
-        result = combine_audio_files(non_existent_dir)
+        result = run_combine(non_existent_dir)
         
         # Check that the function returned False
         self.assertFalse(result)
     
-    @patch('subprocess.run')
-    def test_combine_audio_files_permission_error(self, mock_run):
+    @unittest.skipIf(hasattr(os, "geteuid") and os.geteuid() == 0, "root ignores directory permissions")
+    def test_combine_audio_files_permission_error(self):
         """Test behavior when there are permission issues"""
-        # Mock ffmpeg version check to return success
-        mock_run.return_value.returncode = 0
-        mock_run.return_value.stderr = ""
-        
         # Create test audio files
         self.create_test_audio_file("audio1.mp3", "test audio 1")
         
         # Make the directory read-only
-        os.chmod(self.session_dir, 0o444)
+        os.chmod(self.session_dir, 0o555)
         
         try:
-            # Test the function
-            result = combine_audio_files(self.session_dir)
+            with self.fake_ffmpeg():
+                result = run_combine(self.session_dir)
             
-            # Check that the function returned False due to permission error
+            # Check that the function returned False because the file list can't be written
             self.assertFalse(result)
+            self.assertEqual(self.calls, [])
             
         finally:
             # Restore permissions
             os.chmod(self.session_dir, 0o755)
     
-    @patch('subprocess.run')
-    def test_combine_audio_files_creates_file_list_correctly(self, mock_run):
-        """Test that the file list is created with correct format"""
-        # Mock ffmpeg version check to return success
-        mock_run.return_value.returncode = 0
-        mock_run.return_value.stderr = ""
-        
+    def test_combine_audio_files_command(self):
+        """Test that ffmpeg is run with the expected concat command"""
         # Create test audio files
         self.create_test_audio_file("audio1.mp3", "test audio 1")
-        self.create_test_audio_file("audio2.wav", "test audio 2")
+        self.create_test_audio_file("audio2.mp3", "test audio 2")
         
-        # Test the function
-        result = combine_audio_files(self.session_dir)
+        with self.fake_ffmpeg():
+            result = run_combine(self.session_dir)
         
         # Check that the function returned True
         self.assertTrue(result)
         
-        # Verify ffmpeg was called with correct parameters
-        mock_run.assert_called()
-        
-        # Get the combine command call
-        combine_call = mock_run.call_args_list[1]
-        cmd = combine_call[0][0]
-        kwargs = combine_call[1]
-        
-        # Check that the command is correct
-        self.assertEqual(cmd[0], 'ffmpeg')
-        self.assertEqual(cmd[1], '-f')
-        self.assertEqual(cmd[2], 'concat')
-        self.assertEqual(cmd[3], '-safe')
-        self.assertEqual(cmd[4], '0')
-        self.assertEqual(cmd[5], '-i')
-        self.assertEqual(cmd[6], 'file_list.txt')
-        self.assertEqual(cmd[7], '-c')
-        self.assertEqual(cmd[8], 'copy')
-        self.assertEqual(cmd[9], '-y')
-        self.assertEqual(cmd[10], COMBINED_AUDIO_FILENAME)
+        # Check that the command is correct: stream copy, reproducible output, no progress output
+        cmd, cwd = self.calls[0]
+        self.assertEqual(cmd, [
+            'ffmpeg', '-f', 'concat', '-safe', '0',
+            '-i', 'file_list.txt',
+            '-c', 'copy', *BITEXACT_ARGS, '-y', str(self.session_dir / COMBINED_AUDIO_FILENAME)
+        ])
         
         # Check that cwd is set to session directory
-        self.assertEqual(kwargs.get('cwd'), self.session_dir)
+        self.assertEqual(cwd, self.session_dir)
     
-    @patch('subprocess.run')
-    def test_combine_audio_files_handles_ffmpeg_error(self, mock_run):
+    def test_combine_audio_files_handles_ffmpeg_error(self):
         """Test behavior when ffmpeg returns an error"""
-        # Mock ffmpeg version check to return success
-        mock_run.return_value.returncode = 0
-        mock_run.return_value.stderr = ""
-        
         # Create test audio files
         self.create_test_audio_file("audio1.mp3", "test audio 1")
         
-        # Mock the combine command to return error
-        def mock_run_side_effect(cmd, **kwargs):
-            if cmd[0] == 'ffmpeg' and cmd[1] == '-version':
-                return MagicMock(returncode=0, stderr="")
-            else:
-                return MagicMock(returncode=1, stderr="ffmpeg error")
-        
-        mock_run.side_effect = mock_run_side_effect
+        with self.fake_ffmpeg(returncode=1, stderr="ffmpeg error"):
+            result = run_combine(self.session_dir)
         
-        # Test the function
-        result = combine_audio_files(self.session_dir)
-        
-        # Check that the function returned False
+        # Check that the function returned False and cleaned up the file list
         self.assertFalse(result)
+        self.assertFalse((self.session_dir / "file_list.txt").exists())
     
-    @patch('subprocess.run')
-    def test_combine_audio_files_file_list_content(self, mock_run):
-        """Test that the file list contains the correct content"""
-        # Mock ffmpeg version check to return success
-        mock_run.return_value.returncode = 0
-        mock_run.return_value.stderr = ""
+    def test_combine_audio_files_file_list_content(self):
+        """Test that the file list names each clip in recording order"""
+        # Created out of order; the timestamp in the name decides the order
+        self.create_test_audio_file("response_20240101_120010.mp3", "test audio 3")
+        self.create_test_audio_file("interviewer_20240101_120000.mp3", "test audio 1")
+        self.create_test_audio_file("response_20240101_120005.mp3", "test audio 2")
         
-        # Create test audio files
-        self.create_test_audio_file("audio1.mp3", "test audio 1")
-        self.create_test_audio_file("audio2.wav", "test audio 2")
-        self.create_test_audio_file("audio3.webm", "test audio 3")
-        
-        # Test the function
-        result = combine_audio_files(self.session_dir)
+        with self.fake_ffmpeg():
+            result = run_combine(self.session_dir)
         
         # Check that the function returned True
         self.assertTrue(result)
-        
-        # The file list should have been created and then cleaned up
-        # We can't check its content directly since it's cleaned up,
-        # but we can verify the function worked correctly
-        self.assertTrue(result)
+        self.assertEqual(self.file_lists[0].splitlines(), [
+            "file 'interviewer_20240101_120000.mp3'",
+            "file 'response_20240101_120005.mp3'",
+            "file 'response_20240101_120010.mp3'"
+        ])
     
-    @patch('subprocess.run')
-    def test_combine_audio_files_with_single_file(self, mock_run):
+    def test_combine_audio_files_with_single_file(self):
         """Test combining a single audio file"""
-        # Mock ffmpeg version check to return success
-        mock_run.return_value.returncode = 0
-        mock_run.return_value.stderr = ""
-        
         # Create a single test audio file
         self.create_test_audio_file("audio1.mp3", "test audio 1")
         
-        # Test the function
-        result = combine_audio_files(self.session_dir)
+        with self.fake_ffmpeg():
+            result = run_combine(self.session_dir)
         
         # Check that the function returned True
         self.assertTrue(result)
@@ -456,5 +348,50 @@ class TestCombineAudioFiles(unittest.TestCase):
         self.assertTrue(combined_file.exists())
 
 
+class TestServeRecordingFile(unittest.TestCase):
+    """Test cases for the /recordings/{session_id}/{filename} route"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.session_dir = Path(self.test_dir) / "test_session"
+        self.session_dir.mkdir()
+        (self.session_dir / COMBINED_AUDIO_FILENAME).write_bytes(b"x" * 1000)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def request(self, method: str):
+        """Call the app as a server would and return (status, headers, body)"""
+        scope = {
+            "type": "http",
+            "method": method,
+            "path": f"/recordings/test_session/{COMBINED_AUDIO_FILENAME}",
+            "root_path": "",
+            "query_string": b"",
+            "headers": []
+        }
+        messages = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            messages.append(message)
+
+        with patch('server.RECORDINGS_DIR', Path(self.test_dir)):
+            asyncio.run(app(scope, receive, send))
+        headers = {k.decode(): v.decode() for k, v in messages[0]["headers"]}
+        body = b"".join(m.get("body", b"") for m in messages[1:])
+        return messages[0]["status"], headers, body
+
+    def test_head_sends_headers_only(self):
+        """Test that HEAD is routed and answered with the file's length but no body"""
+        status, headers, body = self.request("HEAD")
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["content-length"], "1000")
+        self.assertEqual(body, b"")
+        self.assertEqual(self.request("GET")[2], b"x" * 1000)
+
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the incrementally built combined interview audio
+"""
+
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from combined_audio import IncrementalCombiner, mp3_audio_frames
+
+# One MPEG-1 Layer III frame at 44.1 kHz and one MPEG-2 frame at 24 kHz
+FRAME_44K = b"\xff\xfb\x90\x64" + b"\x01" * 413
+FRAME_24K = b"\xff\xf3\x94\x64" + b"\x00" * 284
+INFO_FRAME = b"\xff\xfb\x90\x64" + b"\x00" * 32 + b"Info" + b"\x00" * 377
+
+
+class TestIncrementalCombiner(unittest.TestCase):
+    """Test cases for IncrementalCombiner"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.session_dir = Path(self.test_dir)
+        self.combiner = IncrementalCombiner("combined_interview.mp3")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_audio_frames_strip_headers(self):
+        """Test that the Info header frame is dropped and audio frames kept"""
+        self.assertEqual(mp3_audio_frames(INFO_FRAME + FRAME_44K * 3), FRAME_44K * 3)
+
+    def test_other_sample_rates_are_rejected(self):
+        """Test that clips in another format are not appended"""
+        self.assertIsNone(mp3_audio_frames(FRAME_24K * 3))
+        self.assertFalse(asyncio.run(self.combiner.append(self.session_dir, FRAME_24K * 3)))
+        self.assertFalse(self.combiner.part_path(self.session_dir).exists())
+
+    def test_append_and_publish(self):
+        """Test that clips are appended in order and published under the final name"""
+        clip = self.session_dir / "response_1.mp3"
+        clip.write_bytes(INFO_FRAME + FRAME_44K * 2)
+        self.assertTrue(asyncio.run(self.combiner.append(self.session_dir, clip)))
+        self.assertTrue(asyncio.run(self.combiner.append(self.session_dir, FRAME_44K)))
+        part_inode = os.stat(self.combiner.part_path(self.session_dir)).st_ino
+        self.assertTrue(self.combiner.publish(self.session_dir))
+        combined = self.session_dir / "combined_interview.mp3"
+        self.assertEqual(combined.read_bytes(), FRAME_44K * 3)
+        # Published by renaming the part file, not copying it
+        self.assertEqual(os.stat(combined).st_ino, part_inode)
+        self.assertFalse(self.combiner.part_path(self.session_dir).exists())
+        self.assertTrue(self.combiner.publish(self.session_dir))
+
+        # The published file is a snapshot: later clips only appear once it is published again
+        asyncio.run(self.combiner.append(self.session_dir, FRAME_44K))
+        self.assertEqual(combined.read_bytes(), FRAME_44K * 3)
+        self.assertNotEqual(os.stat(combined).st_ino, os.stat(self.combiner.part_path(self.session_dir)).st_ino)
+        self.assertTrue(self.combiner.publish(self.session_dir))
+        self.assertEqual(combined.read_bytes(), FRAME_44K * 4)
+
+    def test_lock_excludes_other_workers(self):
+        """Test that a second combiner (as in another worker) waits for the session's file lock"""
+        other = IncrementalCombiner("combined_interview.mp3")
+        order = []
+
+        async def hold(combiner, name):
+            async with combiner.lock(self.session_dir):
+                order.append(f"{name} start")
+                await asyncio.sleep(0.05)
+                order.append(f"{name} end")
+
+        async def main():
+            first = asyncio.ensure_future(hold(self.combiner, "first"))
+            await asyncio.sleep(0.01)
+            await asyncio.gather(first, hold(other, "second"))
+
+        asyncio.run(main())
+        self.assertEqual(order, ["first start", "first end", "second start", "second end"])
+
+    def test_publish_without_clips(self):
+        """Test that there is nothing to publish before any clip is appended"""
+        self.assertFalse(self.combiner.publish(self.session_dir))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the bounded interviewer context window
+"""
+
+import unittest
+
+from conversation_context import ContextWindow, token_counter
+
+
+def make_history(turns: int, words: int = 10) -> list:
+    history = []
+    for i in range(turns):
+        history.append({"role": "interviewer", "content": f"Question {i} " + "word " * words})
+        history.append({"role": "candidate", "content": f"Answer {i} " + "word " * words})
+    return history
+
+
+class TestContextWindow(unittest.TestCase):
+    """Test cases for ContextWindow"""
+
+    def test_short_interview_is_sent_in_full(self):
+        """Test that nothing is dropped or summarized while within limits"""
+        window = ContextWindow(recent_turns=6, token_budget=3000)
+        history = make_history(3)
+        messages, fold_upto = window.select(history)
+        self.assertEqual(messages, history)
+        self.assertEqual(fold_upto, 0)
+
+    def test_older_turns_are_folded(self):
+        """Test that turns beyond the recent window are marked for summarizing"""
+        window = ContextWindow(recent_turns=2, token_budget=100000)
+        history = make_history(10)
+        messages, fold_upto = window.select(history)
+        self.assertEqual(fold_upto, 16)
+        # Until the summary exists, unsummarized turns are still sent
+        self.assertEqual(len(messages), 20)
+        messages, fold_upto = window.select(history, summarized=16, summary="Earlier: Python, APIs")
+        self.assertEqual(messages, history[16:])
+        self.assertEqual(fold_upto, 16)
+
+    def test_budget_keeps_newest_messages(self):
+        """Test that the token budget trims the oldest messages first"""
+        window = ContextWindow(recent_turns=50, token_budget=200)
+        history = make_history(60)
+        messages, _ = window.select(history, reserved_tokens=50)
+        self.assertLess(len(messages), len(history))
+        self.assertEqual(messages[-1], history[-1])
+        self.assertLessEqual(sum(window.message_tokens(m) for m in messages), 150)
+
+    def test_prompt_size_is_flat(self):
+        """Test that the prompt stops growing with the length of the interview"""
+        window = ContextWindow(recent_turns=4, token_budget=500)
+        sizes = []
+        for turns in (20, 60, 120):
+            messages, _ = window.select(make_history(turns), summarized=turns * 2 - 8, summary="summary " * 50)
+            sizes.append(len(messages))
+        self.assertEqual(sizes, [8, 8, 8])
+
+    def test_newest_message_is_always_kept(self):
+        """Test that one very long answer is still sent"""
+        window = ContextWindow(token_budget=10)
+        history = [{"role": "candidate", "content": "word " * 500}]
+        self.assertEqual(window.select(history)[0], history)
+
+    def test_token_counter(self):
+        """Test that the counter (tiktoken or estimate) grows with the text"""
+        count = token_counter("gpt-3.5-turbo")
+        self.assertEqual(count(""), 0)
+        self.assertLess(count("Hello there"), count("Hello there, " * 20))
+
+
+if __name__ == "__main__":
+    unittest.main()
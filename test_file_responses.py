@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Unit tests for Range / ETag handling when serving recordings
+"""
+
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+from email.utils import formatdate
+from pathlib import Path
+
+from starlette.requests import Request
+
+from file_responses import RangeNotSatisfiable, file_response, make_etag, parse_range
+
+
+class TestParseRange(unittest.TestCase):
+    """Test cases for parse_range"""
+
+    def test_ranges(self):
+        """Test explicit, open-ended and suffix ranges"""
+        self.assertEqual(parse_range("bytes=0-99", 1000), (0, 99))
+        self.assertEqual(parse_range("bytes=900-", 1000), (900, 999))
+        self.assertEqual(parse_range("bytes=-100", 1000), (900, 999))
+        self.assertEqual(parse_range("bytes=990-2000", 1000), (990, 999))
+
+    def test_ignored_ranges(self):
+        """Test that malformed and multi-range headers are ignored"""
+        self.assertIsNone(parse_range("bytes=0-1,5-6", 1000))
+        self.assertIsNone(parse_range("items=0-1", 1000))
+        self.assertIsNone(parse_range("bytes=abc", 1000))
+        self.assertIsNone(parse_range("bytes=10-5", 1000))
+
+    def test_unsatisfiable(self):
+        """Test that ranges outside the file are rejected"""
+        with self.assertRaises(RangeNotSatisfiable):
+            parse_range("bytes=1000-", 1000)
+        with self.assertRaises(RangeNotSatisfiable):
+            parse_range("bytes=-0", 1000)
+
+
+class TestFileResponse(unittest.TestCase):
+    """Test cases for file_response"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.path = Path(self.test_dir) / "combined_interview.mp4"
+        self.data = bytes(range(256)) * 2000
+        self.path.write_bytes(self.data)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def get(self, headers: dict = None, method: str = "GET"):
+        """Run file_response as a server would and return (status, headers, body)"""
+        scope = {
+            "type": "http",
+            "method": method,
+            "path": "/recordings/s/combined_interview.mp4",
+            "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+        }
+        messages = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            messages.append(message)
+
+        async def run():
+            response = file_response(Request(scope, receive), self.path, media_type="video/mp4")
+            await response(scope, receive, send)
+
+        asyncio.run(run())
+        start = messages[0]
+        response_headers = {k.decode(): v.decode() for k, v in start["headers"]}
+        body = b"".join(m.get("body", b"") for m in messages[1:])
+        return start["status"], response_headers, body
+
+    def test_full_file(self):
+        """Test that the whole file is streamed with validators and length"""
+        status, headers, body = self.get()
+        self.assertEqual(status, 200)
+        self.assertEqual(body, self.data)
+        self.assertEqual(headers["content-length"], str(len(self.data)))
+        self.assertEqual(headers["accept-ranges"], "bytes")
+        self.assertEqual(headers["etag"], make_etag(os.stat(self.path)))
+        self.assertIn("last-modified", headers)
+
+    def test_range_request(self):
+        """Test that a byte range returns 206 with the requested slice"""
+        status, headers, body = self.get({"Range": "bytes=1000-299999"})
+        self.assertEqual(status, 206)
+        self.assertEqual(body, self.data[1000:300000])
+        self.assertEqual(headers["content-range"], f"bytes 1000-299999/{len(self.data)}")
+        self.assertEqual(headers["content-length"], str(299000))
+
+    def test_unsatisfiable_range(self):
+        """Test that a range past the end of the file returns 416"""
+        status, headers, _ = self.get({"Range": f"bytes={len(self.data)}-"})
+        self.assertEqual(status, 416)
+        self.assertEqual(headers["content-range"], f"bytes */{len(self.data)}")
+
+    def test_if_none_match(self):
+        """Test that a matching ETag returns 304 with no body"""
+        etag = make_etag(os.stat(self.path))
+        status, _, body = self.get({"If-None-Match": etag})
+        self.assertEqual(status, 304)
+        self.assertEqual(body, b"")
+        status, _, _ = self.get({"If-None-Match": '"stale"'})
+        self.assertEqual(status, 200)
+
+    def test_if_modified_since(self):
+        """Test that an unchanged file returns 304 for If-Modified-Since"""
+        since = formatdate(os.stat(self.path).st_mtime + 10, usegmt=True)
+        status, _, _ = self.get({"If-Modified-Since": since})
+        self.assertEqual(status, 304)
+
+    def test_stale_if_range_serves_full_file(self):
+        """Test that a Range with a stale If-Range validator gets the full file"""
+        status, _, body = self.get({"Range": "bytes=0-9", "If-Range": '"stale"'})
+        self.assertEqual(status, 200)
+        self.assertEqual(len(body), len(self.data))
+
+    def test_head_request(self):
+        """Test that HEAD sends headers only"""
+        status, headers, body = self.get(method="HEAD")
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["content-length"], str(len(self.data)))
+        self.assertEqual(body, b"")
+
+
+if __name__ == '__main__':
+    unittest.main()
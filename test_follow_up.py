@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the single-request fallback follow-up
+"""
+
+import unittest
+
+from follow_up import (parse_follow_up, follow_up_messages, is_skip_request, is_short_answer,
+                       DEFAULT_SUMMARY)
+
+
+class TestFollowUp(unittest.TestCase):
+    """Test cases for parsing and the local fast paths"""
+
+    def test_parses_json_reply(self):
+        """Test that the JSON reply gives the summary and the follow-up"""
+        reply = '{"summary": "You led a migration to Postgres.", "follow_up": "What was the hardest part?"}'
+        self.assertEqual(parse_follow_up(reply),
+                         ("You led a migration to Postgres.", "What was the hardest part?"))
+
+    def test_parses_fenced_or_labelled_reply(self):
+        """Test that a fenced object and labelled lines are accepted too"""
+        fenced = 'Sure!\n```json\n{"Summary": " You like Go. ", "follow-up": "Why Go?"}\n```'
+        self.assertEqual(parse_follow_up(fenced), ("You like Go.", "Why Go?"))
+        labelled = "Summary: You like Go.\nFollow-up: \"Why Go?\""
+        self.assertEqual(parse_follow_up(labelled), ("You like Go.", "Why Go?"))
+
+    def test_missing_follow_up_is_rejected(self):
+        """Test that a reply without a question is treated as a failure"""
+        self.assertIsNone(parse_follow_up('{"summary": "You like Go."}'))
+        self.assertIsNone(parse_follow_up("I'm not sure what to ask."))
+        self.assertIsNone(parse_follow_up(""))
+        self.assertEqual(parse_follow_up('{"follow_up": "Why Go?"}'), (DEFAULT_SUMMARY, "Why Go?"))
+
+    def test_local_fast_paths(self):
+        """Test detection of requests to move on and short answers"""
+        self.assertTrue(is_skip_request("Can we MOVE ON please"))
+        self.assertFalse(is_skip_request("I moved to Berlin last year"))
+        self.assertTrue(is_short_answer("Yes, I did."))
+        self.assertFalse(is_short_answer("I spent three years building the payments platform at my last job"))
+
+    def test_messages_ask_for_json(self):
+        """Test that the request mentions JSON, as JSON mode requires"""
+        messages = follow_up_messages("experience", "I built things")
+        self.assertIn("JSON", messages[0]["content"])
+        self.assertIn("I built things", messages[1]["content"])
+
+
+if __name__ == "__main__":
+    unittest.main()
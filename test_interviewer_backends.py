@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Unit tests for choosing and running interviewer backends
+"""
+
+import asyncio
+import unittest
+
+from interviewer_backends import (InterviewerBackend, LocalLLMBackend, OpenAIBackend, RuleBasedBackend,
+                                  choose_backend)
+
+
+class EchoBackend(InterviewerBackend):
+    name = "echo"
+
+    async def complete(self, messages, max_tokens, temperature, json_mode=False):
+        return messages[-1]["content"]
+
+
+class FakeLlama:
+    """Stands in for a loaded llama.cpp model"""
+
+    def create_chat_completion(self, messages, max_tokens, temperature, stream=False, **kwargs):
+        if not stream:
+            return {"choices": [{"message": {"content": "Tell me more."}}]}
+        return iter([{"choices": [{"delta": {"role": "assistant"}}]}] +
+                    [{"choices": [{"delta": {"content": word}}]} for word in ("Tell", " me", " more.")])
+
+
+class TestInterviewerBackends(unittest.TestCase):
+    """Test cases for the interviewer backends"""
+
+    def setUp(self):
+        self.backends = {
+            "openai": OpenAIBackend("gpt-3.5-turbo", api_key=None),
+            "local": LocalLLMBackend(None),
+            "rules": RuleBasedBackend(),
+            "echo": EchoBackend()
+        }
+
+    def test_choose_falls_back_to_available_backend(self):
+        """Test that an unavailable or unknown backend falls back to the default, then rules"""
+        self.assertEqual(choose_backend(self.backends, "echo", "openai").name, "echo")
+        self.assertEqual(choose_backend(self.backends, "local", "echo").name, "echo")
+        self.assertEqual(choose_backend(self.backends, "unknown", "echo").name, "echo")
+        self.assertEqual(choose_backend(self.backends, None, "openai").name, "rules")
+        self.assertEqual(choose_backend(self.backends, "openai", "openai").name, "rules")
+
+    def test_rule_based_generates_nothing(self):
+        """Test that the rule-based backend leaves every turn to the predefined questions"""
+        async def main():
+            backend = RuleBasedBackend()
+            return (await backend.complete([{"role": "user", "content": "Hi"}], 50, 0.7),
+                    [delta async for delta in backend.stream([{"role": "user", "content": "Hi"}], 50, 0.7)])
+        self.assertEqual(asyncio.run(main()), (None, []))
+        self.assertFalse(RuleBasedBackend.generates_text)
+        self.assertTrue(EchoBackend.generates_text)
+
+    def test_default_stream_yields_whole_reply(self):
+        """Test that a backend without streaming streams its reply as one delta"""
+        async def main():
+            return [delta async for delta in EchoBackend().stream([{"role": "user", "content": "Hi"}], 50, 0.7)]
+        self.assertEqual(asyncio.run(main()), ["Hi"])
+
+    def test_local_backend_runs_model(self):
+        """Test that the local backend completes and streams through the loaded model"""
+        backend = LocalLLMBackend("model.gguf")
+        backend._llm = FakeLlama()
+        messages = [{"role": "user", "content": "I built a compiler."}]
+
+        async def main():
+            reply = await backend.complete(messages, 50, 0.7)
+            deltas = [delta async for delta in backend.stream(messages, 50, 0.7)]
+            return reply, deltas
+
+        self.assertEqual(asyncio.run(main()), ("Tell me more.", ["Tell", " me", " more."]))
+        self.assertEqual(backend.model, "model.gguf")
+
+
+if __name__ == "__main__":
+    unittest.main()
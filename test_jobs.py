@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the background job queue
+"""
+
+import asyncio
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from jobs import JobQueue, QUEUED, RUNNING, COMPLETED, FAILED
+
+
+class TestJobQueue(unittest.TestCase):
+    """Test cases for JobQueue"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.recordings_dir = Path(self.test_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def run_jobs(self, queue, submit=None):
+        """Start the queue, optionally submit jobs, and wait until they finish"""
+        async def main():
+            await queue.start()
+            submitted = submit(queue) if submit else []
+            await queue._get_queue().join()
+            await queue.stop()
+            return submitted
+        return asyncio.run(main())
+
+    def read_job(self, job):
+        path = self.recordings_dir / job["session_id"] / "jobs" / f"{job['job_id']}.json"
+        with open(path) as f:
+            return json.load(f)
+
+    def test_job_runs_and_is_persisted(self):
+        """Test that a submitted job completes and its result is written to disk"""
+        updates = []
+
+        async def handler(job, report_progress):
+            report_progress({"processed_seconds": 1.0})
+            return {"echo": job["params"]["value"]}
+
+        async def listener(job):
+            updates.append(job["status"])
+
+        queue = JobQueue(self.recordings_dir, workers=1)
+        queue.register("echo", handler)
+        queue.add_listener(listener)
+        job = self.run_jobs(queue, lambda q: q.submit("echo", "interview_1", {"value": 42}))
+
+        self.assertEqual(job["status"], QUEUED)
+        stored = self.read_job(job)
+        self.assertEqual(stored["status"], COMPLETED)
+        self.assertEqual(stored["result"], {"echo": 42})
+        self.assertEqual(queue.get(job["job_id"])["status"], COMPLETED)
+        self.assertIn(RUNNING, updates)
+
+    def test_failed_job_records_error(self):
+        """Test that an exception in the handler marks the job failed"""
+        async def handler(job, report_progress):
+            raise RuntimeError("ffmpeg error")
+
+        queue = JobQueue(self.recordings_dir, workers=1)
+        queue.register("broken", handler)
+        job = self.run_jobs(queue, lambda q: q.submit("broken", "interview_1"))
+
+        stored = self.read_job(job)
+        self.assertEqual(stored["status"], FAILED)
+        self.assertEqual(stored["error"], "ffmpeg error")
+
+    def test_jobs_run_concurrently_and_can_be_awaited(self):
+        """Test that two jobs overlap on two workers and wait() returns each result"""
+        running = []
+
+        async def handler(job, report_progress):
+            running.append(job["params"]["name"])
+            await asyncio.sleep(0.05)
+            return {"overlapped": len(running) == 2}
+
+        async def main():
+            queue = JobQueue(self.recordings_dir, workers=2)
+            queue.register("combine", handler)
+            await queue.start()
+            jobs = [queue.submit("combine", "interview_1", {"name": name}) for name in ("audio", "video")]
+            results = await asyncio.gather(*(queue.wait(job["job_id"], timeout=5) for job in jobs))
+            await queue.stop()
+            return results
+
+        results = asyncio.run(main())
+        self.assertEqual([job["status"] for job in results], [COMPLETED, COMPLETED])
+        self.assertTrue(all(job["result"]["overlapped"] for job in results))
+
+    def test_combine_waits_for_queued_transcode(self):
+        """Test that finishing a session while a transcode is queued runs the combine after it"""
+        order = []
+
+        async def transcode(job, report_progress):
+            await asyncio.sleep(0.05)
+            order.append(f"transcode {job['session_id']}")
+            return {"mp4_filename": "response_1.mp4"}
+
+        async def combine(job, report_progress):
+            order.append("combine")
+            return {"combined": True}
+
+        async def main():
+            queue = JobQueue(self.recordings_dir, workers=2)
+            queue.register("transcode_video", transcode)
+            queue.register("combine_video", combine)
+            # The transcode is queued but no worker is running yet
+            queue.submit("transcode_video", "interview_1")
+            queue.submit("transcode_video", "interview_2")
+            depends_on = queue.outstanding("interview_1", "transcode_video")
+            job = queue.submit("combine_video", "interview_1", depends_on=depends_on)
+            await queue.start()
+            result = await queue.wait(job["job_id"], timeout=5)
+            await queue.stop()
+            return depends_on, result
+
+        depends_on, result = asyncio.run(main())
+        self.assertEqual(len(depends_on), 1)
+        self.assertEqual(result["status"], COMPLETED)
+        self.assertGreater(order.index("combine"), order.index("transcode interview_1"))
+
+    def test_only_one_queue_recovers(self):
+        """Test that with several workers on one directory only the lease holder re-queues a job"""
+        job_dir = self.recordings_dir / "interview_1" / "jobs"
+        job_dir.mkdir(parents=True)
+        with open(job_dir / "abc123.json", "w") as f:
+            json.dump({
+                "job_id": "abc123", "type": "noop", "session_id": "interview_1",
+                "status": QUEUED, "params": {}, "progress": None, "result": None,
+                "error": None, "created_at": 0, "updated_at": 0
+            }, f)
+
+        first = JobQueue(self.recordings_dir)
+        second = JobQueue(self.recordings_dir)
+        try:
+            self.assertEqual(first.recover(), 1)
+            self.assertEqual(second.recover(), 0)
+        finally:
+            first._release_recovery_lease()
+
+    def test_finished_jobs_are_evicted(self):
+        """Test that finished jobs leave memory but can still be looked up"""
+        async def handler(job, report_progress):
+            return {}
+
+        queue = JobQueue(self.recordings_dir, workers=1)
+        queue.register("noop", handler)
+        with patch("jobs.FINISHED_JOBS_KEPT", 2):
+            jobs = self.run_jobs(queue, lambda q: [q.submit("noop", f"interview_{i}") for i in range(3)])
+
+        self.assertEqual(queue.jobs, {})
+        self.assertEqual(len(queue._recent), 2)
+        self.assertEqual(queue.get(jobs[0]["job_id"])["status"], COMPLETED)
+
+    def test_unknown_job_type(self):
+        """Test that submitting an unregistered job type is rejected"""
+        queue = JobQueue(self.recordings_dir)
+        with self.assertRaises(ValueError):
+            queue.submit("missing", "interview_1")
+
+    def test_get_reads_jobs_from_disk(self):
+        """Test that another queue on the same directory can look a job up"""
+        async def handler(job, report_progress):
+            return {}
+
+        queue = JobQueue(self.recordings_dir, workers=1)
+        queue.register("noop", handler)
+        job = self.run_jobs(queue, lambda q: q.submit("noop", "interview_1"))
+
+        other = JobQueue(self.recordings_dir)
+        self.assertEqual(other.get(job["job_id"])["status"], COMPLETED)
+        self.assertIsNone(other.get("missing"))
+
+    def test_watch_reports_jobs_run_by_another_worker(self):
+        """Test that a watch on another queue sees a job's progress and result, and its own queue's watch doesn't"""
+        async def handler(job, report_progress):
+            report_progress({"percent": 50})
+            await asyncio.sleep(0.05)
+            return {"combined": True}
+
+        async def main():
+            queue = JobQueue(self.recordings_dir, workers=1)
+            queue.register("combine_video", handler)
+            other = JobQueue(self.recordings_dir)
+            seen, own = [], []
+
+            async def on_other(job):
+                seen.append(job)
+
+            async def on_own(job):
+                own.append(job)
+
+            watches = [asyncio.ensure_future(other.watch("interview_1", on_other, poll_seconds=0.01)),
+                       asyncio.ensure_future(queue.watch("interview_1", on_own, poll_seconds=0.01))]
+            await asyncio.sleep(0.02)
+            await queue.start()
+            job = queue.submit("combine_video", "interview_1")
+            await queue.wait(job["job_id"], timeout=5)
+            await asyncio.sleep(0.05)
+            for watch in watches:
+                watch.cancel()
+            await queue.stop()
+            return seen, own
+
+        seen, own = asyncio.run(main())
+        self.assertEqual(own, [])
+        self.assertIn({"percent": 50}, [job["progress"] for job in seen])
+        self.assertEqual(seen[-1]["status"], COMPLETED)
+        self.assertEqual(seen[-1]["result"], {"combined": True})
+
+    def test_unfinished_jobs_resume_after_restart(self):
+        """Test that jobs left running are re-queued and completed on the next start"""
+        job_dir = self.recordings_dir / "interview_1" / "jobs"
+        job_dir.mkdir(parents=True)
+        with open(job_dir / "abc123.json", "w") as f:
+            json.dump({
+                "job_id": "abc123", "type": "noop", "session_id": "interview_1",
+                "status": RUNNING, "params": {}, "progress": None, "result": None,
+                "error": None, "created_at": 0, "updated_at": 0
+            }, f)
+
+        async def handler(job, report_progress):
+            return {"resumed": True}
+
+        queue = JobQueue(self.recordings_dir, workers=1)
+        queue.register("noop", handler)
+        self.run_jobs(queue)
+
+        self.assertEqual(queue.get("abc123")["status"], COMPLETED)
+        self.assertEqual(queue.get("abc123")["result"], {"resumed": True})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Unit tests for per-session recording manifests
+"""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from manifest import ManifestStore, read_manifest, MANIFEST_FILENAME
+from media import mp3_duration
+
+# One MPEG-1 Layer III frame: 128 kbps, 44.1 kHz, 1152 samples
+MP3_FRAME = b"\xff\xfb\x90\x64" + b"\x00" * 413
+
+
+class TestManifestStore(unittest.TestCase):
+    """Test cases for ManifestStore"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.session_dir = Path(self.test_dir) / "interview_1"
+        self.store = ManifestStore()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_entries_keep_write_order(self):
+        """Test that entries are returned in the order they were appended"""
+        self.store.append(self.session_dir, {"filename": "interviewer_1.mp3", "role": "interviewer", "kind": "audio"})
+        self.store.append(self.session_dir, {"filename": "response_1.mp3", "role": "candidate", "kind": "audio"})
+        entries = self.store.entries(self.session_dir)
+        self.assertEqual([e["filename"] for e in entries], ["interviewer_1.mp3", "response_1.mp3"])
+        self.assertEqual([e["order"] for e in entries], [0, 1])
+        self.assertEqual(len(self.store.entries(self.session_dir, role="candidate")), 1)
+
+    def test_update_merges_into_existing_entry(self):
+        """Test that a later line for the same filename updates the entry in place"""
+        self.store.append(self.session_dir, {"filename": "response_1.webm", "role": "candidate", "kind": "video"})
+        self.store.append(self.session_dir, {"filename": "response_2.webm", "role": "candidate", "kind": "video"})
+        self.store.update(self.session_dir, "response_1.webm", mp4_filename="response_1.mp4", duration=12.5)
+        entries = self.store.entries(self.session_dir, kind="video")
+        self.assertEqual(entries[0]["filename"], "response_1.webm")
+        self.assertEqual(entries[0]["mp4_filename"], "response_1.mp4")
+        self.assertEqual(entries[0]["duration"], 12.5)
+        self.assertEqual(len(entries), 2)
+
+    def test_cached_view_picks_up_appends(self):
+        """Test that lines appended by another writer are seen on the next read"""
+        self.store.append(self.session_dir, {"filename": "a.mp3", "kind": "audio"})
+        self.assertEqual(len(self.store.entries(self.session_dir)), 1)
+        ManifestStore().append(self.session_dir, {"filename": "b.mp3", "kind": "audio"})
+        self.assertEqual(len(self.store.entries(self.session_dir)), 2)
+
+    def test_partial_line_is_not_parsed(self):
+        """Test that a half-written trailing line waits for its newline"""
+        self.store.append(self.session_dir, {"filename": "a.mp3"})
+        with open(self.session_dir / MANIFEST_FILENAME, "a") as f:
+            f.write('{"filename": "b.mp3"')
+        self.assertEqual(len(self.store.entries(self.session_dir)), 1)
+        with open(self.session_dir / MANIFEST_FILENAME, "a") as f:
+            f.write('}\n')
+        self.assertEqual(len(self.store.entries(self.session_dir)), 2)
+
+    def test_missing_manifest(self):
+        """Test that a session without a manifest has no entries"""
+        self.assertFalse(self.store.exists(self.session_dir))
+        self.assertEqual(self.store.entries(self.session_dir), [])
+        self.assertEqual(read_manifest(self.session_dir), [])
+
+    def test_read_manifest(self):
+        """Test the uncached reader used by manage_recordings.py"""
+        self.store.append(self.session_dir, {"filename": "a.mp3", "duration": 1.0})
+        self.store.update(self.session_dir, "a.mp3", duration=2.0)
+        self.assertEqual(read_manifest(self.session_dir)[0]["duration"], 2.0)
+
+    def test_next_sequence_is_monotonic(self):
+        """Test that sequence numbers increase across store instances"""
+        self.assertEqual(self.store.next_sequence(self.session_dir), 1)
+        self.assertEqual(self.store.next_sequence(self.session_dir), 2)
+        self.assertEqual(ManifestStore().next_sequence(self.session_dir), 3)
+
+    def test_entries_ordered_by_sequence(self):
+        """Test that a clip written late is still returned in sequence order"""
+        self.store.append(self.session_dir, {"seq": 2, "filename": "response_2.mp3", "kind": "audio"})
+        self.store.append(self.session_dir, {"seq": 1, "filename": "interviewer_1.mp3", "kind": "audio"})
+        self.store.update(self.session_dir, "response_2.mp3", duration=3.0)
+        expected = ["interviewer_1.mp3", "response_2.mp3"]
+        self.assertEqual([e["filename"] for e in self.store.entries(self.session_dir)], expected)
+        self.assertEqual([e["filename"] for e in read_manifest(self.session_dir)], expected)
+
+
+class TestMp3Duration(unittest.TestCase):
+    """Test cases for mp3_duration"""
+
+    def test_counts_frames(self):
+        """Test that the duration is the number of frames times samples per frame"""
+        self.assertAlmostEqual(mp3_duration(MP3_FRAME * 100), 100 * 1152 / 44100, places=2)
+
+    def test_skips_id3_and_info_frame(self):
+        """Test that an ID3v2 tag and the encoder's Info frame are not counted"""
+        id3 = b"ID3\x04\x00\x00\x00\x00\x00\x0a" + b"\x00" * 10
+        info = b"\xff\xfb\x90\x64" + b"\x00" * 32 + b"Info" + b"\x00" * 377
+        self.assertAlmostEqual(mp3_duration(id3 + info + MP3_FRAME * 10), 10 * 1152 / 44100, places=2)
+
+    def test_empty(self):
+        self.assertEqual(mp3_duration(b""), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the async media job runner
+"""
+
+import asyncio
+import sys
+import time
+import unittest
+
+from media_runner import MediaJobRunner, MediaJobTimeout
+
+
+class TestMediaJobRunner(unittest.TestCase):
+    """Test cases for MediaJobRunner"""
+
+    def run_async(self, coro):
+        return asyncio.run(coro)
+
+    def test_captures_output_and_stderr(self):
+        """Test that stdout, stderr and the exit code are returned"""
+        runner = MediaJobRunner(max_concurrency=1)
+        cmd = [sys.executable, "-c", "import sys; sys.stdout.write('out'); sys.stderr.write('err'); sys.exit(3)"]
+        result = self.run_async(runner.run(cmd))
+        self.assertEqual(result.returncode, 3)
+        self.assertEqual(result.stdout, b"out")
+        self.assertEqual(result.stderr, "err")
+        self.assertFalse(result.ok)
+
+    def test_feeds_stdin(self):
+        """Test that input bytes are written to the process"""
+        runner = MediaJobRunner(max_concurrency=1)
+        cmd = [sys.executable, "-c", "import sys; sys.stdout.write(sys.stdin.read().upper())"]
+        result = self.run_async(runner.run(cmd, input=b"pcm"))
+        self.assertTrue(result.ok)
+        self.assertEqual(result.stdout, b"PCM")
+
+    def test_timeout_kills_process(self):
+        """Test that a job running past its timeout raises MediaJobTimeout"""
+        runner = MediaJobRunner(max_concurrency=1, timeout_seconds=0.2)
+        cmd = [sys.executable, "-c", "import time; time.sleep(10)"]
+        start = time.monotonic()
+        with self.assertRaises(MediaJobTimeout):
+            self.run_async(runner.run(cmd))
+        self.assertLess(time.monotonic() - start, 5)
+        self.assertEqual(runner.running, 0)
+
+    def test_concurrency_is_bounded(self):
+        """Test that no more than max_concurrency jobs run at once"""
+        runner = MediaJobRunner(max_concurrency=2)
+        peak = 0
+
+        async def watch():
+            nonlocal peak
+            for _ in range(50):
+                peak = max(peak, runner.running)
+                await asyncio.sleep(0.01)
+
+        async def main():
+            cmd = [sys.executable, "-c", "import time; time.sleep(0.2)"]
+            await asyncio.gather(watch(), *[runner.run(cmd) for _ in range(4)])
+
+        self.run_async(main())
+        self.assertEqual(peak, 2)
+
+    def test_reports_progress(self):
+        """Test that ffmpeg -progress output is turned into processed seconds"""
+        runner = MediaJobRunner(max_concurrency=1)
+        cmd = [sys.executable, "-c", "print('out_time_ms=1500000'); print('out_time_ms=N/A'); print('progress=end')"]
+        seen = []
+        result = self.run_async(runner.run(cmd, on_progress=seen.append))
+        self.assertTrue(result.ok)
+        self.assertEqual(seen, [1.5])
+
+    def test_default_concurrency_is_cpu_count(self):
+        """Test that the concurrency limit defaults to at least one slot"""
+        self.assertGreaterEqual(MediaJobRunner().max_concurrency, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the recordings index
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from recordings_index import RecordingsIndex, classify_file
+
+
+class TestRecordingsIndex(unittest.TestCase):
+    """Test cases for RecordingsIndex"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.index = RecordingsIndex(Path(self.test_dir) / "state" / "recordings.sqlite3")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_classify_file(self):
+        """Test that files are categorised like the directory listing did"""
+        self.assertEqual(classify_file("interviewer_1.mp3"), "interviewer")
+        self.assertEqual(classify_file("combined_interview.mp3"), "combined_audio")
+        self.assertEqual(classify_file("response_1.mp3"), "candidate")
+        self.assertEqual(classify_file("response_1.webm"), "video")
+        self.assertEqual(classify_file("combined_interview.mp4"), "combined_video")
+        self.assertEqual(classify_file("metadata_1.json"), "metadata")
+        self.assertIsNone(classify_file("file_list.txt"))
+
+    def test_add_file_builds_session_listing(self):
+        """Test that incrementally added files appear in the listing"""
+        self.index.add_file("interview_1", "interviewer_1.mp3", 100)
+        self.index.add_file("interview_1", "response_1.mp3", 110)
+        self.index.add_file("interview_1", "metadata_1.json", 110)
+        self.index.add_file("interview_1", "combined_interview.mp3", 120)
+        sessions, next_cursor = self.index.list_sessions()
+        self.assertIsNone(next_cursor)
+        session = sessions[0]
+        self.assertEqual(session["session_id"], "interview_1")
+        self.assertEqual(session["interviewer_files"], ["interviewer_1.mp3"])
+        self.assertEqual(session["candidate_files"], ["response_1.mp3"])
+        self.assertEqual(session["combined_audio"], "combined_interview.mp3")
+        self.assertEqual(len(session["audio_files"]), 3)
+        self.assertEqual((session["created_at"], session["updated_at"]), (100, 120))
+
+    def test_pagination_and_filters(self):
+        """Test cursor pagination (newest first), since and has_video"""
+        for i in range(5):
+            self.index.add_file(f"interview_{i}", "response.mp3", 100 + i)
+        self.index.add_file("interview_3", "response.webm", 200)
+
+        first, cursor = self.index.list_sessions(limit=2)
+        self.assertEqual([s["session_id"] for s in first], ["interview_4", "interview_3"])
+        second, cursor = self.index.list_sessions(limit=2, cursor=cursor)
+        self.assertEqual([s["session_id"] for s in second], ["interview_2", "interview_1"])
+        third, cursor = self.index.list_sessions(limit=2, cursor=cursor)
+        self.assertEqual([s["session_id"] for s in third], ["interview_0"])
+        self.assertIsNone(cursor)
+
+        videos, _ = self.index.list_sessions(has_video=True)
+        self.assertEqual([s["session_id"] for s in videos], ["interview_3"])
+        recent, _ = self.index.list_sessions(since=103)
+        self.assertEqual({s["session_id"] for s in recent}, {"interview_3", "interview_4"})
+
+    def test_invalid_cursor(self):
+        """Test that a malformed cursor is rejected"""
+        with self.assertRaises(ValueError):
+            self.index.list_sessions(cursor="not-a-cursor")
+
+    def test_rebuild_from_directory(self):
+        """Test that rebuild reconstructs the index from the recordings layout"""
+        recordings_dir = Path(self.test_dir) / "recordings"
+        session_dir = recordings_dir / "interview_1"
+        (session_dir / "jobs").mkdir(parents=True)
+        for name in ["response_1.mp3", "response_1.webm", "metadata_1.json"]:
+            (session_dir / name).write_bytes(b"data")
+        os.utime(session_dir / "response_1.mp3", (50, 50))
+        self.index.add_file("stale_session", "response.mp3", 10)
+
+        self.assertEqual(self.index.rebuild(recordings_dir), 1)
+        sessions, _ = self.index.list_sessions()
+        self.assertEqual(len(sessions), 1)
+        self.assertEqual(sessions[0]["video_files"], ["response_1.webm"])
+        self.assertEqual(sessions[0]["created_at"], 50)
+        self.assertEqual(len(self.index.list_sessions(has_video=True)[0]), 1)
+
+    def test_remove_session(self):
+        """Test that a removed session disappears from the listing"""
+        self.index.add_file("interview_1", "response.mp3", 100)
+        self.index.remove_session("interview_1")
+        self.assertEqual(self.index.count(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
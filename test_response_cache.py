@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the bounded response cache
+"""
+
+import unittest
+import tempfile
+import shutil
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+from response_cache import ResponseCache, MemoryCacheBackend, SQLiteCacheBackend
+
+
+class TestResponseCache(unittest.TestCase):
+    """Test cases for ResponseCache with the in-memory backend"""
+
+    def make_cache(self, **kwargs):
+        return ResponseCache(backend=MemoryCacheBackend(), **kwargs)
+
+    def test_get_returns_cached_value(self):
+        """Test that a stored value is returned and counted as a hit"""
+        cache = self.make_cache()
+        cache.set("a", "value")
+        self.assertEqual(cache.get("a"), "value")
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_missing_key_counts_as_miss(self):
+        """Test that a missing key returns None and counts as a miss"""
+        cache = self.make_cache()
+        self.assertIsNone(cache.get("missing"))
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_keys_use_full_content(self):
+        """Test that answers sharing a long prefix get different keys"""
+        prefix = "x" * 100
+        key1 = ResponseCache.make_key("follow_up", prefix + " first", "introduction", "gpt-3.5-turbo")
+        key2 = ResponseCache.make_key("follow_up", prefix + " second", "introduction", "gpt-3.5-turbo")
+        self.assertNotEqual(key1, key2)
+
+    def test_keys_include_question_type_and_model(self):
+        """Test that question type and model are part of the key"""
+        base = ResponseCache.make_key("follow_up", "answer", "skills", "gpt-3.5-turbo")
+        self.assertNotEqual(base, ResponseCache.make_key("follow_up", "answer", "future", "gpt-3.5-turbo"))
+        self.assertNotEqual(base, ResponseCache.make_key("follow_up", "answer", "skills", "gpt-4"))
+
+    def test_evicts_least_recently_used_entry(self):
+        """Test that the entry budget evicts the least recently used key"""
+        cache = self.make_cache(max_entries=2)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+        cache.set("c", "3")
+        self.assertEqual(cache.get("a"), "1")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_byte_budget_is_enforced(self):
+        """Test that the byte budget evicts entries"""
+        cache = self.make_cache(max_bytes=10)
+        cache.set("a", "12345")
+        cache.set("b", "67890")
+        cache.set("c", "abc")
+        self.assertLessEqual(cache.stats()["bytes"], 10)
+        self.assertIsNone(cache.get("a"))
+
+    def test_oversized_value_is_not_stored(self):
+        """Test that a value larger than the whole budget is skipped"""
+        cache = self.make_cache(max_bytes=4)
+        cache.set("a", "too large")
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_expired_entry_is_dropped(self):
+        """Test that entries past their TTL are treated as misses"""
+        cache = self.make_cache(ttl_seconds=10)
+        cache.set("a", "value")
+        with patch("response_cache.time.time", return_value=time.time() + 11):
+            self.assertIsNone(cache.get("a"))
+        stats = cache.stats()
+        self.assertEqual(stats["expirations"], 1)
+        self.assertEqual(stats["entries"], 0)
+
+
+class TestSQLiteCacheBackend(unittest.TestCase):
+    """Test cases for the shared on-disk backend"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.db_path = Path(self.test_dir) / "cache.sqlite3"
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_entries_are_shared_between_instances(self):
+        """Test that a second cache on the same file sees stored values"""
+        writer = ResponseCache(backend=SQLiteCacheBackend(self.db_path))
+        writer.set("a", "value")
+        reader = ResponseCache(backend=SQLiteCacheBackend(self.db_path))
+        self.assertEqual(reader.get("a"), "value")
+
+    def test_file_is_created_on_first_use(self):
+        """Test that creating the backend doesn't touch the filesystem"""
+        backend = SQLiteCacheBackend(Path(self.test_dir) / "state" / "cache.sqlite3")
+        self.assertFalse(backend.path.parent.exists())
+        self.assertEqual(len(backend), 0)
+        self.assertTrue(backend.path.exists())
+
+    def test_entry_budget_is_enforced(self):
+        """Test that LRU eviction works with the SQLite backend"""
+        cache = ResponseCache(backend=SQLiteCacheBackend(self.db_path), max_entries=2)
+        cache.set("a", "1")
+        time.sleep(0.01)
+        cache.set("b", "2")
+        time.sleep(0.01)
+        cache.set("c", "3")
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("c"), "3")
+        self.assertEqual(cache.stats()["entries"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
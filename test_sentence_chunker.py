@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Unit tests for splitting streamed follow-ups into sentences
+"""
+
+import unittest
+
+from sentence_chunker import SentenceChunker
+
+
+class TestSentenceChunker(unittest.TestCase):
+    """Test cases for SentenceChunker"""
+
+    def feed_all(self, chunker, deltas):
+        sentences = []
+        for delta in deltas:
+            sentences += chunker.feed(delta)
+        return sentences
+
+    def test_sentences_complete_as_tokens_arrive(self):
+        """Test that a sentence is returned by the token that ends it"""
+        chunker = SentenceChunker()
+        self.assertEqual(chunker.feed("That sounds like a tough"), [])
+        self.assertEqual(chunker.feed(" project."), [])
+        self.assertEqual(chunker.feed(" How"), ["That sounds like a tough project."])
+        self.assertEqual(chunker.feed(" did you handle it?"), [])
+        self.assertEqual(chunker.flush(), ["How did you handle it?"])
+        self.assertEqual(chunker.flush(), [])
+
+    def test_short_fragments_join_the_next_sentence(self):
+        """Test that a one-word exclamation is not spoken on its own"""
+        chunker = SentenceChunker()
+        sentences = self.feed_all(chunker, ["Great! ", "Tell me more about ", "your role there. ", "Thanks"])
+        self.assertEqual(sentences, ["Great! Tell me more about your role there."])
+        self.assertEqual(chunker.flush(), ["Thanks"])
+
+    def test_full_text_is_kept(self):
+        """Test that the whole streamed text is available at the end"""
+        chunker = SentenceChunker()
+        self.feed_all(chunker, ["What was ", "the outcome?\n", "Did it ship?"])
+        self.assertEqual(chunker.text, "What was the outcome?\nDid it ship?")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the interview session registry
+"""
+
+import time
+import unittest
+import tempfile
+import shutil
+from pathlib import Path
+from unittest.mock import patch
+
+from session_registry import SessionRegistry, TOUCH_INTERVAL_SECONDS
+from state_store import SQLiteStateStore
+
+
+def make_session(session_id: str):
+    return {
+        "session_id": session_id,
+        "response_count": 0,
+        "audio_files": [],
+        "video_files": []
+    }
+
+
+class TestSessionRegistry(unittest.TestCase):
+    """Test cases for SessionRegistry"""
+
+    def setUp(self):
+        self.registry = SessionRegistry(timeout_minutes=1)
+
+    def test_lookup_by_client_and_session_id(self):
+        """Test that a created session is found through both indexes"""
+        session = self.registry.create("client-1", make_session("interview_1"))
+        self.assertEqual(self.registry.get("client-1"), session)
+        self.assertEqual(self.registry.get_by_session_id("interview_1"), session)
+
+    def test_find_prefers_session_id(self):
+        """Test that find resolves the session_id before the client_id"""
+        self.registry.create("client-1", make_session("interview_1"))
+        session = self.registry.create("client-2", make_session("interview_2"))
+        client_id, found = self.registry.find(session_id="interview_2", client_id="client-1")
+        self.assertEqual(client_id, "client-2")
+        self.assertEqual(found["session_id"], session["session_id"])
+
+    def test_find_accepts_session_id_as_client_id(self):
+        """Test that a session_id passed as client_id is still resolved"""
+        self.registry.create("client-1", make_session("interview_1"))
+        client_id, found = self.registry.find(client_id="interview_1")
+        self.assertEqual(client_id, "client-1")
+        self.assertEqual(found["session_id"], "interview_1")
+
+    def test_find_unknown_session(self):
+        """Test that unknown ids return (None, None)"""
+        self.assertEqual(self.registry.find(session_id="missing"), (None, None))
+
+    def test_attach_reuses_existing_session(self):
+        """Test that attaching to a known session_id returns the existing session"""
+        self.registry.create("client-1", make_session("interview_1"))
+        attached = self.registry.attach("video_session_1", make_session("interview_1"))
+        self.assertEqual(attached["client_id"], "client-1")
+        self.assertEqual(len(self.registry), 1)
+
+    def test_close_removes_both_indexes(self):
+        """Test that closing a session removes it from both indexes"""
+        self.registry.create("client-1", make_session("interview_1"))
+        self.registry.close("client-1")
+        self.assertIsNone(self.registry.get("client-1"))
+        self.assertIsNone(self.registry.get_by_session_id("interview_1"))
+
+    def test_evict_idle_reclaims_detached_sessions(self):
+        """Test that sessions idle past the timeout are evicted"""
+        self.registry.attach("video_session_1", make_session("interview_1"))
+        self.registry.create("client-2", make_session("interview_2"))
+        self.registry.touch("interview_2")
+        evicted = self.registry.evict_idle(now=time.time() + 61)
+        self.assertEqual({s["session_id"] for s in evicted}, {"interview_1", "interview_2"})
+        self.assertEqual(len(self.registry), 0)
+        self.assertEqual(self.registry.client_ids(), [])
+
+    def test_update_persists_changes(self):
+        """Test that update writes changes back to the store"""
+        self.registry.create("client-1", make_session("interview_1"))
+        self.registry.update("interview_1", lambda session: session["audio_files"].append({"audio_file": "a.mp3"}))
+        self.assertEqual(self.registry.get("client-1")["audio_files"], [{"audio_file": "a.mp3"}])
+
+    def test_update_unknown_session(self):
+        """Test that updating a missing session is a no-op"""
+        self.assertIsNone(self.registry.update("missing", lambda session: None))
+
+    def test_evict_idle_keeps_active_sessions(self):
+        """Test that recently active sessions survive eviction"""
+        self.registry.create("client-1", make_session("interview_1"))
+        self.assertEqual(self.registry.evict_idle(now=time.time() + 30), [])
+        self.assertIn("client-1", self.registry)
+
+    def test_touch_writes_at_most_every_few_seconds(self):
+        """Test that touching a session again straight away doesn't write to the store"""
+        self.registry.create("client-1", make_session("interview_1"))
+        now = time.time()
+        with patch.object(self.registry, "update", wraps=self.registry.update) as update:
+            self.registry.touch("interview_1", now=now)
+            self.registry.touch("interview_1", now=now + 1)
+            self.assertFalse(self.registry.touch_due("interview_1", now=now + 1))
+            self.assertTrue(self.registry.touch_due("interview_1", now=now + TOUCH_INTERVAL_SECONDS))
+            self.registry.touch("interview_1", now=now + TOUCH_INTERVAL_SECONDS)
+        self.assertEqual(update.call_count, 2)
+
+    def test_returned_sessions_are_copies(self):
+        """Test that changing a returned session doesn't change the stored one"""
+        self.registry.create("client-1", make_session("interview_1"))
+        self.registry.get("client-1")["audio_files"].append({"audio_file": "a.mp3"})
+        self.assertEqual(self.registry.get_by_session_id("interview_1")["audio_files"], [])
+
+
+class TestSessionRegistrySQLite(TestSessionRegistry):
+    """The same registry behaviour on the shared SQLite state store"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.store = SQLiteStateStore(Path(self.test_dir) / "state.sqlite3")
+        self.registry = SessionRegistry(timeout_minutes=1, store=self.store)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_file_is_created_on_first_use(self):
+        """Test that creating the store doesn't touch the filesystem"""
+        store = SQLiteStateStore(Path(self.test_dir) / "state" / "state.sqlite3")
+        self.assertFalse(store.path.parent.exists())
+        store.set("sessions", "interview_1", {})
+        self.assertTrue(store.path.exists())
+
+    def test_sessions_are_shared_between_workers(self):
+        """Test that a second registry on the same file sees the session"""
+        self.registry.create("client-1", make_session("interview_1"))
+        other = SessionRegistry(timeout_minutes=1, store=SQLiteStateStore(self.store.path))
+        client_id, session = other.find(session_id="interview_1")
+        self.assertEqual(client_id, "client-1")
+        other.update("interview_1", lambda s: s.update(response_count=3))
+        self.assertEqual(self.registry.get("client-1")["response_count"], 3)
+
+    def test_workers_evict_only_their_own_sessions(self):
+        """Test that another worker's idle session is left to it until twice the timeout"""
+        self.registry.create("client-1", make_session("interview_1"))
+        other = SessionRegistry(timeout_minutes=1, store=SQLiteStateStore(self.store.path), owner="other")
+        now = time.time()
+        self.assertEqual(other.evict_idle(now=now + 61), [])
+        self.assertIn("client-1", self.registry)
+        # Its worker is gone by then, so anyone may reclaim it
+        evicted = other.evict_idle(now=now + 121)
+        self.assertEqual([s["session_id"] for s in evicted], ["interview_1"])
+        self.assertNotIn("client-1", self.registry)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Unit tests for sliding-window transcription of answers streamed over /ws
+"""
+
+import asyncio
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from streaming_transcription import StreamingTranscriber, CLUSTER_ID, cluster_timecode, SAMPLE_RATE
+
+HEADER = b"\x1a\x45\xdf\xa3 webm header "
+
+
+def cluster(second: int) -> bytes:
+    """A cluster of unknown size starting at the given second, holding one second of audio"""
+    return CLUSTER_ID + b"\x01\xff\xff\xff\xff\xff\xff\xff" + b"\xe7\x82" + (second * 1000).to_bytes(2, "big") + b"opus" * 8
+
+
+class FakePool:
+    """Transcription pool returning canned results and recording the audio it was given"""
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.windows = []
+
+    async def transcribe(self, audio, **kwargs):
+        self.windows.append(audio)
+        return self.results.pop(0)
+
+
+class TestStreamingTranscriber(unittest.TestCase):
+    """Test cases for StreamingTranscriber"""
+
+    def setUp(self):
+        self.decoded = []
+        self.decode_gate = None
+
+        async def decode(data):
+            # Each cluster decodes to one second of samples valued by their position in the answer
+            self.decoded.append(data)
+            if self.decode_gate is not None:
+                await self.decode_gate.wait()
+            start = cluster_timecode(data, data.find(CLUSTER_ID)) * SAMPLE_RATE // 1000
+            end = (data.count(CLUSTER_ID) * SAMPLE_RATE) + start
+            return np.arange(start, end, dtype=np.float32)
+
+        patcher = patch("streaming_transcription.decode_webm_stream", side_effect=decode)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def stream(self, transcriber, seconds):
+        for second in seconds:
+            transcriber.add_chunk((HEADER if second == 0 else b"") + cluster(second))
+
+    def test_whole_stream_is_decoded_until_something_is_committed(self):
+        """Test that a short answer is decoded and transcribed from the start"""
+        pool = FakePool([{"text": " Hello there", "segments": [{"text": " Hello there", "end": 2.0}]}])
+        transcriber = StreamingTranscriber(pool, window_seconds=10.0)
+        self.stream(transcriber, range(3))
+
+        self.assertEqual(asyncio.run(transcriber.partial()), "Hello there")
+        self.assertEqual(self.decoded, [transcriber.data])
+        self.assertEqual(pool.windows[0][0], 0)
+        self.assertEqual(transcriber.committed_samples, 0)
+
+    def test_stable_segments_are_committed_and_only_the_tail_decoded(self):
+        """Test that a full window commits all but its last segment, and later passes skip it"""
+        pool = FakePool([
+            {"text": " One. Two. Three", "segments": [
+                {"text": " One.", "end": 2.0}, {"text": " Two.", "end": 4.0}, {"text": " Three", "end": 5.0}
+            ]},
+            {"text": " Three four", "segments": [{"text": " Three four", "end": 3.0}]}
+        ])
+        transcriber = StreamingTranscriber(pool, window_seconds=2.0)
+        self.stream(transcriber, range(5))
+
+        self.assertEqual(asyncio.run(transcriber.partial()), "One. Two. Three")
+        self.assertEqual(transcriber.committed_text, "One. Two.")
+        self.assertEqual(transcriber.committed_samples, 4 * SAMPLE_RATE)
+
+        self.stream(transcriber, range(5, 7))
+        self.assertEqual(asyncio.run(transcriber.partial()), "One. Two. Three four")
+
+        # The second pass decodes the header and the clusters from second 3 on
+        self.assertEqual(self.decoded[1], HEADER + b"".join(cluster(second) for second in range(3, 7)))
+        # and transcribes from the committed point
+        self.assertEqual(pool.windows[1][0], 4 * SAMPLE_RATE)
+        self.assertEqual(pool.windows[1].size, 3 * SAMPLE_RATE)
+
+    def test_final_flush_transcribes_the_whole_tail(self):
+        """Test that the final pass keeps the committed text and adds all of the tail"""
+        pool = FakePool([
+            {"text": " One. Two. Three", "segments": [
+                {"text": " One.", "end": 2.0}, {"text": " Two.", "end": 4.0}, {"text": " Three", "end": 5.0}
+            ]},
+            {"text": " Three four. Five", "segments": [
+                {"text": " Three four.", "end": 2.0}, {"text": " Five", "end": 4.0}
+            ]}
+        ])
+        transcriber = StreamingTranscriber(pool, window_seconds=2.0)
+        self.stream(transcriber, range(5))
+
+        async def run():
+            # The final pass waits for the partial pass that is still running
+            partial = asyncio.ensure_future(transcriber.partial())
+            await asyncio.sleep(0)
+            return await transcriber.final(), await partial
+
+        final, partial = asyncio.run(run())
+        self.assertEqual(partial, "One. Two. Three")
+        self.assertEqual(final, "One. Two. Three four. Five")
+        # Nothing more is committed by the final pass
+        self.assertEqual(transcriber.committed_text, "One. Two.")
+        self.assertEqual(pool.windows[1][0], 4 * SAMPLE_RATE)
+
+    def test_clusters_split_across_timeslices_are_found(self):
+        """Test that a cluster header cut by a timeslice boundary is found once the rest arrives"""
+        transcriber = StreamingTranscriber(FakePool([]))
+        data = HEADER + b"".join(cluster(second) for second in range(3))
+        cut = len(HEADER) + len(cluster(0)) + 6
+        transcriber.add_chunk(data[:cut])
+        transcriber._scan_clusters(transcriber.data)
+        self.assertEqual([sample for _, sample in transcriber.clusters], [0])
+
+        transcriber.add_chunk(data[cut:])
+        transcriber._scan_clusters(transcriber.data)
+        self.assertEqual([sample for _, sample in transcriber.clusters], [0, SAMPLE_RATE, 2 * SAMPLE_RATE])
+
+    def test_a_started_pass_blocks_the_next_straight_away(self):
+        """Test that chunks arriving in the same loop tick schedule only one pass"""
+        pool = FakePool([{"text": " Hello", "segments": [{"text": " Hello", "end": 1.0}]}])
+        transcriber = StreamingTranscriber(pool)
+        self.stream(transcriber, range(2))
+
+        async def main():
+            passes = []
+            for _ in range(3):
+                if transcriber.should_run_partial():
+                    passes.append(transcriber.start_partial())
+            return await asyncio.gather(*passes)
+
+        self.assertEqual(asyncio.run(main()), ["Hello"])
+        self.assertEqual(len(self.decoded), 1)
+
+    def test_reset_during_a_pass_discards_it(self):
+        """Test that a pass still decoding when the answer is reset leaves the new answer alone"""
+        pool = FakePool([
+            {"text": " One. Two. Three", "segments": [
+                {"text": " One.", "end": 2.0}, {"text": " Two.", "end": 4.0}, {"text": " Three", "end": 5.0}
+            ]}
+        ])
+        transcriber = StreamingTranscriber(pool, window_seconds=2.0)
+        self.stream(transcriber, range(5))
+        transcriber.committed_samples = 4 * SAMPLE_RATE
+
+        async def main():
+            self.decode_gate = asyncio.Event()
+            stale = transcriber.start_partial()
+            await asyncio.sleep(0)
+            transcriber.reset()
+            self.stream(transcriber, range(2))
+            self.decode_gate.set()
+            return await stale
+
+        self.assertEqual(asyncio.run(main()), "")
+        self.assertEqual(pool.windows, [])
+        self.assertEqual(transcriber.committed_samples, 0)
+        self.assertEqual(transcriber.committed_text, "")
+
+    def test_reset_forgets_the_committed_audio(self):
+        """Test that a new answer starts from an empty stream"""
+        pool = FakePool([
+            {"text": " One. Two", "segments": [{"text": " One.", "end": 2.0}, {"text": " Two", "end": 3.0}]}
+        ])
+        transcriber = StreamingTranscriber(pool, window_seconds=2.0)
+        self.stream(transcriber, range(3))
+        asyncio.run(transcriber.partial())
+
+        transcriber.reset()
+        self.assertFalse(transcriber.has_audio)
+        self.assertEqual(transcriber.committed_samples, 0)
+        self.assertEqual(transcriber.clusters, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
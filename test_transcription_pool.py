@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Whisper transcription pool's startup controls
+"""
+
+import asyncio
+import importlib.util
+import subprocess
+import sys
+import unittest
+
+from transcription import TranscriptionPool
+
+
+class TestTranscriptionPool(unittest.TestCase):
+    """Test cases for TranscriptionPool"""
+
+    def test_import_does_not_load_whisper(self):
+        """Test that importing the pool doesn't import whisper or torch"""
+        loaded = subprocess.run(
+            [sys.executable, "-c", "import sys, transcription; print('whisper' in sys.modules, 'torch' in sys.modules)"],
+            capture_output=True, text=True, check=True
+        ).stdout.split()
+        self.assertEqual(loaded, ["False", "False"])
+
+    def test_starts_cold(self):
+        """Test that a new pool is not ready and has loaded nothing"""
+        pool = TranscriptionPool("tiny", workers=2)
+        pool.start()
+        try:
+            status = pool.status()
+            self.assertFalse(status["ready"])
+            self.assertEqual(status["state"], "cold")
+            self.assertEqual(status["workers"], 2)
+        finally:
+            pool.shutdown()
+
+    @unittest.skipIf(importlib.util.find_spec("whisper") is not None, "whisper is installed")
+    def test_failed_warmup_is_not_ready(self):
+        """Test that a warmup that can't load the model leaves the pool not ready"""
+        pool = TranscriptionPool("tiny")
+        try:
+            with self.assertRaises(Exception):
+                asyncio.run(pool.warmup())
+            self.assertFalse(pool.ready)
+            self.assertEqual(pool.status()["state"], "failed")
+            self.assertTrue(pool.status()["error"])
+        finally:
+            pool.shutdown()
+
+    def test_lazy_pool_is_ready_without_warmup(self):
+        """Test that a pool loading its models on first use reports ready straight away"""
+        pool = TranscriptionPool("tiny", preload=False)
+        self.assertTrue(pool.ready)
+        self.assertTrue(pool.status()["ready"])
+        self.assertFalse(TranscriptionPool("tiny").ready)
+
+    def test_rejects_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            TranscriptionPool("tiny", mode="gpu")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the on-disk TTS cache
+"""
+
+import asyncio
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from tts_cache import TTSCache, SpeechPrefetcher, SpeechStream
+
+
+class TestTTSCache(unittest.TestCase):
+    """Test cases for TTSCache"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.calls = []
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    async def synthesize(self, text, voice, model):
+        self.calls.append((text, voice, model))
+        await asyncio.sleep(0.01)
+        return f"{voice}:{text}".encode()
+
+    def test_key_covers_text_voice_and_model(self):
+        """Test that changing any part of the key gives a different entry"""
+        cache = TTSCache(self.test_dir)
+        cache.put("Hello", "alloy", "tts-1", b"a")
+        self.assertEqual(cache.get("Hello", "alloy", "tts-1"), b"a")
+        self.assertIsNone(cache.get("Hello", "nova", "tts-1"))
+        self.assertIsNone(cache.get("Hello", "alloy", "tts-1-hd"))
+        self.assertIsNone(cache.get("Hello!", "alloy", "tts-1"))
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 3)
+
+    def test_synthesizes_once(self):
+        """Test that concurrent and repeated requests share one API call"""
+        cache = TTSCache(self.test_dir)
+
+        async def main():
+            first = await asyncio.gather(*(
+                cache.get_or_synthesize("Hello", "alloy", "tts-1", self.synthesize) for _ in range(3)
+            ))
+            second = await cache.get_or_synthesize("Hello", "alloy", "tts-1", self.synthesize)
+            return first, second
+
+        first, second = asyncio.run(main())
+        self.assertEqual(first, [b"alloy:Hello"] * 3)
+        self.assertEqual(second, b"alloy:Hello")
+        self.assertEqual(len(self.calls), 1)
+
+    def test_file_io_runs_off_the_event_loop(self):
+        """Test that the async paths read and write the cache in the executor"""
+        cache = TTSCache(self.test_dir)
+        threads = []
+        get, put = cache.get, cache.put
+
+        def record(method):
+            def wrapper(*args):
+                threads.append(threading.get_ident())
+                return method(*args)
+            return wrapper
+
+        cache.get, cache.put = record(get), record(put)
+
+        async def chunks(text, voice, model):
+            yield b"ab"
+
+        async def main():
+            await cache.get_or_synthesize("Hello", "alloy", "tts-1", self.synthesize)
+            return [chunk async for chunk in cache.stream("Hi", "alloy", "tts-1", chunks)]
+
+        self.assertEqual(asyncio.run(main()), [b"ab"])
+        self.assertEqual(len(threads), 4)
+        self.assertNotIn(threading.get_ident(), threads)
+        self.assertEqual(get("Hi", "alloy", "tts-1"), b"ab")
+
+    def test_evicts_least_recently_used(self):
+        """Test that the oldest unused clip is evicted once over budget"""
+        cache = TTSCache(self.test_dir, max_bytes=25)
+        cache.put("one", "alloy", "tts-1", b"x" * 10)
+        cache.put("two", "alloy", "tts-1", b"x" * 10)
+        # Make "one" the most recently used
+        os.utime(cache.path(cache.make_key("two", "alloy", "tts-1")), (1, 1))
+        cache.get("one", "alloy", "tts-1")
+        cache.put("three", "alloy", "tts-1", b"x" * 10)
+        self.assertIsNotNone(cache.get("one", "alloy", "tts-1"))
+        self.assertIsNone(cache.get("two", "alloy", "tts-1"))
+        self.assertEqual(cache.stats()["bytes"], 20)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_failed_synthesis_is_not_cached(self):
+        """Test that an API error propagates and leaves nothing behind"""
+        cache = TTSCache(self.test_dir)
+
+        async def broken(text, voice, model):
+            raise RuntimeError("rate limited")
+
+        with self.assertRaises(RuntimeError):
+            asyncio.run(cache.get_or_synthesize("Hello", "alloy", "tts-1", broken))
+        self.assertEqual(cache.stats()["bytes"], 0)
+
+    def test_warmup_renders_each_voice(self):
+        """Test that warmup renders missing clips and skips cached ones"""
+        cache = TTSCache(self.test_dir)
+        cache.put("Hello", "alloy", "tts-1", b"cached")
+        counts = asyncio.run(cache.warmup(["Hello", "Bye"], ["alloy", "nova"], "tts-1", self.synthesize))
+        self.assertEqual(counts, {"cached": 1, "rendered": 3, "failed": 0})
+        self.assertEqual(cache.get("Bye", "nova", "tts-1"), b"nova:Bye")
+
+    def test_stream_tees_chunks_and_caches(self):
+        """Test that streamed chunks reach a second reader and the cache once complete"""
+        cache = TTSCache(self.test_dir)
+        readers = []
+
+        async def chunks(text, voice, model):
+            for chunk in (b"ab", b"cd", b"ef"):
+                await asyncio.sleep(0.01)
+                yield chunk
+
+        def on_start(speech):
+            readers.append(asyncio.ensure_future(speech.wait()))
+
+        async def main():
+            received = [chunk async for chunk in cache.stream("Hi", "alloy", "tts-1", chunks, on_start=on_start)]
+            return received, await readers[0]
+
+        received, teed = asyncio.run(main())
+        self.assertEqual(received, [b"ab", b"cd", b"ef"])
+        self.assertEqual(teed, b"abcdef")
+        self.assertEqual(cache.get("Hi", "alloy", "tts-1"), b"abcdef")
+
+    def test_concurrent_streams_share_one_call(self):
+        """Test that streaming speech already being synthesized reads the same stream"""
+        cache = TTSCache(self.test_dir)
+        calls = []
+        started = []
+
+        async def chunks(text, voice, model):
+            calls.append(text)
+            for chunk in (b"ab", b"cd"):
+                await asyncio.sleep(0.01)
+                yield chunk
+
+        async def read():
+            return b"".join([chunk async for chunk in cache.stream("Hi", "alloy", "tts-1", chunks,
+                                                                   on_start=started.append)])
+
+        async def main():
+            return await asyncio.gather(read(), read())
+
+        self.assertEqual(asyncio.run(main()), [b"abcd", b"abcd"])
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(started), 2)
+        self.assertIs(started[0], started[1])
+        self.assertEqual(cache._streaming, {})
+
+    def test_broken_stream_is_incomplete(self):
+        """Test that a stream that breaks off is marked incomplete and not cached"""
+        cache = TTSCache(self.test_dir)
+        streams = []
+
+        async def chunks(text, voice, model):
+            yield b"ab"
+            raise RuntimeError("connection reset")
+
+        async def main():
+            with self.assertRaises(RuntimeError):
+                async for _ in cache.stream("Hi", "alloy", "tts-1", chunks, on_start=streams.append):
+                    pass
+
+        asyncio.run(main())
+        self.assertTrue(streams[0].finished)
+        self.assertFalse(streams[0].complete)
+        self.assertIsNone(cache.get("Hi", "alloy", "tts-1"))
+
+    def test_speech_stream_from_bytes(self):
+        """Test that a cached clip reads back as one complete chunk"""
+        async def main():
+            speech = SpeechStream.from_bytes(b"mp3")
+            return [chunk async for chunk in speech], speech.complete
+        self.assertEqual(asyncio.run(main()), ([b"mp3"], True))
+
+
+
+class TestSpeechPrefetcher(unittest.TestCase):
+    """Test cases for SpeechPrefetcher"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.cache = TTSCache(self.test_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    async def chunks(self, text, voice, model):
+        for chunk in (b"ab", b"cd"):
+            await asyncio.sleep(0.01)
+            yield chunk
+
+    def test_prepared_speech_is_fetchable(self):
+        """Test that speech started early can be read in full, calling on_fetch once"""
+        fetched = []
+
+        async def main():
+            prefetcher = SpeechPrefetcher(self.cache, ttl_seconds=0.05)
+            speech_id = prefetcher.prepare("Hi", "alloy", "tts-1", self.chunks, on_fetch=fetched.append)
+            first = await (await prefetcher.get(speech_id)).wait()
+            second = await (await prefetcher.get(speech_id)).wait()
+            await asyncio.sleep(0.1)
+            return first, second, await prefetcher.get(speech_id)
+
+        first, second, expired = asyncio.run(main())
+        self.assertEqual(first, b"abcd")
+        self.assertEqual(second, b"abcd")
+        self.assertEqual(len(fetched), 1)
+        self.assertIsNone(expired)
+        self.assertEqual(self.cache.get("Hi", "alloy", "tts-1"), b"abcd")
+
+    def test_prefetched_speech_is_cached_off_the_event_loop(self):
+        """Test that prefetching several sentences reads and writes the cache in the executor"""
+        threads = []
+        get, put = self.cache.get, self.cache.put
+
+        def record(method):
+            def wrapper(*args):
+                threads.append(threading.get_ident())
+                return method(*args)
+            return wrapper
+
+        self.cache.get, self.cache.put = record(get), record(put)
+
+        async def main():
+            prefetcher = SpeechPrefetcher(self.cache)
+            speech_ids = [prefetcher.prepare(text, "alloy", "tts-1", self.chunks) for text in ("One.", "Two.")]
+            for speech_id in speech_ids:
+                await (await prefetcher.get(speech_id)).wait()
+            await asyncio.gather(*prefetcher._tasks)
+
+        asyncio.run(main())
+        self.assertEqual(len(threads), 4)
+        self.assertNotIn(threading.get_ident(), threads)
+        self.assertEqual(get("Two.", "alloy", "tts-1"), b"abcd")
+
+    def test_failed_synthesis_raises_on_fetch(self):
+        """Test that a synthesis error is raised to whoever fetches the speech"""
+        async def broken(text, voice, model):
+            raise RuntimeError("rate limited")
+            yield b""
+
+        async def main():
+            prefetcher = SpeechPrefetcher(self.cache)
+            speech_id = prefetcher.prepare("Hi", "alloy", "tts-1", broken)
+            with self.assertRaises(RuntimeError):
+                await prefetcher.get(speech_id)
+            self.assertIsNone(await prefetcher.get("unknown"))
+
+        asyncio.run(main())
+
+
+if __name__ == "__main__":
+    unittest.main()
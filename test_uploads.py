@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Unit tests for chunked upload handling
+"""
+
+import asyncio
+import hashlib
+import io
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from uploads import UploadReader, UploadTooLarge, save_upload
+
+
+class FakeUpload:
+    """Minimal stand-in for UploadFile that records the read sizes"""
+
+    def __init__(self, data: bytes):
+        self.file = io.BytesIO(data)
+        self.reads = []
+
+    async def read(self, size: int = -1) -> bytes:
+        self.reads.append(size)
+        return self.file.read(size)
+
+
+class TestUploads(unittest.TestCase):
+    """Test cases for UploadReader and save_upload"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.path = Path(self.test_dir) / "response.webm"
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_save_upload_writes_in_chunks(self):
+        """Test that the upload is written to disk with its size and hash"""
+        data = b"x" * 2500
+        upload = FakeUpload(data)
+        reader = asyncio.run(save_upload(upload, self.path, max_bytes=10000, chunk_size=1000))
+        self.assertEqual(self.path.read_bytes(), data)
+        self.assertEqual(reader.size, 2500)
+        self.assertEqual(reader.sha256, hashlib.sha256(data).hexdigest())
+        self.assertTrue(all(size == 1000 for size in upload.reads))
+        self.assertFalse(self.path.with_name("response.webm.part").exists())
+
+    def test_save_upload_enforces_limit(self):
+        """Test that an oversized upload is rejected and leaves no file behind"""
+        upload = FakeUpload(b"x" * 5000)
+        with self.assertRaises(UploadTooLarge):
+            asyncio.run(save_upload(upload, self.path, max_bytes=3000, chunk_size=1000))
+        self.assertEqual(list(Path(self.test_dir).iterdir()), [])
+        # Reading stops soon after the limit is crossed
+        self.assertLessEqual(len(upload.reads), 4)
+
+    def test_reader_streams_chunks(self):
+        """Test that UploadReader yields every chunk in order"""
+        reader = UploadReader(FakeUpload(b"abcdef"), chunk_size=4)
+
+        async def collect():
+            return [chunk async for chunk in reader]
+
+        self.assertEqual(asyncio.run(collect()), [b"abcd", b"ef"])
+        self.assertEqual(reader.size, 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+"""
+Whisper transcription worker pool
+
+Transcription jobs are submitted to a dedicated executor so that decoding a
+long answer never runs on the event loop. Each worker owns its own Whisper
+model instance, loaded once when the worker starts.
+
+Whisper (and with it torch) is only imported inside the workers, so modules
+that just need the pool class import quickly. warmup() loads every worker's
+model and runs a synthetic clip through it, so the first real answer doesn't
+pay for loading and kernel warmup; the pool reports ready once that is done.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+# Per-worker state: one model per thread (thread mode) or per process (process mode)
+_worker_state = threading.local()
+
+# Length of the synthetic clip transcribed to warm each worker up
+WARMUP_SECONDS = 1.0
+
+
+def _init_worker(model_name: str, torch_threads: int = None):
+    """Load the Whisper model owned by the current worker"""
+    started = time.perf_counter()
+    import whisper
+    if torch_threads:
+        import torch
+        torch.set_num_threads(torch_threads)
+    _worker_state.model = whisper.load_model(model_name)
+    _worker_state.model_name = model_name
+    _worker_state.load_seconds = time.perf_counter() - started
+    print(f"Whisper worker ready (pid={os.getpid()}, thread={threading.get_ident()}, model={model_name}, "
+          f"{_worker_state.load_seconds:.1f}s)")
+
+
+def _transcribe_job(model_name: str, audio, options: dict):
+    """Run a single transcription inside a worker"""
+    if getattr(_worker_state, "model_name", None) != model_name:
+        _init_worker(model_name)
+    return _worker_state.model.transcribe(audio, **options)
+
+
+def _warmup_job(model_name: str, transcribe: bool = True) -> dict:
+    """Load the worker's model and optionally transcribe a quiet synthetic clip with it"""
+    if getattr(_worker_state, "model_name", None) != model_name:
+        _init_worker(model_name)
+    started = time.perf_counter()
+    if transcribe:
+        import numpy as np
+        from media import WHISPER_SAMPLE_RATE
+        noise = np.random.default_rng(0).standard_normal(int(WHISPER_SAMPLE_RATE * WARMUP_SECONDS))
+        _worker_state.model.transcribe((noise * 0.01).astype(np.float32))
+    return {"load_seconds": _worker_state.load_seconds, "transcribe_seconds": time.perf_counter() - started}
+
+
+class TranscriptionPool:
+    """Executor of Whisper workers that async handlers submit jobs to and await"""
+
+    def __init__(self, model_name: str, workers: int = 1, mode: str = "thread", preload: bool = True):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown transcription executor mode: {mode}")
+        self.model_name = model_name
+        self.workers = max(1, int(workers))
+        self.mode = mode
+        # Without preloading, models load on the first transcription
+        self.preload = preload
+        self._executor = None
+        # cold -> warming -> ready (or failed); also ready after the first real transcription
+        self.state = "cold"
+        self.error = None
+        self.timings = {}
+        self._created = time.monotonic()
+
+    def start(self):
+        """Create the executor (workers load their models as they spawn)"""
+        if self._executor is not None:
+            return
+        if self.mode == "process":
+            # Split the cores between worker processes so they don't oversubscribe
+            torch_threads = max(1, (os.cpu_count() or 1) // self.workers)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.model_name, torch_threads)
+            )
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="whisper",
+                initializer=_init_worker,
+                initargs=(self.model_name,)
+            )
+        print(f"✅ Transcription pool started ({self.workers} {self.mode} worker(s), model={self.model_name})")
+
+    def shutdown(self):
+        """Stop the executor, letting queued jobs finish"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self.state = "cold"
+
+    async def transcribe(self, audio, **options) -> dict:
+        """Transcribe a file path or 16 kHz float32 array without blocking the event loop"""
+        if self._executor is None:
+            self.start()
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self._executor, _transcribe_job, self.model_name, audio, options)
+        if self.state != "ready":
+            self._mark_ready()
+        return result
+
+    @property
+    def ready(self) -> bool:
+        """Whether to route transcriptions here: warm, or loading lazily and not known to be broken
+
+        A pool that loads its models on the first transcription reports ready
+        straight away, since a probe waiting for it would never send one.
+        """
+        return self.state == "ready" or (not self.preload and self.state in ("cold", "warming"))
+
+    def _mark_ready(self):
+        self.state = "ready"
+        self.error = None
+        self.timings["ready_after_seconds"] = round(time.monotonic() - self._created, 3)
+
+    async def warmup(self, transcribe: bool = True) -> dict:
+        """Load every worker's model (transcribing a synthetic clip if asked) and mark the pool ready"""
+        self.start()
+        self.state = "warming"
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        try:
+            # One job per worker; each spawns (or finds idle) a worker and loads its model
+            results = await asyncio.gather(*(
+                loop.run_in_executor(self._executor, _warmup_job, self.model_name, transcribe)
+                for _ in range(self.workers)
+            ))
+        except Exception as e:
+            self.state = "failed"
+            self.error = str(e)
+            raise
+        self.timings = {
+            "warmup_seconds": round(time.perf_counter() - started, 3),
+            "load_seconds": round(max(result["load_seconds"] for result in results), 3),
+            "transcribe_seconds": round(max(result["transcribe_seconds"] for result in results), 3)
+        }
+        self._mark_ready()
+        return self.timings
+
+    def status(self) -> dict:
+        """Readiness and cold-start timings of the pool"""
+        return {
+            "ready": self.ready,
+            "state": self.state,
+            "model": self.model_name,
+            "workers": self.workers,
+            "mode": self.mode,
+            "preload": self.preload,
+            "error": self.error,
+            **self.timings
+        }
@@ -0,0 +1,425 @@
+"""
+Content-addressed cache of synthesized interviewer speech
+
+The greeting, the predefined questions and the fallback follow-ups are read
+out word for word in every session, so their audio is stored on disk keyed
+on a hash of (text, voice, model) and served from there instead of calling
+the TTS API again. Files live under <cache_dir>/<first two hex digits>/ and
+are evicted least-recently-used (by mtime, refreshed on every hit) once the
+cache grows past its byte budget. Concurrent requests for the same speech
+share a single API call, streamed or not. The async paths read and write the
+files in the default executor, so a slow disk never stalls the event loop.
+
+SpeechPrefetcher starts synthesizing speech before anyone asks for it (e.g.
+as soon as a follow-up is generated) and hands it out by id, so the browser
+can fetch audio that is already on its way.
+
+SpeechStream fans speech that is still arriving from the provider out to
+several readers (the HTTP response, the session recording) and into the
+cache once it is complete.
+
+Pre-render the predefined prompts for the configured voices with:
+
+    python3 tts_cache.py warmup [--voices alloy nova]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+
+
+class SpeechStream:
+    """Speech chunks as they arrive, readable by any number of consumers from the start"""
+
+    def __init__(self):
+        self.chunks = []
+        self.complete = False
+        self.finished = False
+        self._changed = asyncio.Event()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "SpeechStream":
+        stream = cls()
+        stream.feed(data)
+        stream.finish()
+        return stream
+
+    @property
+    def data(self) -> bytes:
+        return b"".join(self.chunks)
+
+    def feed(self, chunk: bytes):
+        if chunk:
+            self.chunks.append(chunk)
+            self._wake()
+
+    def finish(self, complete: bool = True):
+        """Mark the end of the speech; complete=False if the provider stream broke off"""
+        self.complete = complete
+        self.finished = True
+        self._wake()
+
+    def _wake(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def __aiter__(self):
+        return self._read()
+
+    async def _read(self):
+        position = 0
+        while True:
+            while position < len(self.chunks):
+                position += 1
+                yield self.chunks[position - 1]
+            if self.finished:
+                return
+            await self._changed.wait()
+
+    async def wait(self) -> bytes:
+        """Wait for the end of the speech and return all of it"""
+        async for _ in self:
+            pass
+        return self.data
+
+
+class TTSCache:
+    """On-disk cache of MP3 speech keyed on (text, voice, model)"""
+
+    def __init__(self, directory, max_bytes: int = 200 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._total_bytes = None
+        self._pending = {}
+        self._streaming = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(text: str, voice: str, model: str) -> str:
+        digest = hashlib.sha256()
+        for part in (model, voice, text):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.mp3"
+
+    def _files(self):
+        return self.directory.glob("*/*.mp3")
+
+    def total_bytes(self) -> int:
+        # Scanned once, then kept up to date by put() and evict()
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(path.stat().st_size for path in self._files())
+            return self._total_bytes
+
+    def get(self, text: str, voice: str, model: str):
+        """Return the cached speech, or None"""
+        path = self.path(self.make_key(text, voice, model))
+        try:
+            data = path.read_bytes()
+            # Mark as recently used for eviction
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def put(self, text: str, voice: str, model: str, data: bytes):
+        """Store speech, evicting the least recently used files to stay within budget"""
+        if not data or len(data) > self.max_bytes:
+            return
+        path = self.path(self.make_key(text, voice, model))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        total = self.total_bytes()
+        existing = path.stat().st_size if path.exists() else 0
+        # Written under a temporary name so readers never see a partial file
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        if total - existing + len(data) > self.max_bytes:
+            self.evict()
+        else:
+            with self._lock:
+                self._total_bytes += len(data) - existing
+
+    def evict(self):
+        """Delete least recently used files until the cache fits its budget"""
+        files = []
+        for path in self._files():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        evicted = 0
+        for _, size, path in files:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            evicted += 1
+        with self._lock:
+            self._total_bytes = total
+            self.evictions += evicted
+
+    async def get_async(self, text: str, voice: str, model: str):
+        """get() in the default executor"""
+        return await asyncio.get_event_loop().run_in_executor(None, self.get, text, voice, model)
+
+    async def put_async(self, text: str, voice: str, model: str, data: bytes):
+        """put() in the default executor"""
+        await asyncio.get_event_loop().run_in_executor(None, self.put, text, voice, model, data)
+
+    async def get_or_synthesize(self, text: str, voice: str, model: str, synthesize) -> bytes:
+        """Return cached speech, calling synthesize(text=, voice=, model=) on a miss
+
+        Callers asking for the same speech while it is being synthesized wait
+        for that call instead of making their own.
+        """
+        data = await self.get_async(text, voice, model)
+        if data is not None:
+            return data
+        key = self.make_key(text, voice, model)
+        pending = self._pending.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        future = asyncio.get_event_loop().create_future()
+        self._pending[key] = future
+        try:
+            data = await synthesize(text=text, voice=voice, model=model)
+            await self.put_async(text, voice, model, data)
+            future.set_result(data)
+            return data
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody else may be waiting; don't log "exception never retrieved"
+            future.exception()
+            raise
+        finally:
+            del self._pending[key]
+
+    async def stream(self, text: str, voice: str, model: str, stream_synthesize, on_start=None):
+        """Yield speech chunks as they are synthesized, caching the speech once complete
+
+        A hit is yielded in one piece. on_start(speech_stream) is called with
+        the SpeechStream once the first chunk is in, so other readers (e.g. the
+        session recording) can follow along. Callers streaming the same speech
+        while it is being synthesized read that SpeechStream instead of making
+        their own call, and get a RuntimeError if it breaks off.
+        """
+        data = await self.get_async(text, voice, model)
+        if data is not None:
+            if on_start:
+                on_start(SpeechStream.from_bytes(data))
+            yield data
+            return
+        key = self.make_key(text, voice, model)
+        speech = self._streaming.get(key)
+        if speech is not None:
+            position = 0
+            async for chunk in speech:
+                position += 1
+                if on_start and position == 1:
+                    on_start(speech)
+                yield chunk
+            if not speech.complete:
+                raise RuntimeError("Speech synthesis broke off")
+            return
+        speech = SpeechStream()
+        self._streaming[key] = speech
+        try:
+            async for chunk in stream_synthesize(text=text, voice=voice, model=model):
+                if not chunk:
+                    continue
+                speech.feed(chunk)
+                if on_start and len(speech.chunks) == 1:
+                    on_start(speech)
+                yield chunk
+            speech.finish()
+            await self.put_async(text, voice, model, speech.data)
+        finally:
+            del self._streaming[key]
+            if not speech.finished:
+                speech.finish(complete=False)
+
+    async def warmup(self, texts, voices, model: str, synthesize, concurrency: int = 4) -> dict:
+        """Make sure every text is cached for every voice, returning counts"""
+        semaphore = asyncio.Semaphore(concurrency)
+        counts = {"cached": 0, "rendered": 0, "failed": 0}
+
+        async def render(text, voice):
+            path = self.path(self.make_key(text, voice, model))
+            if await asyncio.get_event_loop().run_in_executor(None, path.exists):
+                counts["cached"] += 1
+                return
+            async with semaphore:
+                try:
+                    await self.get_or_synthesize(text, voice, model, synthesize)
+                    counts["rendered"] += 1
+                except Exception as e:
+                    counts["failed"] += 1
+                    print(f"Error pre-rendering {voice!r} speech for {text!r}: {e}")
+
+        await asyncio.gather(*(render(text, voice) for voice in voices for text in texts))
+        return counts
+
+    def stats(self) -> dict:
+        """Counters for monitoring"""
+        total_bytes = self.total_bytes()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "bytes": total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+
+class SpeechPrefetcher:
+    """Speech synthesized ahead of the request for it, fetchable by id for ttl_seconds
+
+    Every prefetched sentence goes through TTSCache.stream, so its cache lookup
+    and write run in the executor rather than on the event loop.
+    """
+
+    def __init__(self, cache: TTSCache, ttl_seconds: float = 600):
+        self.cache = cache
+        self.ttl_seconds = ttl_seconds
+        self._speech = {}
+        self._on_fetch = {}
+        self._tasks = set()
+
+    def prepare(self, text: str, voice: str, model: str, stream_synthesize, on_fetch=None) -> str:
+        """Start synthesizing in the background and return the id to fetch it with
+
+        on_fetch(speech_stream) is called the first time the speech is fetched,
+        e.g. to record it in the session only once it is actually played.
+        """
+        loop = asyncio.get_event_loop()
+        speech_id = uuid.uuid4().hex
+        started = loop.create_future()
+        self._speech[speech_id] = started
+        if on_fetch:
+            self._on_fetch[speech_id] = on_fetch
+
+        def on_first_chunk(speech: SpeechStream):
+            started.set_result(speech)
+
+        async def synthesize():
+            try:
+                async for _ in self.cache.stream(text, voice, model, stream_synthesize, on_start=on_first_chunk):
+                    pass
+            except Exception as e:
+                print(f"Error pre-synthesizing speech: {e}")
+                if not started.done():
+                    started.set_exception(e)
+            finally:
+                if not started.done():
+                    started.set_exception(RuntimeError("Speech synthesis returned no audio"))
+                # Nobody may ever fetch it; don't log "exception never retrieved"
+                started.exception()
+                loop.call_later(self.ttl_seconds, self._forget, speech_id)
+
+        task = asyncio.ensure_future(synthesize())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return speech_id
+
+    async def get(self, speech_id: str):
+        """Return the SpeechStream for an id once its first chunk is in, or None if unknown
+
+        Raises the synthesis error if it failed before producing any audio.
+        """
+        started = self._speech.get(speech_id)
+        if started is None:
+            return None
+        speech = await asyncio.shield(started)
+        on_fetch = self._on_fetch.pop(speech_id, None)
+        if on_fetch:
+            on_fetch(speech)
+        return speech
+
+    def _forget(self, speech_id: str):
+        self._speech.pop(speech_id, None)
+        self._on_fetch.pop(speech_id, None)
+
+    def stats(self) -> dict:
+        return {"prepared": len(self._speech), "synthesizing": len(self._tasks)}
+
+
+async def speech_synthesizer(text: str, voice: str, model: str) -> bytes:
+    """Synthesize through the shared OpenAI client"""
+    from openai_client import speech
+    return await speech(model=model, voice=voice, input=text)
+
+
+async def speech_chunks(text: str, voice: str, model: str):
+    """Stream synthesized speech through the shared OpenAI connection pool"""
+    from openai_client import stream_speech
+    async for chunk in stream_speech(model=model, voice=voice, input=text):
+        yield chunk
+
+
+async def warmup_predefined(cache: TTSCache, voices, model: str) -> dict:
+    """Pre-render the predefined interview prompts for each voice"""
+    from interview_questions import predefined_prompts
+    started = time.time()
+    counts = await cache.warmup(predefined_prompts(), voices, model, speech_synthesizer)
+    print(f"TTS cache warmup for {', '.join(voices)}: {counts['rendered']} rendered, "
+          f"{counts['cached']} already cached, {counts['failed']} failed in {time.time() - started:.1f}s")
+    return counts
+
+
+def main():
+    from settings import TTS_CACHE_DIR, TTS_CACHE_MAX_BYTES, TTS_CACHE_VOICES, OPENAI_TTS_MODEL
+
+    parser = argparse.ArgumentParser(description="Manage the interviewer TTS cache")
+    parser.add_argument("action", choices=["warmup", "stats", "clear"], help="Action to perform")
+    parser.add_argument("--voices", nargs="+", default=TTS_CACHE_VOICES,
+                        help=f"Voices to pre-render (default: {' '.join(TTS_CACHE_VOICES)})")
+    parser.add_argument("--model", default=OPENAI_TTS_MODEL, help=f"TTS model (default: {OPENAI_TTS_MODEL})")
+    args = parser.parse_args()
+
+    cache = TTSCache(TTS_CACHE_DIR, TTS_CACHE_MAX_BYTES)
+    if args.action == "warmup":
+        async def warmup():
+            from openai_client import close_openai_client
+            try:
+                await warmup_predefined(cache, args.voices, args.model)
+            finally:
+                await close_openai_client()
+        asyncio.run(warmup())
+    elif args.action == "stats":
+        stats = cache.stats()
+        print(f"{len(list(cache._files()))} cached clips, {stats['bytes'] / (1024 * 1024):.1f} MB "
+              f"of {stats['max_bytes'] / (1024 * 1024):.1f} MB")
+    elif args.action == "clear":
+        for path in cache._files():
+            path.unlink(missing_ok=True)
+        print(f"Cleared {cache.directory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Chunked handling of uploaded recordings
+
+Uploads are consumed a chunk at a time instead of with a single
+`await file.read()`, so memory per upload is bounded by UPLOAD_CHUNK_SIZE no
+matter how large the recording is. The size limit is enforced as chunks
+arrive and a SHA-256 of the upload is computed along the way.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+
+import aiofiles
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+
+class UploadTooLarge(Exception):
+    """Raised when an upload exceeds its size limit"""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"Upload exceeds {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+class UploadReader:
+    """Async iterator over an UploadFile's chunks that tracks size and hash"""
+
+    def __init__(self, upload, max_bytes: int = None, chunk_size: int = UPLOAD_CHUNK_SIZE):
+        self.upload = upload
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.size = 0
+        self._hash = hashlib.sha256()
+
+    @property
+    def sha256(self) -> str:
+        return self._hash.hexdigest()
+
+    def __aiter__(self):
+        return self._chunks()
+
+    async def _chunks(self):
+        while True:
+            chunk = await self.upload.read(self.chunk_size)
+            if not chunk:
+                return
+            self.size += len(chunk)
+            if self.max_bytes is not None and self.size > self.max_bytes:
+                raise UploadTooLarge(self.max_bytes)
+            self._hash.update(chunk)
+            yield chunk
+
+
+async def save_upload(upload, path: Path, max_bytes: int = None, chunk_size: int = UPLOAD_CHUNK_SIZE) -> UploadReader:
+    """Stream an upload to path, returning the reader with its size and hash
+
+    Data is written to a temporary name next to path and renamed into place
+    once complete, so a rejected or interrupted upload leaves nothing behind.
+    """
+    path = Path(path)
+    partial_path = path.with_name(path.name + ".part")
+    reader = UploadReader(upload, max_bytes, chunk_size)
+    try:
+        async with aiofiles.open(partial_path, 'wb') as f:
+            async for chunk in reader:
+                await f.write(chunk)
+        os.replace(partial_path, path)
+    except BaseException:
+        partial_path.unlink(missing_ok=True)
+        raise
+    return reader